@@ -1,7 +1,11 @@
+import hashlib
 import logging
 import sys
+import time
+from contextlib import asynccontextmanager
 
 import httpx
+from common.db import pool_stats
 from fastapi import FastAPI
 from sqladmin import Admin
 from sqladmin.authentication import AuthenticationBackend
@@ -9,8 +13,9 @@ from starlette.requests import Request
 from starlette.responses import RedirectResponse
 from starlette.middleware.sessions import SessionMiddleware
 
-from src.core.database import engine
+from src.core.database import AsyncSessionLocal, engine, replica_router
 from src.core.config import settings
+from src.services.auth_client import AuthApiUnavailable, auth_api_client, get_token_exp
 
 # Настройка логирования для вывода в stdout (для Docker)
 logging.basicConfig(
@@ -41,35 +46,30 @@ class AdminAuth(AuthenticationBackend):
 
         try:
             # Отправка запроса на авторизацию в auth_api
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{settings.auth_api_url}/api/v1/auth/login",
-                    json={"username": username, "password": password}
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    access_token = data.get("access_token")
-                    refresh_token = data.get("refresh_token")
-
-                    if access_token and refresh_token:
-                        # Проверяем, что пользователь является superuser
-                        user_info = await self._get_user_info(access_token)
-                        if user_info and user_info.get("is_superuser"):
-                            request.session.update({
-                                "access_token": access_token,
-                                "refresh_token": refresh_token,
-                                "username": username
-                            })
-                            logger.info(f"Успешный вход в админку для пользователя: {username}")
-                            return True
-                        else:
-                            logger.warning(f"Пользователь {username} не является суперпользователем")
-                            return False
-
-                logger.warning(f"Неудачная попытка входа для пользователя: {username}")
-                return False
-        except httpx.RequestError as e:
+            data = await auth_api_client.login(username, password)
+            if data:
+                access_token = data.get("access_token")
+                refresh_token = data.get("refresh_token")
+
+                if access_token and refresh_token:
+                    # Проверяем, что пользователь является superuser
+                    user_info = await auth_api_client.get_user_info(access_token)
+                    if user_info and user_info.get("is_superuser"):
+                        request.session.update({
+                            "access_token": access_token,
+                            "refresh_token": refresh_token,
+                            "username": username
+                        })
+                        self._remember_identity(request, access_token, user_info)
+                        logger.info(f"Успешный вход в админку для пользователя: {username}")
+                        return True
+                    else:
+                        logger.warning(f"Пользователь {username} не является суперпользователем")
+                        return False
+
+            logger.warning(f"Неудачная попытка входа для пользователя: {username}")
+            return False
+        except (httpx.RequestError, AuthApiUnavailable) as e:
             logger.error(f"Ошибка подключения к auth API: {e}")
             return False
         except Exception as e:
@@ -88,17 +88,11 @@ class AdminAuth(AuthenticationBackend):
         if access_token and refresh_token:
             try:
                 # Вызываем logout в auth_api с refresh_token в теле запроса
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.post(
-                        f"{settings.auth_api_url}/api/v1/auth/logout",
-                        headers={"Authorization": f"Bearer {access_token}"},
-                        json={"refresh_token": refresh_token}
-                    )
-
-                    if response.status_code == 200:
-                        logger.info("Успешный выход из auth API")
-                    else:
-                        logger.warning(f"Ошибка при выходе из auth API: статус {response.status_code}")
+                status_code = await auth_api_client.logout(access_token, refresh_token)
+                if status_code == 200:
+                    logger.info("Успешный выход из auth API")
+                else:
+                    logger.warning(f"Ошибка при выходе из auth API: статус {status_code}")
             except httpx.RequestError as e:
                 logger.error(f"Ошибка при вызове logout в auth API: {e}")
             except Exception as e:
@@ -111,46 +105,75 @@ class AdminAuth(AuthenticationBackend):
     async def authenticate(self, request: Request) -> bool:
         """
         Проверка аутентификации пользователя.
-        Проверяет access_token через auth_api эндпоинт /me.
+
+        Проверенная личность хранится в подписанной сессии и живет
+        auth_cache_ttl секунд, но не дольше exp токена. После этого
+        access_token заново проверяется через auth_api эндпоинт /me.
+        Если auth_api недоступен, ранее подтвержденный суперпользователь
+        работает еще auth_degraded_grace секунд.
         """
         access_token = request.session.get("access_token")
 
         if not access_token:
             return False
 
-        user_info = await self._get_user_info(access_token)
+        now = time.time()
+        identity = request.session.get("identity") or {}
+        token_exp = get_token_exp(access_token)
+        if token_exp is not None and token_exp <= now:
+            request.session.clear()
+            return False
+        if identity.get("token") == self._token_digest(access_token) and now < identity.get("expires_at", 0):
+            return True
+
+        try:
+            user_info = await auth_api_client.get_user_info(access_token)
+        except AuthApiUnavailable as e:
+            verified_at = identity.get("verified_at", 0)
+            if (identity.get("token") == self._token_digest(access_token)
+                    and now - verified_at < settings.auth_degraded_grace):
+                logger.warning(f"auth API недоступен, сессия продлена без проверки: {e}")
+                return True
+            logger.error(f"auth API недоступен, проверить сессию нельзя: {e}")
+            return False
 
         # Проверяем что пользователь активен и является superuser
         if user_info and user_info.get("is_active") and user_info.get("is_superuser"):
+            self._remember_identity(request, access_token, user_info)
             return True
 
         # Если токен невалиден или пользователь не superuser - очищаем сессию
         request.session.clear()
         return False
 
-    async def _get_user_info(self, access_token: str) -> dict | None:
-        """
-        Получение информации о пользователе из auth_api.
-        Возвращает данные пользователя или None при ошибке.
-        """
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    f"{settings.auth_api_url}/api/v1/auth/me",
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.warning(f"Не удалось получить информацию о пользователе: {response.status_code}")
-                    return None
-        except httpx.RequestError as e:
-            logger.error(f"Ошибка подключения к auth API: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Неожиданная ошибка при получении информации о пользователе: {e}")
-            return None
+    @staticmethod
+    def _token_digest(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode()).hexdigest()[:32]
+
+    def _remember_identity(self, request: Request, access_token: str, user_info: dict) -> None:
+        """Сохранить проверенную личность в сессии до ближайшего из ttl и exp токена"""
+        now = time.time()
+        expires_at = now + settings.auth_cache_ttl
+        token_exp = get_token_exp(access_token)
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        request.session["identity"] = {
+            "token": self._token_digest(access_token),
+            "is_superuser": bool(user_info.get("is_superuser")),
+            "verified_at": now,
+            "expires_at": expires_at,
+        }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Общий HTTP-клиент auth_api и пул БД на время жизни приложения"""
+    await auth_api_client.connect()
+    await replica_router.start()
+    yield
+    await auth_api_client.disconnect()
+    await replica_router.stop()
+    await engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -159,7 +182,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.admin_title,
         description="Admin panel for billing system management",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan,
     )
 
     # Добавляем SessionMiddleware для работы с сессиями
@@ -171,7 +195,7 @@ def create_app() -> FastAPI:
     # Создание и настройка админки
     admin = Admin(
         app=app,
-        engine=engine,
+        session_maker=AsyncSessionLocal,
         authentication_backend=authentication_backend,
         title=settings.admin_title,
     )
@@ -199,6 +223,15 @@ def create_app() -> FastAPI:
         """Проверка здоровья сервиса"""
         return {"status": "healthy", "service": "admin-panel"}
 
+    @app.get("/metrics")
+    async def metrics():
+        """Счетчики обращений к auth_api"""
+        return {
+            "auth_api": auth_api_client.stats(),
+            "db_pool": pool_stats(engine),
+            "db_replicas": replica_router.stats(),
+        }
+
     return app
 
 
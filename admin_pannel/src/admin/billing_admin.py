@@ -1,4 +1,6 @@
 from sqladmin import ModelView
+from sqlalchemy import Select
+from starlette.requests import Request
 
 from src.models.billing import (
     Subscription,
@@ -8,7 +10,17 @@ from src.models.billing import (
 )
 
 
-class SubscriptionAdmin(ModelView, model=Subscription):
+class ReplicaReadMixin:
+    """Списки и счетчики страниц читаются с реплики"""
+
+    def list_query(self, request: Request) -> Select:
+        return super().list_query(request).execution_options(read_only=True)
+
+    def count_query(self, request: Request) -> Select:
+        return super().count_query(request).execution_options(read_only=True)
+
+
+class SubscriptionAdmin(ReplicaReadMixin, ModelView, model=Subscription):
     """Админское представление для подписок"""
 
     name = "Subscription"
@@ -55,7 +67,7 @@ class SubscriptionAdmin(ModelView, model=Subscription):
     }
 
 
-class UserSubscriptionAdmin(ModelView, model=UserSubscription):
+class UserSubscriptionAdmin(ReplicaReadMixin, ModelView, model=UserSubscription):
     """Админское представление для пользовательских подписок"""
 
     name = "User Subscription"
@@ -87,7 +99,7 @@ class UserSubscriptionAdmin(ModelView, model=UserSubscription):
     ]
 
 
-class PaymentAdmin(ModelView, model=Payment):
+class PaymentAdmin(ReplicaReadMixin, ModelView, model=Payment):
     """Админское представление для платежей"""
 
     name = "Payment"
@@ -130,7 +142,7 @@ class PaymentAdmin(ModelView, model=Payment):
     }
 
 
-class RefundAdmin(ModelView, model=Refund):
+class RefundAdmin(ReplicaReadMixin, ModelView, model=Refund):
     """Админское представление для возвратов"""
 
     name = "Refund"
@@ -2,7 +2,7 @@
 
 from fastapi import FastAPI
 from sqladmin import Admin
-from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from src.admin.billing_admin import (
     SubscriptionAdmin,
@@ -12,13 +12,13 @@ from src.admin.billing_admin import (
 )
 
 
-def setup_admin(app: FastAPI, engine: Engine) -> Admin:
+def setup_admin(app: FastAPI, engine: AsyncEngine) -> Admin:
     """
     Настройка и регистрация админ-панели
 
     Args:
         app: FastAPI приложение
-        engine: SQLAlchemy engine
+        engine: асинхронный SQLAlchemy engine
 
     Returns:
         Admin: Настроенная админ-панель
@@ -1,3 +1,4 @@
+from common.db import EngineConfig, ReplicaConfig
 from pydantic_settings import BaseSettings
 
 
@@ -8,6 +9,9 @@ class Settings(BaseSettings):
     postgres_user: str = "billing_user"
     postgres_password: str = "billing_pass"
     postgres_db: str = "billing_db"
+    # Админка — небольшой пул, ей хватает нескольких соединений
+    db_pool: EngineConfig = EngineConfig(pool_size=5, max_overflow=5)
+    db_replicas: ReplicaConfig = ReplicaConfig()
 
     # Auth database settings (for user info)
     auth_postgres_host: str = "localhost"
@@ -22,6 +26,10 @@ class Settings(BaseSettings):
 
     # Auth API settings
     auth_api_url: str = "http://localhost"
+    auth_timeout: float = 3.0
+    auth_max_connections: int = 20
+    auth_cache_ttl: int = 30  # Секунды между проверками токена через /me
+    auth_degraded_grace: int = 300  # Сколько работать без auth_api после последней проверки
 
     # Server settings
     host: str = "0.0.0.0"
@@ -34,6 +42,10 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return self.database_url.replace("postgresql://", "postgresql+asyncpg://")
+
     @property
     def auth_database_url(self) -> str:
         return (
@@ -1,46 +1,20 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from common.db import create_engine, create_routing_session_maker
 
 from .config import settings
 
 
-# Синхронный движок для SQLAdmin
-engine = create_engine(
-    settings.database_url,
-    echo=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
-
-# Асинхронный движок для приложения
-async_engine = create_async_engine(
-    settings.database_url.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+# Асинхронный движок для SQLAdmin и приложения
+engine = create_engine(settings.async_database_url, settings.db_pool)
 
-# Сессии
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-AsyncSessionLocal = sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False
+# Сессии; списки админки читаются с реплик, если они заданы
+AsyncSessionLocal, replica_router = create_routing_session_maker(
+    engine,
+    settings.async_database_url,
+    settings.db_pool,
+    settings.db_replicas,
 )
 
 
-def get_db():
-    """Получить синхронную сессию для SQLAdmin"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 async def get_async_db():
     """Получить асинхронную сессию"""
     async with AsyncSessionLocal() as session:
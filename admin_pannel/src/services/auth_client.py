@@ -0,0 +1,125 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+
+import httpx
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AuthApiUnavailable(Exception):
+    """auth_api не ответил или ответил ошибкой сервера"""
+
+
+def get_token_exp(access_token: str) -> int | None:
+    """
+    Срок действия из payload JWT без проверки подписи.
+    Подпись проверяет auth_api, здесь exp нужен только как верхняя граница кэша.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class AuthApiClient:
+    """
+    Пул соединений к auth_api на время жизни приложения.
+
+    Одновременные запросы /me с одним токеном (страница админки тянет
+    десятки ассетов и AJAX-запросов) объединяются в один вызов.
+    """
+
+    def __init__(self):
+        self.client: httpx.AsyncClient | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        self.requests = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def connect(self) -> None:
+        self.client = httpx.AsyncClient(
+            base_url=settings.auth_api_url,
+            timeout=httpx.Timeout(settings.auth_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.auth_max_connections,
+                max_keepalive_connections=settings.auth_max_connections,
+            ),
+        )
+        logger.info("HTTP-клиент auth_api создан")
+
+    async def disconnect(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def login(self, username: str, password: str) -> dict | None:
+        response = await self.client.post(
+            "/api/v1/auth/login",
+            json={"username": username, "password": password},
+        )
+        if response.status_code == 200:
+            return response.json()
+        return None
+
+    async def logout(self, access_token: str, refresh_token: str) -> int:
+        response = await self.client.post(
+            "/api/v1/auth/logout",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={"refresh_token": refresh_token},
+        )
+        return response.status_code
+
+    async def _fetch_user_info(self, access_token: str) -> dict | None:
+        self.requests += 1
+        try:
+            response = await self.client.get(
+                "/api/v1/auth/me",
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+        except httpx.RequestError as e:
+            self.failures += 1
+            raise AuthApiUnavailable(str(e)) from e
+
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code >= 500:
+            self.failures += 1
+            raise AuthApiUnavailable(f"статус {response.status_code}")
+        logger.warning(f"Не удалось получить информацию о пользователе: {response.status_code}")
+        return None
+
+    async def get_user_info(self, access_token: str) -> dict | None:
+        """
+        Данные пользователя из /me или None, если токен отклонен.
+        AuthApiUnavailable — auth_api недоступен, решение за вызывающим.
+        """
+        key = hashlib.sha256(access_token.encode()).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_user_info(access_token))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: отмена одного запроса не отменяет общий вызов для остальных
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "inflight": len(self._inflight),
+        }
+
+
+# Глобальный экземпляр
+auth_api_client = AuthApiClient()
@@ -0,0 +1,65 @@
+"""login_history: default partition, future partitions and keyset index
+
+Revision ID: c7e1a9d4b2f6
+Revises: fa5212e895e1
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1a9d4b2f6'
+down_revision = 'fa5212e895e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Партиции от последней созданной до текущего месяца + 3 вперёд,
+    # дальше их создаёт LoginHistoryPartitionManager
+    op.execute("""
+        DO $$
+        DECLARE
+            m date := date '2025-12-01';
+        BEGIN
+            WHILE m <= (date_trunc('month', now()) + interval '3 months')::date LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF login_history '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'login_history_' || to_char(m, 'YYYY_MM'),
+                    m,
+                    (m + interval '1 month')::date
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+
+    # Вставки вне созданных партиций больше не падают
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS login_history_default
+        PARTITION OF login_history DEFAULT;
+    """)
+
+    # Индекс для keyset-пагинации, создаётся в каждой партиции
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_login_history_user_time
+        ON login_history (user_id, login_time DESC, id DESC);
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_login_history_user_time;")
+    op.execute("DROP TABLE IF EXISTS login_history_default;")
+    op.execute("""
+        DO $$
+        DECLARE
+            m date := date '2025-12-01';
+        BEGIN
+            WHILE m <= (date_trunc('month', now()) + interval '3 months')::date LOOP
+                EXECUTE format('DROP TABLE IF EXISTS %I', 'login_history_' || to_char(m, 'YYYY_MM'));
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
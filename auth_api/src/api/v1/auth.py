@@ -1,19 +1,22 @@
 from typing import Annotated
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Response
 from fastapi import Query
 
+from src.core.config import settings
+from src.core.passwords import password_hasher
 from src.core.security import (
     verify_password,
     create_access_token,
+    build_access_token_data,
     get_current_user,
+    get_access_token_payload,
     create_refresh_token,
     decode_and_validate_refresh_token,
+    load_user_snapshot,
 )
 from src.db.models.login_history import LoginHistoryRead
-from src.db.models.user import User
-from src.core.security import get_current_user
 from src.schemas.token import Token, RefreshTokenRequest
 from src.schemas.user import (
     UserCreate,
@@ -21,12 +24,14 @@ from src.schemas.user import (
     ChangeCredentialsRequest,
     UserResponse,
     LogoutResponse,
+    UserSnapshot,
 )
-from src.services.role_service import RoleService, get_role_service
+from src.services.token_revocation import token_revocation_publisher
 from src.services.token_service import TokenService, get_token_service
+from src.services.user_cache import UserCacheService, get_user_cache
 from src.services.user_role_service import (UserRoleService,
                                             get_user_role_service)
-from src.services.user_service import UserService, get_user_service
+from src.services.user_service import UserService, get_user_service, rehash_password
 
 logger = logging.getLogger(__name__)
 
@@ -47,14 +52,8 @@ router = APIRouter()
 async def register_user_with_base_role(
         user_data: UserCreate,
         user_service: UserService = Depends(get_user_service),
-        role_service: RoleService = Depends(get_role_service),
-        user_role_service: UserRoleService = Depends(get_user_role_service),
 ):
-    user = await user_service.create_user_with_base_role(
-        user_data,
-        role_service,
-        user_role_service
-    )
+    user = await user_service.create_user_with_base_role(user_data)
     return UserResponse(id=user.id,
                         username=user.username,
                         email=user.email
@@ -75,36 +74,47 @@ async def register_user_with_base_role(
 async def login(
         user_data: UserLogin,
         request: Request,
+        background_tasks: BackgroundTasks,
         user_service: UserService = Depends(get_user_service),
         user_role_service: UserRoleService = Depends(get_user_role_service),
+        user_cache: UserCacheService = Depends(get_user_cache),
 ) -> Token:
     """
     Аутентификация пользователя: проверка логина и пароля,
     сохранение истории входа, генерация access и refresh токенов.
     """
     user = await user_service.get_by_username(user_data.username)
-    if not user or not verify_password(user_data.password,
-                                       user.hashed_password):
+    if not user or not await verify_password(user_data.password,
+                                             user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверные логин или пароль"
         )
 
+    # Хеш старой схемы или стоимости обновляем после ответа
+    if (settings.password_hash.rehash_on_login
+            and password_hasher.needs_update(user.hashed_password)):
+        background_tasks.add_task(rehash_password, user.id,
+                                  user_data.password, user.hashed_password)
+
     user_agent = request.headers.get("User-Agent") or "unknown"
     ip = request.client.host or "unknown"
 
-    await user_service.create_login_history(
+    await user_service.record_login(
         user_id=user.id,
         ip_address=request.client.host,
         user_agent=user_agent,
     )
 
     user_role_names = [role.name for role in await user_role_service.get_user_roles(user.id)]
-    access_token = create_access_token(
-        {"sub": str(user.id),
-         "roles": user_role_names})
+    snapshot = UserSnapshot.from_user(user, user_role_names)
+    # прогреваем кэш: первые запросы с новым токеном не пойдут в БД
+    await user_cache.set_snapshot(snapshot)
+
+    access_token = create_access_token(build_access_token_data(snapshot))
     refresh_token = create_refresh_token(
         {"sub": user.username,
+         "uid": str(user.id),
          "user_agent": request.headers.get("User-Agent"),
          "ip": ip,
          })
@@ -140,7 +150,7 @@ async def change_credentials(
         update_data["email"] = data.new_email
 
     if data.new_password:
-        hashed = user_service.hash_password(data.new_password)
+        hashed = await user_service.hash_password(data.new_password)
         update_data["hashed_password"] = hashed
 
     if not update_data:
@@ -151,6 +161,10 @@ async def change_credentials(
 
     await user_service.update_user(user.username, update_data)
 
+    # после смены пароля выпущенные ранее токены больше не действуют
+    if data.new_password:
+        await token_revocation_publisher.revoke_user(user.id)
+
     return {"detail": "Данные успешно обновлены"}
 
 
@@ -167,17 +181,20 @@ async def change_credentials(
 async def logout(
         refresh_data: RefreshTokenRequest,
         current_user=Depends(get_current_user),
+        access_payload: dict = Depends(get_access_token_payload),
         token_service: TokenService = Depends(get_token_service),
 ) -> dict[str, str]:
     """
     Выход из системы.
-    Добавляет refresh токен в блеклист.
+    Добавляет refresh токен в блеклист и отзывает текущий access токен.
     """
     token = refresh_data.refresh_token
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Токен доступа не найден.")
-    await token_service.invalidise_refresh_token(token)
+    payload = decode_and_validate_refresh_token(token)
+    await token_service.invalidise_refresh_token(payload)
+    await token_revocation_publisher.revoke_token(access_payload)
 
     return LogoutResponse(detail="Успешный выход из системы.")
 
@@ -193,16 +210,23 @@ async def logout(
     },
 )
 async def get_login_history(
+        response: Response,
         current_user=Depends(get_current_user),
         user_service: UserService = Depends(get_user_service),
         page_number: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1, le=100)] = 10,
+        cursor: Annotated[str | None, Query(description="Значение заголовка X-Next-Cursor")] = None,
 ):
-    return await user_service.get_user_login_history(
+    records, next_cursor = await user_service.get_user_login_history(
         user_id=current_user.id,
         page_number=page_number,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
     )
+    # тело ответа остается списком, курсор следующей страницы — в заголовке
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
 
 
 @router.post("/refresh",
@@ -211,6 +235,8 @@ async def refresh_token(
         request: Request,
         refresh_data: RefreshTokenRequest,
         token_service: TokenService = Depends(get_token_service),
+        user_service: UserService = Depends(get_user_service),
+        user_cache: UserCacheService = Depends(get_user_cache),
 ) -> Token:
     """
     Обновляет access и refresh токены.
@@ -229,10 +255,7 @@ async def refresh_token(
     # 3. Получаем данные и валидируем по секрету и сроку жизни токена
     payload = decode_and_validate_refresh_token(refresh_token)
 
-    # 4. Проверить по jti что токен не в блеклисте
-    await token_service.check_in_blacklist(payload.get("jti"))
-
-    # 5. Сравнить текущие IP и User-Agent с последним логином
+    # 4. Сравнить текущие IP и User-Agent с последним логином
     if current_user_agent != payload.get("user_agent"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -242,12 +265,24 @@ async def refresh_token(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Подозрительное местоположение. Для безопасности нужно еще раз залогиниться.")
 
-    # 6. Добавить jti токена в блеклист
-    await token_service.invalidise_refresh_token(refresh_token)
+    # 5. Атомарно погасить jti: повторное использование токена получит 401
+    await token_service.consume_refresh_token(payload)
+
+    # 6. Получить актуальный снимок пользователя для claims access-токена
+    user_id = payload.get("uid")
+    if not user_id:
+        # refresh-токены, выданные до появления uid
+        user = await user_service.get_by_username(payload.get("sub"))
+        user_id = user.id if user else None
+    snapshot = await load_user_snapshot(user_id, user_service, user_cache) if user_id else None
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Пользователь не найден.")
 
     # 7. Создать новые access_token и refresh_token.
-    access_token = create_access_token({"sub": payload.get("sub")})
+    access_token = create_access_token(build_access_token_data(snapshot))
     refresh_token = create_refresh_token({"sub": payload.get("sub"),
+                                          "uid": str(snapshot.id),
                                           "user_agent": current_user_agent,
                                           "ip": current_ip,
                                           })
@@ -255,7 +290,7 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    user: User = Depends(get_current_user),
+    user: UserSnapshot = Depends(get_current_user),
 ):
     """
     Получение информации о текущем пользователе по JWT.
@@ -6,12 +6,12 @@ from httpx import HTTPStatusError
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.core.security import (
+    build_access_token_data,
     create_access_token,
     create_refresh_token,
 )
-from src.schemas.user import UserCreate
+from src.schemas.user import UserCreate, UserSnapshot
 from src.schemas.token import Token
-from src.services.role_service import RoleService, get_role_service
 from src.services.user_role_service import (UserRoleService,
                                             get_user_role_service)
 from src.services.user_service import UserService, get_user_service
@@ -36,7 +36,6 @@ def redirect_to_yandex_oauth(
 async def handle_yandex_oauth_callback(
     request: Request,
     user_service: UserService = Depends(get_user_service),
-    role_service: RoleService = Depends(get_role_service),
     user_role_service: UserRoleService = Depends(get_user_role_service),
     oauth_service: YandexOAuthService = Depends(get_oauth_service),
 ) -> Token:
@@ -80,26 +79,25 @@ async def handle_yandex_oauth_callback(
                 email=user_email,
                 password=password
             )
-            user = await user_service.create_user_with_base_role(
-                                                    user_data,
-                                                    role_service,
-                                                    user_role_service,
-                                                    )
+            user = await user_service.create_user_with_base_role(user_data)
 
         # 6. Записываем вход в логин хистори
         user_agent = request.headers.get("User-Agent") or "unknown"
         ip = request.client.host or "unknown"
 
-        await user_service.create_login_history(
+        await user_service.record_login(
             user_id=user.id,
             ip_address=ip,
             user_agent=user_agent,
         )
 
         # 5. Логиним, получаем токены. Отдаем юзеру.
-        access_token = create_access_token({"sub": str(user.id)})
+        user_role_names = [role.name for role in await user_role_service.get_user_roles(user.id)]
+        snapshot = UserSnapshot.from_user(user, user_role_names)
+        access_token = create_access_token(build_access_token_data(snapshot))
         refresh_token = create_refresh_token(
             {"sub": user.username,
+             "uid": str(user.id),
              "user_agent": user_agent,
              "ip": ip,
              })
@@ -3,6 +3,7 @@ import asyncio
 import typer
 
 from src.core.config import settings
+from src.core.passwords import password_hasher
 from src.db.session import async_session_maker
 from src.schemas.user import UserCreate
 from src.services.user_service import UserService
@@ -49,6 +50,8 @@ def create_superuser(
         except Exception as e:
             typer.echo(f"Ошибка: {e}")
             raise typer.Exit(code=1)
+        finally:
+            password_hasher.shutdown()
 
     asyncio.run(_create())
 
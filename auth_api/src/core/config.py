@@ -1,6 +1,7 @@
 import logging
 from pathlib import Path
 
+from common.db import EngineConfig, ReplicaConfig
 from pydantic import BaseModel, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -39,6 +40,8 @@ class PostgresConfig(BaseModel):
     password: str
     host: str
     port: int
+    pool: EngineConfig = EngineConfig()
+    replicas: ReplicaConfig = ReplicaConfig()
 
     @computed_field
     @property
@@ -89,12 +92,41 @@ class JWTConfig(BaseModel):
     secret_refresh: str
     expire_access_minutes: int
     expire_refresh_days: int
+    # Доверять подписанным claims (is_active, is_superuser, roles) в access-токене
+    stateless_verification: bool = True
+
+
+class UserCacheConfig(BaseModel):
+    ttl: int = 60  # Время жизни снимка пользователя в Redis (секунды)
+
+
+class LoginHistoryConfig(BaseModel):
+    queue_size: int = 10000  # При переполнении запись идет напрямую в БД
+    batch_size: int = 500
+    flush_interval: float = 1.0  # Секунды
+    partitions_ahead: int = 3  # Сколько месячных партиций держать впереди
+    partition_check_interval: float = 3600.0
+    retention_months: int = 0  # 0 — хранить все партиции
+    retention_action: str = "detach"  # detach | drop
 
 
 class CliConfig(BaseModel):
     secret: str = "secret"
 
 
+class PasswordHashConfig(BaseModel):
+    executor: str = "thread"  # thread | process
+    max_workers: int = 4  # Потоков/процессов для bcrypt
+    max_queue: int = 64  # Задач в очереди пула сверх max_workers
+    acquire_timeout: float = 5.0  # Ожидание места в очереди до 503 (секунды)
+    scheme: str = "bcrypt"  # Схема для новых хешей: bcrypt | argon2
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 2
+    argon2_memory_cost: int = 19456  # KiB
+    argon2_parallelism: int = 1
+    rehash_on_login: bool = True  # Перехешировать устаревшие хеши после входа
+
+
 class RateLimitConfig(BaseModel):
     rate_limit: int = 10  # Максимальное количество запросов
     leak_rate: int = 1  # Скорость утечки (запросов в секунду)
@@ -113,8 +145,14 @@ class KafkaConfig(BaseModel):
     consumer_group_id: str = "auth-service-group"
     request_timeout_ms: int = 30000
     auto_offset_reset: str = "earliest"
-    enable_auto_commit: bool = True
+    enable_auto_commit: bool = False  # offset коммитится после транзакции в БД
     subscriber_role_name: str = "SUBSCRIBER"
+    batch_size: int = 500  # max_records для getmany
+    batch_timeout_ms: int = 1000
+    # пауза партиции после ошибки обработки растет от start до border, сек
+    retry_start_sleep_time: float = 1.0
+    retry_border_sleep_time: float = 60.0
+    topic_token_revocations: str = "token-revocations"  # Отзывы токенов для billing/payment
 
     @property
     def bootstrap_servers_list(self) -> list[str]:
@@ -136,8 +174,11 @@ class Settings(BaseSettings):
     postgres: PostgresConfig
     redis: RedisConfig
     jwt: JWTConfig
+    user_cache: UserCacheConfig = UserCacheConfig()
+    login_history: LoginHistoryConfig = LoginHistoryConfig()
     cli: CliConfig
     rate_limit: RateLimitConfig = RateLimitConfig()  # что бы не искал имя в .env файле
+    password_hash: PasswordHashConfig = PasswordHashConfig()
     oauth_google: OAuthGoogleConfig
     oauth_yandex: OAuthYandexConfig
     otlp: OTLPConfig = OTLPConfig()
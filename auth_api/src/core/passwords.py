@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from src.core.config import PasswordHashConfig, settings
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_pwd_context(config: PasswordHashConfig) -> CryptContext:
+    """
+    Общий контекст паролей: новые хеши создаются схемой config.scheme
+    с заданной стоимостью. Хеши другой схемы или с другой стоимостью
+    считаются устаревшими (needs_update) и перехешируются после входа.
+    """
+    if config.scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Неизвестная схема хеширования паролей: {config.scheme}")
+    schemes = [config.scheme] + [s for s in PASSWORD_SCHEMES if s != config.scheme]
+    return CryptContext(
+        schemes=schemes,
+        default=config.scheme,
+        deprecated="auto",
+        bcrypt__rounds=config.bcrypt_rounds,
+        bcrypt__min_rounds=config.bcrypt_rounds,
+        bcrypt__max_rounds=config.bcrypt_rounds,
+        argon2__type="ID",
+        argon2__rounds=config.argon2_time_cost,
+        argon2__min_rounds=config.argon2_time_cost,
+        argon2__max_rounds=config.argon2_time_cost,
+        argon2__memory_cost=config.argon2_memory_cost,
+        argon2__parallelism=config.argon2_parallelism,
+    )
+
+
+pwd_context = build_pwd_context(settings.password_hash)
+
+
+# Функции уровня модуля, чтобы их можно было передать в ProcessPoolExecutor
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Асинхронный фасад для хеширования паролей.
+
+    Хеширование выполняется в пуле потоков или процессов и не блокирует event loop.
+    Одновременно в пуле находится не больше max_workers + max_queue задач,
+    остальные ждут места не дольше acquire_timeout и получают 503.
+    """
+
+    def __init__(
+            self,
+            executor: str = "thread",
+            max_workers: int = 4,
+            max_queue: int = 64,
+            acquire_timeout: float = 5.0,
+    ):
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.acquire_timeout = acquire_timeout
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self.in_pool = 0  # выполняются или стоят в очереди пула
+        self.waiting = 0  # ждут места в очереди
+        self.completed = 0
+        self.failed = 0  # упали в пуле или отменены
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # семафор привязан к event loop (CLI и тесты запускают свои циклы)
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._loop = loop
+        return self._slots
+
+    async def _run(self, func, *args):
+        slots = self._get_slots()
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            logger.warning("Очередь хеширования паролей переполнена: %s", self.stats())
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервис перегружен, попробуйте позже",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self.waiting -= 1
+
+        self.in_pool += 1
+        try:
+            result = await self._loop.run_in_executor(self._get_executor(), func, *args)
+        except BaseException:
+            # ошибка пула или отмена запроса — не пропускная способность
+            self.failed += 1
+            raise
+        finally:
+            self.in_pool -= 1
+            slots.release()
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def needs_update(self, hashed_password: str) -> bool:
+        """Хеш создан устаревшей схемой или с другой стоимостью"""
+        return pwd_context.needs_update(hashed_password)
+
+    def stats(self) -> dict:
+        """Метрики глубины очереди"""
+        return {
+            "scheme": settings.password_hash.scheme,
+            "bcrypt_rounds": settings.password_hash.bcrypt_rounds,
+            "argon2_time_cost": settings.password_hash.argon2_time_cost,
+            "argon2_memory_cost": settings.password_hash.argon2_memory_cost,
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_pool": self.in_pool,
+            "queued": max(0, self.in_pool - self.max_workers),
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Глобальный экземпляр
+password_hasher = PasswordHasher(
+    executor=settings.password_hash.executor,
+    max_workers=settings.password_hash.max_workers,
+    max_queue=settings.password_hash.max_queue,
+    acquire_timeout=settings.password_hash.acquire_timeout,
+)
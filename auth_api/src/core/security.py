@@ -4,28 +4,48 @@ from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 from src.core.config import settings
+from src.core.passwords import password_hasher
+from src.schemas.user import AccessTokenClaims, UserSnapshot
+from src.services.user_cache import UserCacheService, get_user_cache
 from src.services.user_service import get_user_service, UserService
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 bearer_scheme = HTTPBearer()
 
+# claims, по которым права проверяются без обращения к БД
+ACCESS_TOKEN_CLAIMS = {"sub", "is_active", "is_superuser", "roles"}
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.jwt.expire_access_minutes)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.jwt.expire_access_minutes)
+    # jti и iat нужны сервисам, которые проверяют отзыв токена локально;
+    # iat с долями секунды: токен, выданный сразу после отзыва, не попадет под него
+    to_encode.update({
+        "exp": expire,
+        "jti": str(uuid.uuid4()),
+        "iat": now.timestamp(),
+    })
     return jwt.encode(to_encode, settings.jwt.secret_access,
                       algorithm=settings.jwt.algorithm)
 
 
+def build_access_token_data(user: UserSnapshot) -> dict:
+    """Данные access-токена с подписанными claims пользователя"""
+    return {
+        "sub": str(user.id),
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+        "roles": user.roles,
+    }
+
+
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(
@@ -54,35 +74,75 @@ def decode_and_validate_refresh_token(token: str) -> dict:
                             detail="Токен не проходил валидацию.")
 
 
-async def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-        user_service: UserService = Depends(get_user_service),
-):
-    token = credentials.credentials
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Не удалось проверить учетные данные",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token,
                              settings.jwt.secret_access,
                              algorithms=[settings.jwt.algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
 
-    user = await user_service.get_by_user_id(user_id)
+
+def get_access_token_payload(
+        credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+) -> dict:
+    """Claims текущего access-токена"""
+    return decode_access_token(credentials.credentials)
+
+
+async def load_user_snapshot(
+        user_id: str,
+        user_service: UserService,
+        user_cache: UserCacheService,
+) -> UserSnapshot | None:
+    """Снимок пользователя из кэша, при промахе — из БД с записью в кэш"""
+    snapshot = await user_cache.get_snapshot(user_id)
+    if snapshot is None:
+        snapshot = await user_service.get_snapshot(user_id)
+        if snapshot is not None:
+            await user_cache.set_snapshot(snapshot)
+    return snapshot
+
+
+async def get_current_user(
+        credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+        user_service: UserService = Depends(get_user_service),
+        user_cache: UserCacheService = Depends(get_user_cache),
+) -> UserSnapshot:
+    payload = decode_access_token(credentials.credentials)
+    user = await load_user_snapshot(payload["sub"], user_service, user_cache)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
-async def get_superuser_user(current_user=Depends(get_current_user)):
-    if not getattr(current_user, "is_superuser", False):
+async def get_superuser_user(
+        credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+        user_service: UserService = Depends(get_user_service),
+        user_cache: UserCacheService = Depends(get_user_cache),
+) -> AccessTokenClaims | UserSnapshot:
+    payload = decode_access_token(credentials.credentials)
+
+    # Токен с claims проверяется без кэша и БД
+    if settings.jwt.stateless_verification and ACCESS_TOKEN_CLAIMS <= payload.keys():
+        current_user = AccessTokenClaims(**payload)
+    else:
+        current_user = await load_user_snapshot(payload["sub"], user_service, user_cache)
+        if current_user is None:
+            raise _credentials_exception()
+
+    if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="У вас не достаточно прав"
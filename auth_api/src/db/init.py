@@ -1,14 +1,13 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
 
-from src.core.config import settings
-
-engine = None
-async_session_maker = None
+from src.db.session import engine
 
 
 async def init_db():
-    global engine, async_session_maker
+    """Проверить подключение и открыть первое соединение пула"""
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
 
-    engine = create_async_engine(settings.postgres.async_database_url, echo=True)
-    async_session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+async def close_db():
+    await engine.dispose()
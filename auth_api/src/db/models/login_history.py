@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from src.db.base import Base
@@ -15,6 +15,11 @@ class LoginHistory(Base):
 
     user = relationship("User", back_populates="login_history")
 
+    # Таблица партиционирована по login_time, см. миграции fa5212e895e1 и c7e1a9d4b2f6
+    __table_args__ = (
+        Index("ix_login_history_user_time", "user_id", login_time.desc(), id.desc()),
+    )
+
 
 class LoginHistoryRead(BaseModel):
     login_time: datetime
@@ -1,12 +1,20 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from common.db import create_engine, create_routing_session_maker
 
 from src.core.config import settings
 
-engine = create_async_engine(settings.postgres.async_database_url, echo=True)
-async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# Единственный движок primary, параметры пула — settings.postgres.pool.
+# Чтение, помеченное read_only, уходит на реплики из settings.postgres.replicas.
+# Помечаются только списки: аутентификация и заполнение кэша читают с primary.
+engine = create_engine(settings.postgres.async_database_url, settings.postgres.pool)
+async_session_maker, replica_router = create_routing_session_maker(
+    engine,
+    settings.postgres.async_database_url,
+    settings.postgres.pool,
+    settings.postgres.replicas,
+)
 
 
 async def get_db():
     async with async_session_maker() as session:
         yield session
+
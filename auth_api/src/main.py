@@ -7,14 +7,22 @@ from fastapi import FastAPI, APIRouter, Request
 from starlette.middleware.sessions import SessionMiddleware
 from redis.asyncio import Redis
 import httpx
+from common.db import pool_stats
 
 from src.api.v1 import auth, roles, user_roles, oauth_yandex, oauth_google
 from src.core.config import settings
+from src.core.passwords import password_hasher
 from src.core.tracing import setup_tracing
 from src.db import redis
-from src.db.init import init_db
-from src.middleware.rate_limiter import RateLimiterMiddleware
+from src.db.init import close_db, init_db
+from src.db.session import engine, replica_router
+from src.middleware.rate_limiter import RateLimiterMiddleware, init_rate_limiter
+from src.services.oauth_google import GoogleOAuthService
+from src.services.oauth_yandex import YandexOAuthService
 from src.services.kafka_consumer import start_kafka_consumer, stop_kafka_consumer
+from src.services.login_history_partitions import login_history_partition_manager
+from src.services.login_history_writer import login_history_writer
+from src.services.token_revocation import token_revocation_publisher
 
 healthcheck_route = APIRouter()
 
@@ -24,14 +32,34 @@ def health_check() -> dict:
     return {"status": "ok"}
 
 
+@healthcheck_route.get("/metrics")
+def metrics() -> dict:
+    return {
+        "password_hasher": password_hasher.stats(),
+        "login_history_writer": login_history_writer.stats(),
+        "token_revocation": token_revocation_publisher.stats(),
+        "db_pool": pool_stats(engine),
+        "db_replicas": replica_router.stats(),
+    }
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     if not settings.testing:
         await init_db()
 
     redis.redis = Redis(host=settings.redis.host, port=settings.redis.port)
+    await init_rate_limiter(redis.redis)
 
+    # Долгоживущие объекты приложения, сервисы запроса создаются через Depends
     app.state.http_client = httpx.AsyncClient()
+    app.state.oauth_google = GoogleOAuthService(http_client=app.state.http_client)
+    app.state.oauth_yandex = YandexOAuthService(http_client=app.state.http_client)
+
+    await replica_router.start()
+    await login_history_partition_manager.start()
+    await login_history_writer.start()
+    await token_revocation_publisher.start()
 
     # Запускаем Kafka consumer в фоновой задаче
     kafka_task = asyncio.create_task(start_kafka_consumer())
@@ -46,6 +74,12 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
         await app.state.http_client.aclose()
+        await token_revocation_publisher.stop()
+        await login_history_writer.stop()
+        await login_history_partition_manager.stop()
+        await replica_router.stop()
+        password_hasher.shutdown()
+        await close_db()
 
 
 app = FastAPI(
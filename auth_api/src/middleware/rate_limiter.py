@@ -1,13 +1,75 @@
 import hashlib
-import time
+import logging
 import uuid
+from typing import NamedTuple
 
-from fastapi import Request, HTTPException, status
+from fastapi import Request
 from fastapi.responses import JSONResponse
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.core.config import settings
-from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Пополнение и списание токена за один атомарный вызов на стороне Redis.
+# Время берется из Redis, чтобы у всех воркеров были одинаковые часы.
+LEAKY_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'last_checked')
+local tokens = tonumber(bucket[1])
+local last_checked = tonumber(bucket[2])
+if tokens == nil or last_checked == nil then
+    tokens = capacity
+    last_checked = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - last_checked) * rate)
+
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'last_checked', tostring(now))
+-- ведро полностью пополняется за capacity / rate секунд, дальше ключ не нужен
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+
+local retry_after = 0
+if allowed == 0 then
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+local reset_after = math.ceil((capacity - tokens) / rate)
+
+return {allowed, math.floor(tokens), retry_after, reset_after}
+"""
+
+_leaky_bucket_script: AsyncScript | None = None
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: int
+    reset_after: int
+
+
+async def init_rate_limiter(redis_client: Redis) -> None:
+    """Регистрирует Lua-скрипт один раз при старте приложения"""
+    global _leaky_bucket_script
+    _leaky_bucket_script = redis_client.register_script(LEAKY_BUCKET_LUA)
+    try:
+        await redis_client.script_load(LEAKY_BUCKET_LUA)
+    except RedisError as e:
+        # скрипт будет загружен при первом вызове
+        logger.warning(f"Не удалось загрузить скрипт rate limiter: {e}")
 
 
 def generate_rate_limit_key(request: Request):
@@ -30,52 +92,47 @@ def generate_rate_limit_key(request: Request):
     return unique_key
 
 
-async def leaky_bucket_rate_limiter(key: str):
-    current_time = time.time()
-    redis_client = await get_redis()
-    bucket = await redis_client.hgetall(key)
-
-    if not bucket:
-        # Если ведро не существует, создаем новое
-        bucket = {'tokens': settings.rate_limit.rate_limit, 'last_checked': current_time}
-    else:
-        # Преобразуем байтовые строки в строки
-        bucket = {k.decode('utf-8'): v.decode('utf-8') for k, v in bucket.items()}
-
-        # Обновляем количество токенов в ведре
-        elapsed_time = current_time - float(bucket['last_checked'])
-        bucket['tokens'] = min(
-            settings.rate_limit.rate_limit,
-            float(bucket['tokens']) + elapsed_time * settings.rate_limit.leak_rate
+async def leaky_bucket_rate_limiter(key: str) -> RateLimitResult | None:
+    """
+    Один round-trip в Redis на запрос.
+    Возвращает None, если лимитер недоступен (запрос пропускается).
+    """
+    if _leaky_bucket_script is None:
+        return None
+    try:
+        allowed, remaining, retry_after, reset_after = await _leaky_bucket_script(
+            keys=[f"rate_limit:{key}"],
+            args=[settings.rate_limit.rate_limit, settings.rate_limit.leak_rate],
         )
-        bucket['last_checked'] = current_time
-
-    if float(bucket['tokens']) < 1:
-        # Если нет токенов, отклоняем запрос
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too Many Requests")
-
-    # Уменьшаем количество токенов и сохраняем состояние ведра
-    bucket['tokens'] -= 1
-    await redis_client.hmset(key, bucket)
+    except RedisError as e:
+        logger.error(f"Ошибка rate limiter: {e}")
+        return None
+    return RateLimitResult(bool(allowed), int(remaining), int(retry_after), int(reset_after))
 
 
 class RateLimiterMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         # Проверяем наличие session_id в cookies
         session_id = request.cookies.get("session_id")
-        response = await call_next(request)
+
+        # генерим уникальный ключ пользователя и проверяем лимит до обработчика
+        key = generate_rate_limit_key(request)
+        result = await leaky_bucket_rate_limiter(key)
+
+        if result is not None and not result.allowed:
+            response = JSONResponse(status_code=429, content={"detail": "Слишком много запросов"})
+            response.headers["Retry-After"] = str(result.retry_after)
+        else:
+            response = await call_next(request)
+
+        if result is not None:
+            response.headers["X-RateLimit-Limit"] = str(settings.rate_limit.rate_limit)
+            response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+            response.headers["X-RateLimit-Reset"] = str(result.reset_after)
 
         if not session_id:
             # Создаем новый session_id и сохраняем в cookies
             session_id = str(uuid.uuid4())
             response.set_cookie(key="session_id", value=session_id, httponly=True)
 
-        try:
-            # генерим уникальный ключ пользователя
-            key = generate_rate_limit_key(request)
-            await leaky_bucket_rate_limiter(key)
-        except HTTPException as e:
-            if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
-                return JSONResponse(status_code=429, content={"detail": "Слишком много запросов"})
-
         return response
@@ -42,3 +42,32 @@ class ChangeCredentialsRequest(BaseModel):
 
 class LogoutResponse(BaseModel):
     detail: str
+
+
+class UserSnapshot(BaseModel):
+    """Снимок пользователя для проверки access-токена без запроса в БД"""
+    id: UUID
+    username: str
+    email: str
+    is_active: bool = True
+    is_superuser: bool = False
+    roles: list[str] = []
+
+    @classmethod
+    def from_user(cls, user, roles: list[str]) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+            roles=roles,
+        )
+
+
+class AccessTokenClaims(BaseModel):
+    """Подписанные claims access-токена"""
+    sub: str
+    is_active: bool
+    is_superuser: bool
+    roles: list[str] = []
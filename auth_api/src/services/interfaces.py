@@ -14,6 +14,11 @@ class CacheService(ABC):
         """Запись данных в кэш"""
         pass
 
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Удаление данных из кэша"""
+        pass
+
 
 class StorageService(ABC):
     """Интерфейс для работы с хранилищем данных"""
@@ -1,18 +1,28 @@
 import asyncio
 import json
 import logging
+import random
+from uuid import UUID
 
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, TopicPartition
 from aiokafka.errors import KafkaError
+from sqlalchemy import delete, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
+from src.db.models.role import user_roles_table
+from src.db.models.user import User
 from src.db.session import async_session_maker
 from src.services.role_service import RoleService
-from src.services.user_role_service import UserRoleService
+from src.services.user_cache import get_user_cache_service
 
 logger = logging.getLogger(__name__)
 
+SUBSCRIBE = "SUBSCRIBE"
+UNSUBSCRIBE = "UNSUBSCRIBE"
+
 
 class KafkaConsumerService:
     """Сервис для прослушивания событий из Kafka и обработки подписок."""
@@ -25,6 +35,11 @@ class KafkaConsumerService:
         self.group_id = settings.kafka.consumer_group_id
         self.subscriber_role_name = settings.kafka.subscriber_role_name
         self._running = False
+        self._subscriber_role_id: UUID | None = None
+        self._role_lock = asyncio.Lock()
+        # партиции с ошибкой обработки: число ошибок подряд и время возобновления
+        self._failures: dict[TopicPartition, int] = {}
+        self._paused_until: dict[TopicPartition, float] = {}
         logger.info(
             f"KafkaConsumerService инициализирован. "
             f"Брокеры: {self.bootstrap_servers}, топик: {self.topic}"
@@ -51,6 +66,9 @@ class KafkaConsumerService:
     async def disconnect(self) -> None:
         """Отключение от Kafka."""
         self._running = False
+        self._subscriber_role_id = None
+        self._failures.clear()
+        self._paused_until.clear()
         if self.consumer:
             try:
                 await self.consumer.stop()
@@ -84,103 +102,159 @@ class KafkaConsumerService:
         
         return str(role.id)
 
-    async def _handle_subscribe_event(
-        self,
-        user_id: str,
-        db: AsyncSession
-    ) -> None:
-        """Обработка события подписки - добавление роли SUBSCRIBER."""
-        try:
-            role_id = await self._get_or_create_subscriber_role(db)
-            if not role_id:
-                logger.error(
-                    f"Не удалось обработать подписку для user_id={user_id}: "
-                    f"роль '{self.subscriber_role_name}' не существует"
-                )
-                return
-
-            user_role_service = UserRoleService(db)
-            success = await user_role_service.assign_role_to_user(user_id, role_id)
-            
-            if success:
-                logger.info(
-                    f"Роль '{self.subscriber_role_name}' успешно назначена "
-                    f"пользователю {user_id}"
-                )
-            else:
-                logger.warning(
-                    f"Не удалось назначить роль пользователю {user_id}. "
-                    "Возможно, пользователь не существует."
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке подписки для user_id={user_id}: {e}")
-
-    async def _handle_unsubscribe_event(
-        self,
-        user_id: str,
-        db: AsyncSession
-    ) -> None:
-        """Обработка события отписки - удаление роли SUBSCRIBER."""
-        try:
-            role_id = await self._get_or_create_subscriber_role(db)
-            if not role_id:
-                logger.error(
-                    f"Не удалось обработать отписку для user_id={user_id}: "
-                    f"роль '{self.subscriber_role_name}' не существует"
-                )
-                return
-
-            user_role_service = UserRoleService(db)
-            success = await user_role_service.remove_role_from_user(user_id, role_id)
-            
-            if success:
-                logger.info(
-                    f"Роль '{self.subscriber_role_name}' успешно удалена "
-                    f"у пользователя {user_id}"
-                )
-            else:
-                logger.warning(
-                    f"Не удалось удалить роль у пользователя {user_id}. "
-                    "Возможно, роль не была назначена."
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке отписки для user_id={user_id}: {e}")
+    async def _get_subscriber_role_id(self) -> UUID | None:
+        """Id роли подписчика, кешируется на время жизни consumer."""
+        async with self._role_lock:
+            if self._subscriber_role_id is None:
+                async with async_session_maker() as db:
+                    role_id = await self._get_or_create_subscriber_role(db)
+                if role_id:
+                    self._subscriber_role_id = UUID(role_id)
+        return self._subscriber_role_id
 
-    async def _process_message(self, message) -> None:
-        """Обработка одного сообщения из Kafka."""
-        try:
+    @staticmethod
+    def _collapse_events(messages) -> dict[UUID, str]:
+        """
+        Оставляет последнее событие по каждому пользователю.
+        Сообщения партиции идут по возрастанию offset, поэтому последнее побеждает.
+        """
+        latest: dict[UUID, str] = {}
+        for message in messages:
             event_data = message.value
+            if not isinstance(event_data, dict):
+                logger.warning(f"Получено некорректное сообщение: {event_data}")
+                continue
             event_type = event_data.get("event_type")
             user_id = event_data.get("user_id")
-
-            if not event_type or not user_id:
+            if event_type not in (SUBSCRIBE, UNSUBSCRIBE) or not user_id:
                 logger.warning(
                     f"Получено некорректное сообщение: {event_data}. "
-                    "Отсутствует event_type или user_id."
+                    "Ожидаются event_type SUBSCRIBE/UNSUBSCRIBE и user_id."
                 )
-                return
+                continue
+            try:
+                latest[UUID(str(user_id))] = event_type
+            except ValueError:
+                logger.warning(f"Некорректный user_id в событии: {user_id}")
+        return latest
 
-            logger.info(
-                f"Получено событие: event_type={event_type}, "
-                f"user_id={user_id}, partition={message.partition}, "
-                f"offset={message.offset}"
-            )
+    async def _apply_events(self, latest: dict[UUID, str], role_id: UUID) -> list[UUID]:
+        """
+        Применяет события пачки двумя запросами в одной транзакции.
+        Возвращает пользователей, у которых реально изменились роли.
+        """
+        subscribe_ids = [user_id for user_id, event in latest.items() if event == SUBSCRIBE]
+        unsubscribe_ids = [user_id for user_id, event in latest.items() if event == UNSUBSCRIBE]
+        changed: list[UUID] = []
 
-            async with async_session_maker() as db:
-                if event_type == "SUBSCRIBE":
-                    await self._handle_subscribe_event(user_id, db)
-                elif event_type == "UNSUBSCRIBE":
-                    await self._handle_unsubscribe_event(user_id, db)
-                else:
-                    logger.warning(
-                        f"Неизвестный тип события: {event_type}. "
-                        "Поддерживаются: SUBSCRIBE, UNSUBSCRIBE."
+        async with async_session_maker() as db:
+            async with db.begin():
+                if subscribe_ids:
+                    # несуществующие пользователи отсекаются выборкой из users
+                    result = await db.execute(
+                        pg_insert(user_roles_table)
+                        .from_select(
+                            ["user_id", "role_id"],
+                            select(User.id, literal(role_id, PG_UUID(as_uuid=True)))
+                            .where(User.id.in_(subscribe_ids)),
+                        )
+                        .on_conflict_do_nothing()
+                        .returning(user_roles_table.c.user_id)
                     )
+                    changed.extend(result.scalars().all())
+                if unsubscribe_ids:
+                    result = await db.execute(
+                        delete(user_roles_table)
+                        .where(
+                            user_roles_table.c.user_id.in_(unsubscribe_ids),
+                            user_roles_table.c.role_id == role_id,
+                        )
+                        .returning(user_roles_table.c.user_id)
+                    )
+                    changed.extend(result.scalars().all())
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Ошибка декодирования JSON: {e}")
+        logger.info(
+            f"Обработана пачка событий: подписок={len(subscribe_ids)}, "
+            f"отписок={len(unsubscribe_ids)}, изменено={len(changed)}"
+        )
+        return changed
+
+    async def _process_partition(self, tp: TopicPartition, messages) -> bool:
+        """Обработка пачки одной партиции. True — offset можно коммитить."""
+        try:
+            latest = self._collapse_events(messages)
+            if latest:
+                role_id = await self._get_subscriber_role_id()
+                if role_id is None:
+                    logger.error(
+                        f"Роль '{self.subscriber_role_name}' не существует, "
+                        f"пачка партиции {tp.partition} будет прочитана повторно"
+                    )
+                    return False
+                changed = await self._apply_events(latest, role_id)
+                if changed:
+                    await get_user_cache_service().invalidate(*changed)
+            return True
+        except IntegrityError as e:
+            # роль могли удалить — сбрасываем кеш id, пачка будет прочитана повторно
+            self._subscriber_role_id = None
+            logger.error(f"Ошибка при обработке пачки партиции {tp.partition}: {e}")
+            return False
         except Exception as e:
-            logger.error(f"Ошибка при обработке сообщения: {e}")
+            logger.error(f"Ошибка при обработке пачки партиции {tp.partition}: {e}")
+            return False
+
+    async def _process_batch(self, batches: dict) -> None:
+        """
+        Партиции обрабатываются параллельно: ключ сообщения — user_id,
+        так что один пользователь всегда в одной партиции.
+        Offset коммитится только после коммита транзакции в БД.
+        """
+        items = list(batches.items())
+        results = await asyncio.gather(
+            *(self._process_partition(tp, messages) for tp, messages in items)
+        )
+
+        offsets = {}
+        for (tp, messages), ok in zip(items, results):
+            if ok:
+                offsets[tp] = messages[-1].offset + 1
+                self._failures.pop(tp, None)
+            else:
+                # перечитаем пачку, когда закончится пауза партиции
+                self.consumer.seek(tp, messages[0].offset)
+                self._pause_partition(tp)
+
+        if offsets and not settings.kafka.enable_auto_commit:
+            await self.consumer.commit(offsets)
+
+    def _pause_partition(self, tp: TopicPartition) -> None:
+        """
+        Ставит партицию на паузу с растущей задержкой, чтобы не перечитывать
+        пачку в цикле, пока БД недоступна. Остальные партиции читаются дальше.
+        """
+        failures = self._failures.get(tp, 0) + 1
+        self._failures[tp] = failures
+        delay = min(settings.kafka.retry_border_sleep_time,
+                    settings.kafka.retry_start_sleep_time * (2 ** (failures - 1)))
+        delay = random.uniform(delay / 2, delay)
+        self.consumer.pause(tp)
+        self._paused_until[tp] = asyncio.get_running_loop().time() + delay
+        logger.warning(f"Партиция {tp.partition} на паузе {delay:.1f} с (ошибок подряд: {failures})")
+
+    def _resume_partitions(self) -> None:
+        """Возобновляет партиции, у которых закончилась пауза; отобранные ребалансом забываются"""
+        if not self._paused_until:
+            return
+        now = asyncio.get_running_loop().time()
+        assigned = self.consumer.assignment()
+        for tp, until in list(self._paused_until.items()):
+            if tp not in assigned:
+                del self._paused_until[tp]
+                self._failures.pop(tp, None)
+            elif until <= now:
+                del self._paused_until[tp]
+                self.consumer.resume(tp)
 
     async def start_consuming(self) -> None:
         """Запуск прослушивания событий из Kafka."""
@@ -191,10 +265,14 @@ class KafkaConsumerService:
         logger.info("Запуск прослушивания Kafka топика...")
 
         try:
-            async for message in self.consumer:
-                if not self._running:
-                    break
-                await self._process_message(message)
+            while self._running:
+                self._resume_partitions()
+                batches = await self.consumer.getmany(
+                    timeout_ms=settings.kafka.batch_timeout_ms,
+                    max_records=settings.kafka.batch_size,
+                )
+                if batches:
+                    await self._process_batch(batches)
         except KafkaError as e:
             logger.error(f"Ошибка Kafka при чтении сообщений: {e}")
         except Exception as e:
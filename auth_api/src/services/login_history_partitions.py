@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import re
+from contextlib import suppress
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.db.session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "login_history"
+DEFAULT_PARTITION = "login_history_default"
+PARTITION_NAME_RE = re.compile(r"^login_history_(\d{4})_(\d{2})$")
+# ключ advisory lock: обслуживанием занимается один воркер
+ADVISORY_LOCK_KEY = 7_310_245_001
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+class LoginHistoryPartitionManager:
+    """
+    Обслуживание месячных партиций login_history:
+    создание партиций на months_ahead месяцев вперёд и
+    отсоединение (detach) или удаление (drop) партиций старше retention_months.
+    """
+
+    def __init__(
+            self,
+            months_ahead: int = 3,
+            retention_months: int = 0,
+            retention_action: str = "detach",
+            check_interval: float = 3600.0,
+    ):
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.retention_action = retention_action
+        self.check_interval = check_interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except Exception as e:
+                logger.error(f"Ошибка обслуживания партиций login_history: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    async def maintain(self, today: date | None = None) -> None:
+        # login_time пишется в UTC, поэтому и текущий месяц берется по UTC
+        current = (today or datetime.now(timezone.utc).date()).replace(day=1)
+        async with async_session_maker() as session:
+            async with session.begin():
+                locked = await session.scalar(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"),
+                    {"key": ADVISORY_LOCK_KEY},
+                )
+                if not locked:
+                    return
+                existing = await self._get_partitions(session)
+                for offset in range(self.months_ahead + 1):
+                    month = _add_months(current, offset)
+                    if month not in existing:
+                        await self._create_partition(session, month)
+                if self.retention_months > 0:
+                    border = _add_months(current, -self.retention_months)
+                    for month, name in sorted(existing.items()):
+                        if month < border:
+                            await self._retire_partition(session, name)
+
+    @staticmethod
+    async def _get_partitions(session: AsyncSession) -> dict[date, str]:
+        result = await session.execute(
+            text("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = :parent
+            """),
+            {"parent": PARENT_TABLE},
+        )
+        partitions = {}
+        for name in result.scalars():
+            match = PARTITION_NAME_RE.match(name)
+            if match:
+                partitions[date(int(match[1]), int(match[2]), 1)] = name
+        return partitions
+
+    @staticmethod
+    async def _create_partition(session: AsyncSession, month: date) -> None:
+        name = _partition_name(month)
+        bounds = {"start": month, "end": _add_months(month, 1)}
+        in_default = await session.scalar(
+            text(f"""
+                SELECT EXISTS (
+                    SELECT 1 FROM {DEFAULT_PARTITION}
+                    WHERE login_time >= :start AND login_time < :end
+                )
+            """),
+            bounds,
+        )
+        if not in_default:
+            await session.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+            ))
+        else:
+            # строки месяца уже попали в default — переносим их в новую партицию
+            await session.execute(text(
+                f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            await session.execute(
+                text(f"""
+                    WITH moved AS (
+                        DELETE FROM {DEFAULT_PARTITION}
+                        WHERE login_time >= :start AND login_time < :end
+                        RETURNING *
+                    )
+                    INSERT INTO {name} SELECT * FROM moved
+                """),
+                bounds,
+            )
+            await session.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+            ))
+        logger.info(f"Создана партиция {name}")
+
+    async def _retire_partition(self, session: AsyncSession, name: str) -> None:
+        await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if self.retention_action == "drop":
+            await session.execute(text(f"DROP TABLE {name}"))
+            logger.info(f"Партиция {name} удалена по сроку хранения")
+        else:
+            logger.info(f"Партиция {name} отсоединена по сроку хранения")
+
+
+# Глобальный экземпляр
+login_history_partition_manager = LoginHistoryPartitionManager(
+    months_ahead=settings.login_history.partitions_ahead,
+    retention_months=settings.login_history.retention_months,
+    retention_action=settings.login_history.retention_action,
+    check_interval=settings.login_history.partition_check_interval,
+)
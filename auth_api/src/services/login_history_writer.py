@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import insert
+
+from src.core.config import settings
+from src.db.models.login_history import LoginHistory
+from src.db.session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class LoginHistoryWriter:
+    """
+    Буферизованная запись истории входов.
+
+    Запросы кладут строки в ограниченную очередь, фоновая задача пишет их
+    пачками одним multi-row INSERT по достижении batch_size или раз в
+    flush_interval. При остановке очередь дописывается до конца.
+    """
+
+    def __init__(self, queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._flushing: asyncio.Future | None = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.overflowed = 0  # очередь полна, запись ушла напрямую в БД
+        self.dropped = 0  # строки потеряны из-за ошибки вставки пачки
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Запись истории входов запущена")
+
+    async def stop(self) -> None:
+        """Остановить фоновую задачу и дописать все, что осталось в очереди"""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._flushing is not None:
+            # пачка, которую писала фоновая задача, дописывается до конца
+            await self._flushing
+            self._flushing = None
+        if self._queue is not None:
+            batch = []
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch)
+                    batch = []
+            await self._flush(batch)
+        logger.info("Запись истории входов остановлена")
+
+    def submit(self, user_id: UUID, ip_address: str | None, user_agent: str | None) -> bool:
+        """Положить запись в очередь. False — писатель не запущен или очередь полна"""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait({
+                "user_id": user_id,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "login_time": datetime.utcnow(),
+            })
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                # отмена не прерывает начатую запись: stop() ее дождется,
+                # а пачка не вернется в очередь и не запишется дважды
+                self._flushing = asyncio.ensure_future(self._flush(batch))
+                batch = []
+                await asyncio.shield(self._flushing)
+                self._flushing = None
+            except asyncio.CancelledError:
+                # пачка уже вынута из очереди, но не передана в запись — возвращаем ее для stop()
+                for row in batch:
+                    with suppress(asyncio.QueueFull):
+                        self._queue.put_nowait(row)
+                raise
+
+    async def _flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            async with async_session_maker() as session:
+                await session.execute(insert(LoginHistory), batch)
+                await session.commit()
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.error(f"Не удалось записать историю входов ({len(batch)} строк): {e}")
+            return
+        self.written += len(batch)
+        self.flushes += 1
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "flushes": self.flushes,
+            "overflowed": self.overflowed,
+            "dropped": self.dropped,
+        }
+
+
+# Глобальный экземпляр
+login_history_writer = LoginHistoryWriter(
+    queue_size=settings.login_history.queue_size,
+    batch_size=settings.login_history.batch_size,
+    flush_interval=settings.login_history.flush_interval,
+)
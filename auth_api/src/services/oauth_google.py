@@ -1,4 +1,3 @@
-from functools import lru_cache
 from src.core.config import settings
 from urllib.parse import urlencode
 from fastapi import Request
@@ -69,8 +68,8 @@ class GoogleOAuthService:
         return response.json()
 
 
-@lru_cache
 def get_oauth_service(
     request: Request
 ) -> GoogleOAuthService:
-    return GoogleOAuthService(http_client=request.app.state.http_client)
+    # экземпляр создается один раз в lifespan приложения
+    return request.app.state.oauth_google
@@ -1,4 +1,3 @@
-from functools import lru_cache
 from src.core.config import settings
 from urllib.parse import urlencode
 from fastapi import Request
@@ -67,8 +66,8 @@ class YandexOAuthService:
         return response.json()
 
 
-@lru_cache
 def get_oauth_service(
     request: Request
 ) -> YandexOAuthService:
-    return YandexOAuthService(http_client=request.app.state.http_client)
+    # экземпляр создается один раз в lifespan приложения
+    return request.app.state.oauth_yandex
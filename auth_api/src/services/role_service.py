@@ -1,4 +1,3 @@
-from functools import lru_cache
 from typing import List
 
 from fastapi import Depends
@@ -25,15 +24,19 @@ class RoleService:
         return role
 
     async def get_all_roles(self) -> List[Role]:
-        result = await self.db.execute(select(Role))
+        result = await self.db.execute(select(Role).execution_options(read_only=True))
         return result.scalars().all()
 
     async def get_role_by_id(self, role_id: str) -> Role | None:
-        result = await self.db.execute(select(Role).where(Role.id == role_id))
+        result = await self.db.execute(
+            select(Role).where(Role.id == role_id)
+        )
         return result.scalar_one_or_none()
 
     async def get_role_by_name(self, name: str) -> Role | None:
-        result = await self.db.execute(select(Role).where(Role.name == name))
+        result = await self.db.execute(
+            select(Role).where(Role.name == name)
+        )
         return result.scalar_one_or_none()
 
     async def update_role(self, role_id: str, update_data: RoleUpdate) -> Role | None:
@@ -71,6 +74,5 @@ class RoleService:
         return True
 
 
-@lru_cache
 def get_role_service(db: AsyncSession = Depends(get_db)) -> RoleService:
     return RoleService(db)
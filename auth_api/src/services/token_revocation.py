@@ -0,0 +1,97 @@
+import json
+import logging
+import time
+from datetime import datetime
+
+from aiokafka import AIOKafkaProducer
+from aiokafka.errors import KafkaError
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REVOKE_TOKEN = "jti"
+REVOKE_USER = "user"
+
+
+class TokenRevocationPublisher:
+    """
+    Публикация отзывов access-токенов в Kafka.
+
+    billing_api и payment_api читают топик и держат отзывы в памяти,
+    поэтому проверка токена у них обходится без сетевого запроса.
+    Событие двух видов:
+      {"type": "jti", "jti": ..., "exp": ...} — отозван один токен;
+      {"type": "user", "user_id": ..., "valid_after": ...} — отозваны все
+      токены пользователя, выпущенные раньше valid_after.
+    Ключ сообщения — jti или user_id, чтобы при компактизации топика
+    оставалось последнее событие.
+    """
+
+    def __init__(self):
+        self.topic = settings.kafka.topic_token_revocations
+        self.producer: AIOKafkaProducer | None = None
+
+        self.published = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        try:
+            self.producer = AIOKafkaProducer(
+                bootstrap_servers=settings.kafka.bootstrap_servers_list,
+                value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+                key_serializer=lambda k: k.encode("utf-8"),
+                request_timeout_ms=settings.kafka.request_timeout_ms,
+            )
+            await self.producer.start()
+            logger.info(f"Публикация отзывов токенов запущена, топик: {self.topic}")
+        except KafkaError as e:
+            # без Kafka отзыв работает только внутри auth_api
+            logger.error(f"Не удалось подключиться к Kafka для отзыва токенов: {e}")
+            self.producer = None
+
+    async def stop(self) -> None:
+        if self.producer is not None:
+            await self.producer.stop()
+            self.producer = None
+
+    async def _publish(self, key: str, event: dict) -> None:
+        if self.producer is None:
+            return
+        try:
+            await self.producer.send_and_wait(self.topic, value=event, key=key)
+            self.published += 1
+        except KafkaError as e:
+            self.failed += 1
+            logger.error(f"Не удалось опубликовать отзыв токена {key}: {e}")
+
+    async def revoke_token(self, payload: dict) -> None:
+        """Отозвать один access-токен до истечения его срока"""
+        jti = payload.get("jti")
+        if not jti:
+            return
+        await self._publish(jti, {
+            "type": REVOKE_TOKEN,
+            "jti": jti,
+            "exp": payload.get("exp"),
+        })
+
+    async def revoke_user(self, user_id: str, valid_after: datetime | None = None) -> None:
+        """Отозвать все токены пользователя, выпущенные раньше valid_after"""
+        timestamp = valid_after.timestamp() if valid_after else time.time()
+        await self._publish(str(user_id), {
+            "type": REVOKE_USER,
+            "user_id": str(user_id),
+            "valid_after": timestamp,
+        })
+
+    def stats(self) -> dict:
+        return {
+            "running": self.producer is not None,
+            "published": self.published,
+            "failed": self.failed,
+        }
+
+
+# Глобальный экземпляр
+token_revocation_publisher = TokenRevocationPublisher()
@@ -1,48 +1,66 @@
-from functools import lru_cache
+import logging
+import time
 from datetime import timedelta
 
-from fastapi import Depends, HTTPException, status, Request
-from passlib.context import CryptContext
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, HTTPException, status
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
-from src.db.session import get_db
 from src.db.redis import get_redis
 from src.core.config import settings
-from src.core.security import decode_and_validate_refresh_token
+
+logger = logging.getLogger(__name__)
 
 
 class TokenService:
-    def __init__(
-            self,
-            db: AsyncSession,
-            redis: Redis,
-    ):
-        self.db = db
+    """
+    Блеклист refresh-токенов в Redis.
+    В отличие от кэша пользователей, без Redis одноразовость токена не гарантировать,
+    поэтому операции отказывают с 503, а не пропускают токен.
+    """
+
+    def __init__(self, redis: Redis | None):
         self.redis = redis
 
-    async def invalidise_refresh_token(self, token: str) -> None:
-        "Добавить токен в блеклист"
-        payload = decode_and_validate_refresh_token(token)
-        jti = payload.get("jti")
-        key = f"blacklist:{jti}"
+    @staticmethod
+    def _blacklist_key(payload: dict) -> str:
+        return f"blacklist:{payload.get('jti')}"
 
-        ttl = int(timedelta(
-            days=settings.jwt.expire_refresh_days).total_seconds())
+    @staticmethod
+    def _remaining_ttl(payload: dict) -> int:
+        """Ключ в блеклисте нужен, только пока сам токен не истек"""
+        exp = payload.get("exp")
+        if exp is None:
+            return int(timedelta(days=settings.jwt.expire_refresh_days).total_seconds())
+        return max(1, int(exp - time.time()))
 
-        await self.redis.setex(key, ttl, "1")
+    async def _set(self, payload: dict, nx: bool = False) -> bool:
+        if self.redis is None:
+            logger.error("Redis не инициализирован, блеклист токенов недоступен")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Сервис токенов временно недоступен")
+        try:
+            return bool(await self.redis.set(self._blacklist_key(payload), "1",
+                                             nx=nx, ex=self._remaining_ttl(payload)))
+        except RedisError as e:
+            logger.error("Не удалось записать токен в блеклист: %s", e)
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Сервис токенов временно недоступен")
 
-    async def check_in_blacklist(self, jti: str) -> None:
-        "Поднять исключение, если то токен в блеклисте"
-        is_blacklisted = await self.redis.get(f"blacklist:{jti}")
-        if is_blacklisted:
+    async def consume_refresh_token(self, payload: dict) -> None:
+        """
+        Атомарно пометить refresh-токен использованным (SET NX).
+        Из параллельных запросов с одним токеном проходит только первый.
+        """
+        consumed = await self._set(payload, nx=True)
+        if not consumed:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                 detail="Токен в блеклисте")
 
+    async def invalidise_refresh_token(self, payload: dict) -> None:
+        "Добавить токен в блеклист"
+        await self._set(payload)
+
 
-@lru_cache
-def get_token_service(
-    db: AsyncSession = Depends(get_db),  # пока не используется
-    redis: Redis = Depends(get_redis),
-) -> TokenService:
-    return TokenService(db, redis)
+def get_token_service(redis: Redis | None = Depends(get_redis)) -> TokenService:
+    return TokenService(redis)
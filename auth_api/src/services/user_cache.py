@@ -0,0 +1,76 @@
+import json
+import logging
+
+from fastapi import Depends
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.db import redis as redis_db
+from src.db.redis import get_redis
+from src.schemas.user import UserSnapshot
+from src.services.interfaces import CacheService
+
+logger = logging.getLogger(__name__)
+
+
+class UserCacheService(CacheService):
+    """
+    Кэш снимков пользователей в Redis.
+    Ошибки Redis не ломают авторизацию: кэш просто считается пустым.
+    """
+
+    key_prefix = "user_snapshot"
+
+    def __init__(self, redis: Redis | None, ttl: int = settings.user_cache.ttl):
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, user_id) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    async def get(self, key: str) -> dict | None:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(key)
+        except RedisError as e:
+            logger.warning("Не удалось прочитать кэш %s: %s", key, e)
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict, expire: int) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, json.dumps(value, default=str), ex=expire)
+        except RedisError as e:
+            logger.warning("Не удалось записать кэш %s: %s", key, e)
+
+    async def delete(self, *keys: str) -> None:
+        if self.redis is None or not keys:
+            return
+        try:
+            await self.redis.delete(*keys)
+        except RedisError as e:
+            logger.warning("Не удалось удалить кэш %s: %s", keys, e)
+
+    async def get_snapshot(self, user_id) -> UserSnapshot | None:
+        data = await self.get(self._key(user_id))
+        return UserSnapshot.model_validate(data) if data else None
+
+    async def set_snapshot(self, snapshot: UserSnapshot) -> None:
+        await self.set(self._key(snapshot.id), snapshot.model_dump(mode="json"), self.ttl)
+
+    async def invalidate(self, *user_ids) -> None:
+        """Сбросить снимки пользователей после изменения данных или ролей"""
+        await self.delete(*(self._key(user_id) for user_id in user_ids))
+
+
+def get_user_cache_service() -> UserCacheService:
+    """Кэш для использования вне FastAPI (сервисы, CLI, Kafka consumer)"""
+    return UserCacheService(redis_db.redis)
+
+
+async def get_user_cache(redis: Redis = Depends(get_redis)) -> UserCacheService:
+    return UserCacheService(redis)
@@ -1,4 +1,3 @@
-from functools import lru_cache
 from typing import List
 
 from fastapi import Depends
@@ -8,11 +7,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.models.role import Role, user_roles_table
 from src.db.models.user import User
 from src.db.session import get_db
+from src.services.user_cache import UserCacheService, get_user_cache, get_user_cache_service
 
 
 class UserRoleService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, user_cache: UserCacheService | None = None):
         self.db = db
+        self.user_cache = user_cache or get_user_cache_service()
 
     async def assign_role_to_user(self, user_id: str, role_id: str) -> bool:
         """Назначить роль пользователю"""
@@ -37,6 +38,7 @@ class UserRoleService:
         stmt = insert(user_roles_table).values(user_id=user_id, role_id=role_id)
         await self.db.execute(stmt)
         await self.db.commit()
+        await self.user_cache.invalidate(user_id)
         return True
 
     async def remove_role_from_user(self, user_id: str, role_id: str) -> bool:
@@ -47,10 +49,12 @@ class UserRoleService:
         )
         result = await self.db.execute(stmt)
         await self.db.commit()
+        if result.rowcount > 0:
+            await self.user_cache.invalidate(user_id)
         return result.rowcount > 0
 
     async def get_user_roles(self, user_id: str) -> List[Role]:
-        """Получить все роли пользователя"""
+        """Получить все роли пользователя; с primary, роли попадают в токены"""
         result = await self.db.execute(
             select(Role)
             .join(user_roles_table, Role.id == user_roles_table.c.role_id)
@@ -64,10 +68,13 @@ class UserRoleService:
             select(User)
             .join(user_roles_table, User.id == user_roles_table.c.user_id)
             .where(user_roles_table.c.role_id == role_id)
+            .execution_options(read_only=True)
         )
         return result.scalars().all()
 
 
-@lru_cache
-def get_user_role_service(db: AsyncSession = Depends(get_db)) -> UserRoleService:
-    return UserRoleService(db)
+def get_user_role_service(
+    db: AsyncSession = Depends(get_db),
+    user_cache: UserCacheService = Depends(get_user_cache),
+) -> UserRoleService:
+    return UserRoleService(db, user_cache)
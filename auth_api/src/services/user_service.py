@@ -1,39 +1,83 @@
-from functools import lru_cache
-from uuid import UUID
+from datetime import datetime
+from uuid import UUID, uuid4
+import base64
+import json
+import logging
 import secrets
 import string
 
 from fastapi import Depends, status, HTTPException
-from passlib.context import CryptContext
-from sqlalchemy import select, update
+from sqlalchemy import literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from src.db.models.login_history import LoginHistory
+from src.db.models.role import Role, user_roles_table
 from src.db.models.user import User
-from src.db.session import get_db
-from src.schemas.user import UserCreate, UserResponse
+from src.db.session import async_session_maker, get_db
+from src.schemas.user import UserCreate, UserResponse, UserSnapshot
 from src.core.config import settings
+from src.core.passwords import password_hasher
+from src.services.login_history_writer import login_history_writer
+from src.services.user_cache import UserCacheService, get_user_cache, get_user_cache_service
 
-from src.services.role_service import RoleService, RoleCreate
-from src.services.user_role_service import UserRoleService
-# from src.services.user_service import UserService
+logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# id базовой роли, см. UserService._get_base_role_id
+_base_role_id: UUID | None = None
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def encode_history_cursor(record: LoginHistory) -> str:
+    """Непрозрачный курсор: позиция последней записи страницы"""
+    raw = json.dumps({"t": record.login_time.isoformat(), "id": record.id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
 
+def decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(data["t"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
+
+
+async def rehash_password(user_id: UUID, password: str, current_hash: str) -> None:
+    """
+    Перехеширование пароля текущей схемой после успешного входа.
+    Выполняется в фоне со своей сессией; хеш обновляется, только если
+    пароль не меняли с момента входа.
+    """
+    try:
+        new_hash = await password_hasher.hash(password)
+        async with async_session_maker() as session:
+            result = await session.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == current_hash)
+                .values(hashed_password=new_hash)
+            )
+            await session.commit()
+        if result.rowcount:
+            password_hasher.rehashed += 1
+            logger.info("Пароль пользователя %s перехеширован", user_id)
+    except Exception as e:
+        logger.error("Не удалось перехешировать пароль пользователя %s: %s", user_id, e)
+
 class UserService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, user_cache: UserCacheService | None = None):
         self.db = db
+        self.user_cache = user_cache or get_user_cache_service()
 
     async def create_user(self, user_data: UserCreate) -> User:
         user = User(
             username=user_data.username,
             email=user_data.email,
-            hashed_password=get_password_hash(user_data.password)
+            hashed_password=await password_hasher.hash(user_data.password)
         )
         self.db.add(user)
         await self.db.commit()
@@ -45,25 +89,53 @@ class UserService:
             update(User)
             .where(User.username == username)
             .values(**update_data)
+            .returning(User.id)
             .execution_options(synchronize_session="fetch")
         )
-        await self.db.execute(stmt)
+        result = await self.db.execute(stmt)
+        user_ids = result.scalars().all()
         await self.db.commit()
+        await self.user_cache.invalidate(*user_ids)
 
     async def get_by_username(self, username: str) -> User | None:
-        result = await self.db.execute(select(User).where(User.username == username))
+        result = await self.db.execute(
+            select(User).where(User.username == username)
+        )
         return result.scalar_one_or_none()
 
     async def get_by_user_id(self, user_id: str) -> User | None:
-        result = await self.db.execute(select(User).where(User.id == user_id))
+        result = await self.db.execute(
+            select(User).where(User.id == user_id)
+        )
         return result.scalar_one_or_none()
 
+    async def get_snapshot(self, user_id: str) -> UserSnapshot | None:
+        """
+        Пользователь вместе с именами ролей для кэша и access-токена.
+        Читается с primary: отставшая реплика закэшировала бы старые роли.
+        """
+        result = await self.db.execute(
+            select(User).options(selectinload(User.roles)).where(User.id == user_id)
+        )
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        return UserSnapshot.from_user(user, [role.name for role in user.roles])
+
     async def get_by_email(self, email: str) -> User | None:
-        result = await self.db.execute(select(User).where(User.email == email))
+        result = await self.db.execute(
+            select(User).where(User.email == email)
+        )
         # print("В базе нашел по почте", result)
         return result.scalar_one_or_none()
 
-    async def create_login_history(self, user_id: int, ip_address: str, user_agent: str) -> LoginHistory:
+    async def record_login(self, user_id: UUID, ip_address: str, user_agent: str) -> None:
+        """Запись входа через буфер; без запущенного писателя — сразу в БД"""
+        if login_history_writer.submit(user_id, ip_address, user_agent):
+            return
+        await self.create_login_history(user_id, ip_address, user_agent)
+
+    async def create_login_history(self, user_id: UUID, ip_address: str, user_agent: str) -> LoginHistory:
         history = LoginHistory(
             user_id=user_id,
             ip_address=ip_address,
@@ -77,63 +149,138 @@ class UserService:
             self,
             user_id: UUID,
             page_number: int = 1,
-            page_size: int = 10
-    ) -> list[LoginHistory]:
-        offset = (page_number - 1) * page_size
-
+            page_size: int = 10,
+            cursor: str | None = None,
+    ) -> tuple[list[LoginHistory], str | None]:
+        """
+        История входов от новых к старым и курсор следующей страницы.
+        С курсором используется keyset-пагинация по индексу
+        (user_id, login_time DESC, id DESC); page_number оставлен для совместимости.
+        """
         query = select(LoginHistory).where(LoginHistory.user_id == user_id).order_by(
-            LoginHistory.login_time.desc()).offset(offset).limit(page_size)
-        result = await self.db.execute(query)
-        records = result.scalars().all()
-        return records  # Возвращаем объекты ORM как есть
+            LoginHistory.login_time.desc(), LoginHistory.id.desc()
+        ).execution_options(read_only=True)
+        if cursor is not None:
+            login_time, history_id = decode_history_cursor(cursor)
+            query = query.where(
+                tuple_(LoginHistory.login_time, LoginHistory.id) < tuple_(login_time, history_id)
+            )
+        else:
+            query = query.offset((page_number - 1) * page_size)
+
+        result = await self.db.execute(query.limit(page_size + 1))
+        records = list(result.scalars().all())
 
-        # return [LoginHistory.model_validate(row) for row in records]
+        next_cursor = None
+        if len(records) > page_size:
+            records = records[:page_size]
+            next_cursor = encode_history_cursor(records[-1])
+        return records, next_cursor
 
     async def get_superuser(self) -> User | None:
         result = await self.db.execute(select(User).where(User.is_superuser is True))
         return result.scalar_one_or_none()
 
-    def hash_password(self, password: str) -> str:
-        return get_password_hash(password)
+    async def hash_password(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     def generate_password(self, length: int = 16) -> str:
         alphabet = string.ascii_letters + string.digits + "!@#$%^&*()-_=+"
         return ''.join(secrets.choice(alphabet) for _ in range(length))
 
-    async def create_user_with_base_role(
-            self,
-            user_data: UserCreate,
-            role_service: RoleService,
-            user_role_service: UserRoleService,
-    ) -> UserResponse:
-        existing = await self.get_by_username(user_data.username)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Пользователь с таким логином уже существует"
+    async def _get_base_role_id(self) -> UUID:
+        """
+        Id базовой роли, кешируется на время жизни процесса.
+        Роль создается при первом обращении, гонку решает ON CONFLICT.
+        """
+        global _base_role_id
+        if _base_role_id is None:
+            inserted = (
+                pg_insert(Role)
+                .values(id=uuid4(), name=settings.api.base_role,
+                        description="Базовая роль пользователя")
+                .on_conflict_do_nothing(index_elements=[Role.name])
+                .returning(Role.id)
+                .cte("inserted_role")
+            )
+            role_id = await self.db.scalar(
+                select(inserted.c.id)
+                .union_all(select(Role.id).where(Role.name == settings.api.base_role))
+                .limit(1)
             )
+            if role_id is None:
+                # роль создала параллельная транзакция после снимка запроса
+                role_id = await self.db.scalar(
+                    select(Role.id).where(Role.name == settings.api.base_role)
+                )
+            _base_role_id = role_id
+        return _base_role_id
 
-        # проверяем наличие роли USER / если нет то создаем
-        role = await role_service.get_role_by_name(settings.api.base_role)
-        if not role:
-            role = await role_service.create_role(
-                RoleCreate(name=settings.api.base_role,
-                           description="Базовая роль пользователя")
+    @staticmethod
+    def _signup_statement(user_data: UserCreate, hashed_password: str, role_id: UUID):
+        """
+        Пользователь и его базовая роль одним запросом:
+        при конфликте по логину или email строка не вставляется и запрос ничего не вернет.
+        """
+        new_user = (
+            pg_insert(User)
+            .values(
+                id=uuid4(),
+                username=user_data.username,
+                email=user_data.email,
+                hashed_password=hashed_password,
+                is_active=True,
+                is_superuser=False,
             )
+            .on_conflict_do_nothing()
+            .returning(User.id, User.username, User.email, User.hashed_password,
+                       User.is_active, User.is_superuser)
+            .cte("new_user")
+        )
+        user_role = (
+            pg_insert(user_roles_table)
+            .from_select(
+                ["user_id", "role_id"],
+                select(new_user.c.id, literal(role_id, PG_UUID(as_uuid=True))),
+            )
+            .cte("new_user_role")
+        )
+        return select(new_user).add_cte(user_role)
 
-        # создаем пользователя
-        user = await self.create_user(user_data)
+    async def create_user_with_base_role(self, user_data: UserCreate) -> User:
+        global _base_role_id
+        hashed_password = await password_hasher.hash(user_data.password)
 
-        # назначаем роль пользователю
-        result = await user_role_service.assign_role_to_user(user.id, role.id)
-        if not result:
+        row = None
+        for attempt in range(2):
+            role_id = await self._get_base_role_id()
+            try:
+                result = await self.db.execute(
+                    self._signup_statement(user_data, hashed_password, role_id)
+                )
+                row = result.one_or_none()
+                await self.db.commit()
+                break
+            except IntegrityError:
+                # закешированную роль удалили — определяем id заново
+                await self.db.rollback()
+                _base_role_id = None
+                if attempt:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Не удалось назначить роль пользователю"
+                    )
+
+        if row is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Не удалось назначить роль пользователю"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Пользователь с таким логином или email уже существует"
             )
-        return user
+        return User(**row._mapping)
 
 
-@lru_cache
-def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
-    return UserService(db)
+def get_user_service(
+    db: AsyncSession = Depends(get_db),
+    user_cache: UserCacheService = Depends(get_user_cache),
+) -> UserService:
+    return UserService(db, user_cache)
@@ -2,6 +2,7 @@ import logging
 
 import pytest
 import pytest_asyncio
+from fakeredis import FakeAsyncRedis
 from alembic import command
 from alembic.config import Config
 from httpx import AsyncClient, ASGITransport
@@ -10,6 +11,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from src.core.config import settings, PROJECT_ROOT
+from src.db.redis import get_redis
 from src.db.session import get_db
 from src.main import app
 from src.schemas.user import UserCreate
@@ -58,9 +60,23 @@ async def override_get_db(async_session_maker):
     app.dependency_overrides.pop(get_db, None)
 
 
+# Redis в памяти вместо поднимаемого в lifespan
+@pytest_asyncio.fixture()
+async def override_get_redis():
+    redis = FakeAsyncRedis()
+
+    async def _override():
+        return redis
+
+    app.dependency_overrides[get_redis] = _override
+    yield redis
+    app.dependency_overrides.pop(get_redis, None)
+    await redis.aclose()
+
+
 # HTTP-клиент с замещением зависимостей
 @pytest_asyncio.fixture()
-async def client(override_get_db):
+async def client(override_get_db, override_get_redis):
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
         yield ac
@@ -2,6 +2,12 @@ from http import HTTPStatus
 
 import pytest
 from httpx import AsyncClient
+from jose import jwt
+from passlib.hash import bcrypt
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.core.passwords import pwd_context
 
 
 @pytest.mark.asyncio
@@ -20,6 +26,46 @@ async def test_register_user(client: AsyncClient):
     assert data["email"] == payload["email"]
 
 
+@pytest.mark.asyncio
+async def test_register_user_assigns_base_role(client: AsyncClient, async_session_maker):
+    response = await client.post("/api/v1/auth/signup", json={
+        "username": "testuser",
+        "email": "user@example.com",
+        "password": "strongpassword",
+    })
+    assert response.status_code == HTTPStatus.CREATED
+
+    async with async_session_maker() as session:
+        role_names = (await session.execute(text(
+            "SELECT r.name FROM user_roles ur JOIN roles r ON r.id = ur.role_id "
+            "JOIN users u ON u.id = ur.user_id WHERE u.username = 'testuser'"
+        ))).scalars().all()
+    assert role_names == [settings.api.base_role]
+
+
+@pytest.mark.asyncio
+async def test_register_duplicate_user_conflict(client: AsyncClient):
+    await client.post("/api/v1/auth/signup", json={
+        "username": "testuser",
+        "email": "user@example.com",
+        "password": "strongpassword",
+    })
+
+    same_username = await client.post("/api/v1/auth/signup", json={
+        "username": "testuser",
+        "email": "other@example.com",
+        "password": "strongpassword",
+    })
+    same_email = await client.post("/api/v1/auth/signup", json={
+        "username": "otheruser",
+        "email": "user@example.com",
+        "password": "strongpassword",
+    })
+
+    assert same_username.status_code == HTTPStatus.CONFLICT
+    assert same_email.status_code == HTTPStatus.CONFLICT
+
+
 @pytest.mark.asyncio
 async def test_login_user(client: AsyncClient):
     # Сначала регистрируем пользователя
@@ -58,3 +104,97 @@ async def test_change_credentials(client: AsyncClient, access_token: str):
 
     assert response.status_code == HTTPStatus.OK
     assert response.json()["detail"] == "Данные успешно обновлены"
+
+
+@pytest.mark.asyncio
+async def test_access_token_contains_user_claims(access_token: str):
+    payload = jwt.decode(access_token,
+                         settings.jwt.secret_access,
+                         algorithms=[settings.jwt.algorithm])
+
+    assert payload["is_active"] is True
+    assert payload["is_superuser"] is False
+    assert settings.api.base_role in payload["roles"]
+    # по jti и iat billing_api и payment_api проверяют отзыв токена
+    assert payload["jti"]
+    assert payload["iat"] <= payload["exp"]
+
+
+@pytest.mark.asyncio
+async def test_me_returns_current_user(authorized_client: AsyncClient):
+    response = await authorized_client.get("/api/v1/auth/me")
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["username"] == "testuser"
+    assert data["email"] == "user@example.com"
+    assert data["is_superuser"] is False
+
+
+@pytest.mark.asyncio
+async def test_me_reflects_changed_credentials(authorized_client: AsyncClient):
+    await authorized_client.get("/api/v1/auth/me")
+
+    response = await authorized_client.put(
+        "/api/v1/auth/change-credentials",
+        json={"new_email": "changed@example.com"},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    # снимок пользователя в кэше должен быть сброшен
+    response = await authorized_client.get("/api/v1/auth/me")
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["email"] == "changed@example.com"
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password(client: AsyncClient, async_session_maker):
+    await client.post("/api/v1/auth/signup", json={
+        "username": "legacyuser",
+        "email": "legacy@example.com",
+        "password": "strongpassword",
+    })
+    # хеш со старой стоимостью, как у пользователей до смены настроек
+    legacy_hash = bcrypt.using(rounds=4).hash("strongpassword")
+    async with async_session_maker() as session:
+        await session.execute(
+            text("UPDATE users SET hashed_password = :h WHERE username = 'legacyuser'"),
+            {"h": legacy_hash},
+        )
+        await session.commit()
+
+    response = await client.post("/api/v1/auth/login", json={
+        "username": "legacyuser",
+        "password": "strongpassword",
+    })
+    assert response.status_code == HTTPStatus.OK
+
+    async with async_session_maker() as session:
+        new_hash = (await session.execute(
+            text("SELECT hashed_password FROM users WHERE username = 'legacyuser'")
+        )).scalar_one()
+    assert new_hash != legacy_hash
+    assert not pwd_context.needs_update(new_hash)
+    assert pwd_context.verify("strongpassword", new_hash)
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_cannot_be_reused(client: AsyncClient):
+    await client.post("/api/v1/auth/signup", json={
+        "username": "refreshuser",
+        "email": "refresh@example.com",
+        "password": "strongpassword",
+    })
+    login_response = await client.post("/api/v1/auth/login", json={
+        "username": "refreshuser",
+        "password": "strongpassword",
+    })
+    refresh_token = login_response.json()["refresh_token"]
+
+    first = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert first.status_code == HTTPStatus.OK
+    assert first.json()["refresh_token"] != refresh_token
+
+    # повторное использование уже погашенного токена
+    replay = await client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert replay.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,59 @@
+import pytest
+from common.db import ReplicaConfig, ReplicaRouter, RoutingSession, create_engine
+from sqlalchemy import select, update
+
+from src.core.config import settings
+from src.db.models.user import User
+
+
+@pytest.fixture
+async def router(monkeypatch):
+    primary = create_engine(settings.postgres.async_database_url, settings.postgres.pool)
+    replica = create_engine(settings.postgres.async_database_url, settings.postgres.pool)
+    router = ReplicaRouter(primary, [replica], ReplicaConfig(max_lag=5.0))
+
+    async def measure(engine):
+        return 0.0
+
+    monkeypatch.setattr(router, "_measure", measure)
+    await router.check()
+    yield router
+    await primary.dispose()
+    await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_only_select_goes_to_replica(router: ReplicaRouter):
+    session = RoutingSession(bind=router.primary.sync_engine, router=router)
+    replica = router.replicas[0].sync_engine
+
+    assert session.get_bind(clause=select(User).execution_options(read_only=True)) is replica
+    # неотмеченное чтение и блокировка остаются на primary
+    assert session.get_bind(clause=select(User)) is router.primary.sync_engine
+    assert session.get_bind(
+        clause=select(User).with_for_update().execution_options(read_only=True)
+    ) is router.primary.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_session_reads_own_writes_from_primary(router: ReplicaRouter):
+    session = RoutingSession(bind=router.primary.sync_engine, router=router, info={"read_only": True})
+
+    assert session.get_bind(clause=select(User)) is router.replicas[0].sync_engine
+    session.get_bind(clause=update(User).values(is_active=False))
+    assert session.get_bind(clause=select(User)) is router.primary.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(router: ReplicaRouter, monkeypatch):
+    async def measure(engine):
+        return 60.0
+
+    monkeypatch.setattr(router, "_measure", measure)
+    await router.check()
+
+    session = RoutingSession(bind=router.primary.sync_engine, router=router)
+    assert session.get_bind(
+        clause=select(User).execution_options(read_only=True)
+    ) is router.primary.sync_engine
+    assert router.stats()["primary_fallbacks"] == 1
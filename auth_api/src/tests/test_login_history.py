@@ -1,6 +1,13 @@
+import asyncio
+import uuid
+
 import pytest
 from httpx import AsyncClient
 from datetime import datetime
+from sqlalchemy import text
+
+from src.services.login_history_partitions import LoginHistoryPartitionManager
+from src.services.login_history_writer import LoginHistoryWriter
 
 
 @pytest.mark.asyncio
@@ -50,3 +57,100 @@ async def test_login_history_returns_entries_for_user(client: AsyncClient, autho
 async def test_login_history_requires_auth(client: AsyncClient):
     response = await client.get("/api/v1/auth/login-history")
     assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_login_history_writer_flushes_on_stop(authorized_client: AsyncClient, async_session_maker):
+    async with async_session_maker() as session:
+        user_id = (await session.execute(
+            text("SELECT id FROM users WHERE username = 'testuser'")
+        )).scalar_one()
+
+    # интервал больше времени теста — записи попадут в БД только при остановке
+    writer = LoginHistoryWriter(queue_size=10, batch_size=100, flush_interval=60)
+    await writer.start()
+    assert writer.submit(user_id, "10.0.0.1", "writer-test")
+    assert writer.submit(user_id, "10.0.0.2", "writer-test")
+    await writer.stop()
+
+    async with async_session_maker() as session:
+        count = (await session.execute(
+            text("SELECT count(*) FROM login_history WHERE user_agent = 'writer-test'")
+        )).scalar_one()
+    assert count == 2
+    assert writer.stats()["written"] == 2
+
+
+@pytest.mark.asyncio
+async def test_login_history_writer_stop_during_flush_writes_rows_once():
+    flushed = []
+    flush_started = asyncio.Event()
+
+    class SlowWriter(LoginHistoryWriter):
+        async def _flush(self, batch):
+            if batch:
+                # строки уже закоммичены, запись еще не вернула управление
+                flushed.extend(batch)
+                flush_started.set()
+                await asyncio.sleep(0.1)
+
+    writer = SlowWriter(queue_size=10, batch_size=2, flush_interval=60)
+    await writer.start()
+    writer.submit(uuid.uuid4(), "10.0.0.1", "a")
+    writer.submit(uuid.uuid4(), "10.0.0.2", "b")
+    await flush_started.wait()
+    # остановка приходит, пока пачка пишется
+    await writer.stop()
+
+    assert sorted(row["user_agent"] for row in flushed) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_login_history_cursor_pagination(client: AsyncClient, authorized_client: AsyncClient):
+    # вход из фикстуры + два дополнительных
+    for _ in range(2):
+        await client.post("/api/v1/auth/login", json={
+            "username": "testuser",
+            "password": "strongpassword"
+        })
+
+    first_page = await authorized_client.get("/api/v1/auth/login-history", params={"page_size": 2})
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+    next_cursor = first_page.headers.get("X-Next-Cursor")
+    assert next_cursor
+
+    second_page = await authorized_client.get(
+        "/api/v1/auth/login-history",
+        params={"page_size": 2, "cursor": next_cursor},
+    )
+    assert second_page.status_code == 200
+    assert len(second_page.json()) == 1
+    assert "X-Next-Cursor" not in second_page.headers
+
+    times = [entry["login_time"] for entry in first_page.json() + second_page.json()]
+    assert times == sorted(times, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_login_history_invalid_cursor(authorized_client: AsyncClient):
+    response = await authorized_client.get("/api/v1/auth/login-history", params={"cursor": "broken"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_partition_manager_creates_future_partitions(async_session_maker):
+    manager = LoginHistoryPartitionManager(months_ahead=2)
+    await manager.maintain()
+
+    async with async_session_maker() as session:
+        partitions = (await session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'login_history'"
+        ))).scalars().all()
+
+    today = datetime.utcnow()
+    assert f"login_history_{today:%Y_%m}" in partitions
+    assert "login_history_default" in partitions
@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+
+# Метрика -> направление: +1 — хуже, когда растет; -1 — хуже, когда падает
+LATENCY_METRICS = {"p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "rps": -1, "drain_rate": -1}
+# Число SQL на запрос детерминировано, поэтому сравнивается без допуска
+STATEMENT_SLACK = 0.1
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save(path: Path, results: dict, merge: bool = True) -> None:
+    """Сохраняет результаты; сценарии, которые не запускались, остаются из старого файла"""
+    baseline = load(path) if merge else {}
+    baseline.update(results)
+    path.write_text(json.dumps(baseline, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Регрессии относительно базовой линии, tolerance — допустимое отклонение (0.1 = 10%)"""
+    regressions = []
+    for scenario, current in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        for metric, direction in LATENCY_METRICS.items():
+            if not base.get(metric) or metric not in current:
+                continue
+            change = (current[metric] - base[metric]) / base[metric]
+            if change * direction > tolerance:
+                regressions.append(
+                    f"{scenario}.{metric}: {base[metric]} -> {current[metric]} ({change:+.1%})"
+                )
+        statements, base_statements = (
+            current.get("db_statements_per_request"), base.get("db_statements_per_request")
+        )
+        if statements is not None and base_statements is not None \
+                and statements > base_statements + STATEMENT_SLACK:
+            regressions.append(
+                f"{scenario}.db_statements_per_request: {base_statements} -> {statements}"
+            )
+        if current.get("errors") and not base.get("errors"):
+            regressions.append(f"{scenario}.errors: {current['errors']}")
+    return regressions
+
+
+def format_diff(results: dict, baseline: dict) -> list[str]:
+    lines = []
+    for scenario, current in results.items():
+        base = baseline.get(scenario, {})
+        parts = []
+        for metric in (*LATENCY_METRICS, "db_statements_per_request"):
+            if metric not in current or current[metric] is None:
+                continue
+            if base.get(metric):
+                change = (current[metric] - base[metric]) / base[metric]
+                parts.append(f"{metric}={current[metric]} ({change:+.1%})")
+            else:
+                parts.append(f"{metric}={current[metric]}")
+        lines.append(f"{scenario}: " + ", ".join(parts))
+    return lines
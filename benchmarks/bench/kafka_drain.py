@@ -0,0 +1,85 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from aiokafka.admin import AIOKafkaAdminClient
+
+logger = logging.getLogger(__name__)
+
+
+async def _lag(admin: AIOKafkaAdminClient, consumer: AIOKafkaConsumer, topic: str, group_id: str) -> int:
+    partitions = [TopicPartition(topic, p) for p in consumer.partitions_for_topic(topic) or ()]
+    end_offsets = await consumer.end_offsets(partitions)
+    committed = await admin.list_consumer_group_offsets(group_id, partitions=partitions)
+    return sum(
+        end - (committed[tp].offset if tp in committed and committed[tp].offset >= 0 else 0)
+        for tp, end in end_offsets.items()
+    )
+
+
+async def measure_drain(
+        bootstrap_servers: list[str],
+        topic: str,
+        group_id: str,
+        user_ids: list[str],
+        messages: int,
+        timeout: float = 300.0,
+) -> dict:
+    """
+    Скорость разбора топика потребителем auth_api.
+
+    Публикует messages событий SUBSCRIBE/UNSUBSCRIBE для существующих
+    пользователей и ждет, пока закоммиченные смещения группы догонят конец
+    топика. Пока auth_api не запущен, события копятся, и замер показывает
+    скорость разбора накопленного хвоста.
+    """
+    producer = AIOKafkaProducer(
+        bootstrap_servers=bootstrap_servers,
+        value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        key_serializer=lambda k: k.encode("utf-8"),
+        linger_ms=5,
+    )
+    consumer = AIOKafkaConsumer(bootstrap_servers=bootstrap_servers)
+    admin = AIOKafkaAdminClient(bootstrap_servers=bootstrap_servers)
+    await producer.start()
+    await consumer.start()
+    await admin.start()
+    try:
+        await consumer.topics()
+        initial_lag = await _lag(admin, consumer, topic, group_id)
+        if initial_lag:
+            logger.warning(f"У группы {group_id} уже есть отставание: {initial_lag}")
+
+        started = time.perf_counter()
+        sends = []
+        for i in range(messages):
+            user_id = user_ids[i % len(user_ids)]
+            event_type = "SUBSCRIBE" if (i // len(user_ids)) % 2 == 0 else "UNSUBSCRIBE"
+            sends.append(await producer.send(topic, key=user_id, value={
+                "user_id": user_id,
+                "event_type": event_type,
+                "timestamp": datetime.utcnow().isoformat(),
+            }))
+        await asyncio.gather(*sends)
+        produced = time.perf_counter() - started
+
+        while (lag := await _lag(admin, consumer, topic, group_id)) > 0:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"Группа {group_id} не разобрала топик за {timeout} с, отставание {lag}")
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+    finally:
+        await admin.close()
+        await consumer.stop()
+        await producer.stop()
+
+    return {
+        "scenario": "kafka_drain",
+        "messages": messages,
+        "produce_seconds": round(produced, 3),
+        "seconds": round(elapsed, 3),
+        "drain_rate": round((messages + initial_lag) / elapsed, 2),
+    }
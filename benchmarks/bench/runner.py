@@ -0,0 +1,63 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Awaitable, Callable
+
+from bench.stats import ScenarioResult
+
+logger = logging.getLogger(__name__)
+
+# Флаг воркера замера: по нему счетчик SQL в режиме inprocess отличает запросы
+# сценария от фоновых задач сервиса
+in_request: contextvars.ContextVar[bool] = contextvars.ContextVar("in_request", default=False)
+
+# Запрос сценария: (номер воркера, номер запроса) -> None, ошибка — исключение
+RequestFn = Callable[[int, int], Awaitable[None]]
+
+
+async def run_closed_loop(
+        scenario: str,
+        request: RequestFn,
+        requests: int,
+        concurrency: int,
+        warmup: int = 0,
+        statements: Callable[[], Awaitable[int | None]] | None = None,
+) -> ScenarioResult:
+    """
+    Замкнутый цикл: concurrency воркеров выполняют requests запросов,
+    каждый следующий — сразу после ответа на предыдущий. Прогрев
+    не попадает ни в латентности, ни в счетчик SQL.
+    """
+    for i in range(warmup):
+        try:
+            await request(i % concurrency, i)
+        except Exception as e:
+            logger.warning(f"{scenario}: ошибка прогрева: {e}")
+
+    samples: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        in_request.set(True)
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await request(worker_id, warmup + i)
+            except Exception as e:
+                errors += 1
+                if errors <= 5:
+                    logger.warning(f"{scenario}: {e}")
+                continue
+            samples.append(time.perf_counter() - started)
+
+    before = await statements() if statements else None
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await statements() if statements else None
+
+    executed = after - before if before is not None and after is not None else None
+    return ScenarioResult.from_samples(scenario, samples, errors, elapsed, executed)
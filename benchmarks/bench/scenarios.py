@@ -0,0 +1,184 @@
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import httpx
+from jose import jwt
+
+from bench.runner import RequestFn
+
+AUTH = "/api/v1/auth"
+BILLING = "/api/v1/billing"
+PAYMENT_WEBHOOK = "/api/v1/payment/youkassa/webhook"
+
+PASSWORD = "Bench-password-1"
+
+
+@dataclass
+class Context:
+    """Общие параметры сценариев"""
+
+    client: httpx.AsyncClient
+    concurrency: int
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    jwt_secret: str = "your-secret-key"
+    jwt_algorithm: str = "HS256"
+    subscription_id: int = 1
+    subscriptions: int = 100
+
+
+def check(response: httpx.Response, *expected: int) -> httpx.Response:
+    if response.status_code not in (expected or (200,)):
+        raise RuntimeError(f"{response.request.method} {response.request.url.path}: "
+                           f"{response.status_code} {response.text[:200]}")
+    return response
+
+
+def mint_access_token(ctx: Context, user_id: str) -> str:
+    """Access-токен как у auth_api: billing_api проверяет его локально"""
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": user_id, "roles": ["user"], "exp": now + 3600, "iat": now, "jti": str(uuid.uuid4())},
+        ctx.jwt_secret,
+        algorithm=ctx.jwt_algorithm,
+    )
+
+
+async def signup_users(ctx: Context, count: int, prefix: str) -> list[dict]:
+    users = []
+    for i in range(count):
+        username = f"bench_{ctx.run_id}_{prefix}_{i}"
+        response = check(await ctx.client.post(f"{AUTH}/signup", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+        }), 201)
+        users.append({"id": response.json()["id"], "username": username})
+    return users
+
+
+async def login(ctx: Context, username: str) -> dict:
+    response = await ctx.client.post(f"{AUTH}/login", json={"username": username, "password": PASSWORD})
+    return check(response).json()
+
+
+# ---------- auth_api ----------
+
+async def auth_signup(ctx: Context) -> RequestFn:
+    async def request(worker: int, i: int) -> None:
+        username = f"bench_{ctx.run_id}_signup_{i}"
+        check(await ctx.client.post(f"{AUTH}/signup", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+        }), 201)
+
+    return request
+
+
+async def auth_login(ctx: Context) -> RequestFn:
+    users = await signup_users(ctx, ctx.concurrency, "login")
+
+    async def request(worker: int, i: int) -> None:
+        await login(ctx, users[worker]["username"])
+
+    return request
+
+
+async def auth_refresh(ctx: Context) -> RequestFn:
+    # refresh-токен одноразовый, поэтому у каждого воркера своя цепочка
+    users = await signup_users(ctx, ctx.concurrency, "refresh")
+    tokens = [(await login(ctx, user["username"]))["refresh_token"] for user in users]
+
+    async def request(worker: int, i: int) -> None:
+        response = await ctx.client.post(f"{AUTH}/refresh", json={"refresh_token": tokens[worker]})
+        tokens[worker] = check(response).json()["refresh_token"]
+
+    return request
+
+
+async def auth_me(ctx: Context) -> RequestFn:
+    users = await signup_users(ctx, ctx.concurrency, "me")
+    headers = [
+        {"Authorization": f"Bearer {(await login(ctx, user['username']))['access_token']}"}
+        for user in users
+    ]
+
+    async def request(worker: int, i: int) -> None:
+        check(await ctx.client.get(f"{AUTH}/me", headers=headers[worker]))
+
+    return request
+
+
+# ---------- billing_api ----------
+
+async def create_subscription(ctx: Context) -> str:
+    token = mint_access_token(ctx, str(uuid.uuid4()))
+    response = await ctx.client.post(
+        f"{BILLING}/user-subscription",
+        json={"subscription_id": ctx.subscription_id, "amount": 100},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return check(response).json()["id"]
+
+
+async def billing_create_subscription(ctx: Context) -> RequestFn:
+    """Подписка и платеж: payment_api лучше направить в yookassa_emulator"""
+
+    async def request(worker: int, i: int) -> None:
+        await create_subscription(ctx)
+
+    return request
+
+
+async def billing_update_subscription(ctx: Context) -> RequestFn:
+    ids = [await create_subscription(ctx) for _ in range(ctx.subscriptions)]
+
+    async def request(worker: int, i: int) -> None:
+        # чередование active/canceled: каждая активация пишет событие в outbox
+        status = "active" if (i // len(ids)) % 2 == 0 else "canceled"
+        response = await ctx.client.patch(
+            f"{BILLING}/user-subscriptions/{ids[i % len(ids)]}", json={"status": status}
+        )
+        check(response)
+
+    return request
+
+
+# ---------- payment_api ----------
+
+def payment_notification(payment_id: str, status: str = "succeeded") -> dict:
+    return {
+        "type": "notification",
+        "event": f"payment.{status}",
+        "object": {
+            "id": payment_id,
+            "status": status,
+            "amount": {"value": "100.00", "currency": "RUB"},
+            "description": "bench",
+            "metadata": {
+                "user_id": str(uuid.uuid4()),
+                "user_subscription_id": str(uuid.uuid4()),
+            },
+        },
+    }
+
+
+async def payment_webhook(ctx: Context) -> RequestFn:
+    async def request(worker: int, i: int) -> None:
+        notification = payment_notification(str(uuid.uuid4()))
+        check(await ctx.client.post(PAYMENT_WEBHOOK, json=notification))
+
+    return request
+
+
+# Сценарий -> (сервис, подготовка)
+SCENARIOS = {
+    "auth_signup": ("auth", auth_signup),
+    "auth_login": ("auth", auth_login),
+    "auth_refresh": ("auth", auth_refresh),
+    "auth_me": ("auth", auth_me),
+    "billing_create_subscription": ("billing", billing_create_subscription),
+    "billing_update_subscription": ("billing", billing_update_subscription),
+    "payment_webhook": ("payment", payment_webhook),
+}
@@ -0,0 +1,55 @@
+import math
+from dataclasses import asdict, dataclass
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Перцентиль методом nearest-rank по отсортированной выборке"""
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[rank - 1]
+
+
+@dataclass
+class ScenarioResult:
+    """Итог сценария; латентности в миллисекундах"""
+
+    scenario: str
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    db_statements_per_request: float | None = None
+
+    @classmethod
+    def from_samples(
+            cls,
+            scenario: str,
+            samples: list[float],
+            errors: int,
+            seconds: float,
+            statements: int | None = None,
+    ) -> "ScenarioResult":
+        ordered = sorted(samples)
+        requests = len(samples) + errors
+        return cls(
+            scenario=scenario,
+            requests=requests,
+            errors=errors,
+            seconds=round(seconds, 3),
+            rps=round(len(samples) / seconds, 2) if seconds else 0.0,
+            p50_ms=round(percentile(ordered, 50) * 1000, 3),
+            p95_ms=round(percentile(ordered, 95) * 1000, 3),
+            p99_ms=round(percentile(ordered, 99) * 1000, 3),
+            max_ms=round(ordered[-1] * 1000, 3) if ordered else 0.0,
+            db_statements_per_request=(
+                round(statements / requests, 2) if statements is not None and requests else None
+            ),
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
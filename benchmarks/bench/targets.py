@@ -0,0 +1,122 @@
+import importlib
+import logging
+import os
+import sys
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import httpx
+from sqlalchemy import event
+
+from bench.runner import in_request
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Каталог сервиса, модуль приложения и модуль, где лежит движок после старта
+SERVICES = {
+    "auth": ("auth_api", "src.main", "src.db.session"),
+    "billing": ("billing_api", "main", "src.db.postgres"),
+    "payment": ("payment_api", "main", "src.db.postgres"),
+}
+
+
+class HttpTarget:
+    """
+    Запущенный сервис (docker-compose или uvicorn).
+    SQL считается по pg_stat_statements базы сервиса, если задан DSN.
+    """
+
+    def __init__(self, base_url: str, pg_dsn: str | None = None, timeout: float = 30.0):
+        self.base_url = base_url
+        self.pg_dsn = pg_dsn
+        self.timeout = timeout
+        self.client: httpx.AsyncClient | None = None
+        self._pg = None
+
+    async def __aenter__(self) -> "HttpTarget":
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=1000),
+        )
+        if self.pg_dsn:
+            import asyncpg
+
+            self._pg = await asyncpg.connect(self.pg_dsn)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.client.aclose()
+        if self._pg is not None:
+            await self._pg.close()
+
+    async def statements(self) -> int | None:
+        """Всего выполненных в базе запросов; нужен CREATE EXTENSION pg_stat_statements"""
+        if self._pg is None:
+            return None
+        try:
+            # сам замер тоже попадает в статистику, его вклад вычитается разностью двух замеров
+            return int(await self._pg.fetchval(
+                "SELECT COALESCE(SUM(calls), 0) FROM pg_stat_statements "
+                "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+            ))
+        except Exception as e:
+            logger.warning(f"pg_stat_statements недоступен: {e}")
+            self._pg = None
+            return None
+
+
+class InProcessTarget:
+    """
+    Приложение сервиса в том же процессе через ASGITransport, без сети.
+
+    Базы, Redis и Kafka нужны те же, что и сервису, — настройки берутся
+    из .env сервиса. SQL считается по событиям движка SQLAlchemy и только
+    для запросов сценария: фоновые задачи сервиса в счетчик не попадают.
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+        self.client: httpx.AsyncClient | None = None
+        self.executed = 0
+        self._stack = AsyncExitStack()
+
+    def _load(self):
+        directory, app_module, _ = SERVICES[self.service]
+        service_dir = REPO_ROOT / directory
+        # у всех сервисов пакет называется src, поэтому один сервис на процесс
+        os.chdir(service_dir)
+        sys.path.insert(0, str(service_dir))
+        return importlib.import_module(app_module).app
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if in_request.get():
+            self.executed += 1
+
+    def _engines(self) -> list:
+        _, _, db_module = SERVICES[self.service]
+        db = importlib.import_module(db_module)
+        engines = [db.engine]
+        router = getattr(db, "replica_router", None)
+        if router is not None:
+            engines.extend(router.replicas)
+        return [engine for engine in engines if engine is not None]
+
+    async def __aenter__(self) -> "InProcessTarget":
+        app = self._load()
+        await self._stack.enter_async_context(app.router.lifespan_context(app))
+        for engine in self._engines():
+            event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+        self.client = await self._stack.enter_async_context(httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+        ))
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._stack.aclose()
+
+    async def statements(self) -> int | None:
+        return self.executed
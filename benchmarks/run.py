@@ -0,0 +1,124 @@
+"""
+Нагрузочные сценарии горячих путей сервисов.
+
+    python benchmarks/run.py auth_login auth_me --base-url http://localhost
+    python benchmarks/run.py payment_webhook --target inprocess
+    python benchmarks/run.py kafka_drain
+
+Подробности и сравнение с базовой линией — в benchmarks/README.md.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+from bench import baseline
+from bench.runner import run_closed_loop
+from bench.scenarios import SCENARIOS, Context, signup_users
+from bench.targets import HttpTarget, InProcessTarget
+
+logger = logging.getLogger("benchmarks")
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарки сервисов")
+    parser.add_argument("scenarios", nargs="+", choices=[*SCENARIOS, "kafka_drain"])
+    parser.add_argument("--target", choices=["http", "inprocess"], default="http",
+                        help="http — запущенный сервис, inprocess — приложение в этом процессе")
+    parser.add_argument("--base-url", default="http://localhost", help="nginx или адрес сервиса")
+    parser.add_argument("--pg-dsn", help="DSN базы сервиса для подсчета SQL в режиме http")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--jwt-secret", default="your-secret-key")
+    parser.add_argument("--subscription-id", type=int, default=1)
+    parser.add_argument("--kafka", default="localhost:9094", help="bootstrap-серверы для kafka_drain")
+    parser.add_argument("--kafka-topic", default="user-billing-events")
+    parser.add_argument("--kafka-group", default="auth-service-group")
+    parser.add_argument("--kafka-messages", type=int, default=10000)
+    parser.add_argument("--output", type=Path, help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Допустимое ухудшение латентности и пропускной способности")
+    return parser.parse_args()
+
+
+def make_target(args: argparse.Namespace, service: str):
+    if args.target == "inprocess":
+        return InProcessTarget(service)
+    return HttpTarget(args.base_url, args.pg_dsn)
+
+
+async def run_kafka_drain(args: argparse.Namespace) -> dict:
+    from bench.kafka_drain import measure_drain
+
+    # события нужны для существующих пользователей: их создает auth_api.
+    # Цель открыта на все измерение: в режиме inprocess consumer живет в lifespan приложения
+    async with make_target(args, "auth") as target:
+        ctx = Context(client=target.client, concurrency=args.concurrency)
+        users = await signup_users(ctx, 100, "kafka")
+        return await measure_drain(
+            bootstrap_servers=[server.strip() for server in args.kafka.split(",")],
+            topic=args.kafka_topic,
+            group_id=args.kafka_group,
+            user_ids=[user["id"] for user in users],
+            messages=args.kafka_messages,
+        )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    services = {SCENARIOS[name][0] if name in SCENARIOS else "auth" for name in args.scenarios}
+    if args.target == "inprocess" and len(services) > 1:
+        # у сервисов общий пакет src, в одном процессе живет только один
+        sys.exit("В режиме inprocess сценарии одного сервиса за запуск")
+
+    results = {}
+    for name in args.scenarios:
+        if name == "kafka_drain":
+            results[name] = await run_kafka_drain(args)
+            continue
+        service, prepare = SCENARIOS[name]
+        async with make_target(args, service) as target:
+            ctx = Context(
+                client=target.client,
+                concurrency=args.concurrency,
+                jwt_secret=args.jwt_secret,
+                subscription_id=args.subscription_id,
+            )
+            request = await prepare(ctx)
+            result = await run_closed_loop(
+                name, request, args.requests, args.concurrency, args.warmup, target.statements
+            )
+        results[name] = result.to_dict()
+        logger.info(json.dumps(results[name], ensure_ascii=False))
+    return results
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    results = asyncio.run(run(args))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+
+    stored = baseline.load(args.baseline)
+    print("\n".join(baseline.format_diff(results, stored)))
+    if args.save_baseline:
+        baseline.save(args.baseline, results)
+        print(f"Базовая линия сохранена: {args.baseline}")
+        return
+
+    regressions = baseline.compare(results, stored, args.tolerance)
+    if regressions:
+        print("Регрессии:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
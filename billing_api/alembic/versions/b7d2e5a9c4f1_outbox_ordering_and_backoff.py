@@ -0,0 +1,43 @@
+"""Outbox ordering and backoff
+
+Revision ID: b7d2e5a9c4f1
+Revises: a1c4e8d2b7f3
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e5a9c4f1'
+down_revision: Union[str, None] = 'a1c4e8d2b7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('outbox_events', sa.Column('seq', sa.BigInteger(), sa.Identity(), nullable=False))
+    op.add_column('outbox_events', sa.Column('next_attempt_at', sa.DateTime(timezone=True),
+                                             server_default=sa.text('now()'), nullable=False))
+    op.add_column('outbox_events', sa.Column('last_error', sa.String(), nullable=True))
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events',
+                  postgresql_where=sa.text('sent_at IS NULL'))
+    op.create_index('ix_outbox_events_pending', 'outbox_events', ['seq'], unique=False,
+                    postgresql_where=sa.text('sent_at IS NULL'))
+    op.create_index('ix_outbox_events_pending_key', 'outbox_events', ['key', 'seq'], unique=False,
+                    postgresql_where=sa.text('sent_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_events_pending_key', table_name='outbox_events',
+                  postgresql_where=sa.text('sent_at IS NULL'))
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events',
+                  postgresql_where=sa.text('sent_at IS NULL'))
+    op.create_index('ix_outbox_events_pending', 'outbox_events', ['created_at'], unique=False,
+                    postgresql_where=sa.text('sent_at IS NULL'))
+    op.drop_column('outbox_events', 'last_error')
+    op.drop_column('outbox_events', 'next_attempt_at')
+    op.drop_column('outbox_events', 'seq')
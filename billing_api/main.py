@@ -2,16 +2,20 @@ import logging
 import httpx
 from contextlib import asynccontextmanager
 
+from common.db import create_engine
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.api.v1.heath import router as health_router
 from src.api.v1.user_subscription import router as user_subscription_router
 from src.core.config import settings
 from src.db import postgres
 from src.db.postgres import Base
+from src.services.http_client import http_client_service
 from src.services.kafka import kafka_service
+from src.services.outbox_relay import outbox_relay
+from src.services.token_revocation import token_revocation_listener
 from src import exceptions
 
 logger = logging.getLogger(__name__)
@@ -21,26 +25,40 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Управление жизненным циклом приложения"""
 
-    engine = create_async_engine(
-        url=settings.postgres.ASYNC_DATABASE_URL,
-        echo=False,
-        future=True,
+    engine = create_engine(settings.postgres.ASYNC_DATABASE_URL, settings.postgres.pool)
+    postgres.engine = engine
+    postgres.async_session_maker = async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
     )
 
     # Подключение к Kafka
     await kafka_service.connect()
 
+    # Общий HTTP-клиент для исходящих запросов
+    await http_client_service.connect()
+
     # + создание таблиц
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         logger.info("All tables created")
 
+    # Публикация событий из outbox
+    await outbox_relay.start()
+
+    # Отзывы токенов из auth_api
+    await token_revocation_listener.start()
+
     logger.info(f"Приложение {settings.project_name.upper()} запущено!")
 
     yield
 
     # Отключение от Kafka
+    await token_revocation_listener.stop()
+    await outbox_relay.stop()
     await kafka_service.disconnect()
+    await http_client_service.disconnect()
     await engine.dispose()
 
     logger.info(f"Приложение {settings.project_name.upper()} выключено!")
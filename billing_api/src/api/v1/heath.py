@@ -1,14 +1,18 @@
 import logging
 from datetime import datetime
 
+from common.backoff import backoff_metrics
+from common.db import pool_stats
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.auth_depends import get_token_data
+from src.core.auth_depends import get_token_data, token_verifier
 from src.db import postgres
 from src.schemas.billing_event import BillingEventRequest, BillingEventMessage
-from src.services.kafka import KafkaService, get_kafka_service
+from src.services.kafka import KafkaService, get_kafka_service, kafka_service
+from src.services.outbox_relay import outbox_relay
+from src.services.token_revocation import token_revocation_listener
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,19 @@ async def health_check():
     return {"status": "ok", "service": "billing-api"}
 
 
+@router.get("/metrics")
+async def metrics():
+    """Счетчики повторов исходящих вызовов"""
+    return {
+        "backoff": backoff_metrics.snapshot(),
+        "kafka": kafka_service.stats(),
+        "outbox": outbox_relay.stats(),
+        "token_revocation": token_revocation_listener.stats(),
+        "token_cache": token_verifier.stats(),
+        "db_pool": pool_stats(postgres.engine),
+    }
+
+
 @router.get("/service-auth")
 async def health_check_auth(current_user=Depends(get_token_data)):
     """Проверка состояния сервиса"""
@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,7 +23,8 @@ from src.schemas.user_subscription import (
     UserSubscriptionPaymentResponse,
     UserSubscriptionUpdateResponse
 )
-from src.services.kafka import KafkaService, get_kafka_service
+from src.services.http_client import get_http_client
+from src.services.outbox_relay import outbox_relay
 from src.services.payment import create_payment
 
 logger = logging.getLogger(__name__)
@@ -36,7 +38,8 @@ router = APIRouter(prefix="/api/v1/billing", tags=["billing"])
 async def create_user_subscription_and_payment(
     payload: UserSubscriptionCreate,
     session: AsyncSession = Depends(postgres.get_db),
-    user_token_data: TokenPayload = Depends(get_token_data)
+    user_token_data: TokenPayload = Depends(get_token_data),
+    http_client: httpx.AsyncClient = Depends(get_http_client)
 ):
 
     # 1. Создаём UserSubscription (запрос в бд)
@@ -56,7 +59,7 @@ async def create_user_subscription_and_payment(
         description=f'Оплата: {payload.amount} руб'
         # можно еще подтянуть из бд название подписки по план_айди
     )
-    payment = await create_payment(payment_payload)
+    payment = await create_payment(payment_payload, http_client)
 
     return UserSubscriptionPaymentResponse(
         id=user_subscription.id,
@@ -72,10 +75,9 @@ async def update_subscription_status(
     user_subscription_id: str = Path(...),
     update: UserSubscriptionUpdate = ...,
     session: AsyncSession = Depends(postgres.get_db),
-    kafka_service: KafkaService = Depends(get_kafka_service)
 ):
     if update.status:
-        user_subscription = await get_user_subscription(session, user_subscription_id)
+        user_subscription = await get_user_subscription(session, user_subscription_id, for_update=True)
 
         if user_subscription is None:
             raise HTTPException(
@@ -85,16 +87,8 @@ async def update_subscription_status(
 
         # Сохраняем старый статус для проверки изменений
         old_status = user_subscription.status
+        new_status = update.status
 
-        user_subscription = await update_user_subscription_status(
-            session,
-            user_subscription,
-            update
-        )
-
-        # Отправляем событие в Kafka при изменении статуса
-        new_status = user_subscription.status
-        
         # Определяем тип события на основе нового статуса
         event_type = None
         if new_status == SubscriptionStatus.active and old_status != SubscriptionStatus.active:
@@ -102,30 +96,34 @@ async def update_subscription_status(
         elif (new_status in (SubscriptionStatus.canceled, SubscriptionStatus.expired)
               and old_status == SubscriptionStatus.active):
             event_type = EventType.UNSUBSCRIBE
-        
-        # Отправляем событие если статус изменился на релевантный
+
+        # Событие пишется в outbox в одной транзакции со статусом,
+        # в Kafka его отправит outbox relay
+        event = None
         if event_type:
-            try:
-                message = BillingEventMessage(
-                    user_id=str(user_subscription.user_id),
-                    event_type=event_type.value
-                )
-                event_data = message.model_dump()
-                event_data["timestamp"] = datetime.utcnow().isoformat()
-                
-                event_id = await kafka_service.send_billing_event(event_data)
-                
-                logger.info(
-                    f"Billing event sent: event_id={event_id}, "
-                    f"user_id={user_subscription.user_id}, "
-                    f"event_type={event_type.value}, "
-                    f"status_change={old_status.value}->{new_status.value}"
-                )
-            except Exception as e:
-                logger.error(
-                    f"Ошибка отправки события в Kafka для пользователя {user_subscription.user_id}: {e}"
-                )
-                # Не прерываем выполнение, т.к. статус уже обновлен в БД
+            message = BillingEventMessage(
+                user_id=str(user_subscription.user_id),
+                event_type=event_type.value
+            )
+            event_data = message.model_dump()
+            event_data["timestamp"] = datetime.utcnow().isoformat()
+            event = (settings.kafka.topic_billing_events, event_data)
+
+        user_subscription = await update_user_subscription_status(
+            session,
+            user_subscription,
+            update,
+            event=event
+        )
+
+        if event_type:
+            outbox_relay.notify()
+            logger.info(
+                f"Billing event queued: "
+                f"user_id={user_subscription.user_id}, "
+                f"event_type={event_type.value}, "
+                f"status_change={old_status.value}->{new_status.value}"
+            )
 
     return UserSubscriptionUpdateResponse(
         user_subscription_id=user_subscription.id,
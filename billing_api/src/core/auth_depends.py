@@ -1,52 +1,31 @@
-from typing import List, Optional
+from typing import List
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from pydantic import BaseModel
+from common.auth import TokenCache, TokenPayload, TokenVerifier, bearer_scheme
+from fastapi import Depends, status
+from fastapi.security import HTTPAuthorizationCredentials
 
 from src.core.config import settings
 from src.exceptions import HandledHTTPException
+from src.services.token_revocation import revocation_filter
 
-bearer_scheme = HTTPBearer(auto_error=False)
+token_verifier = TokenVerifier(
+    secret_key=settings.jwt.secretkey,
+    algorithm=settings.jwt.algorithm,
+    revocation_filter=revocation_filter,
+    cache=TokenCache(max_size=settings.jwt.cache_max_size, ttl=settings.jwt.cache_ttl),
+)
 
 
-class TokenPayload(BaseModel):
-    sub: str
-    roles: List[str] = []
-    exp: Optional[int] = None  # если нужна проверка на срок действия — опционально
-
-
-async def get_token_data(
-        token: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)
-) -> TokenPayload:
-    """
-    Извлекает данные из JWT токена.
-    """
-
-    credentials_exception = HandledHTTPException(
+def _credentials_exception() -> HandledHTTPException:
+    return HandledHTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Ошибка авторизации",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    if not token:
-        raise credentials_exception
-
-    try:
-        payload = jwt.decode(
-            token.credentials,
-            settings.jwt.secretkey,
-            algorithms=[settings.jwt.algorithm]
-        )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValueError):
-        raise credentials_exception
-
-    if not token_data.sub:
-        raise credentials_exception
 
-    return token_data
+# Извлекает данные из JWT токена
+get_token_data = token_verifier.dependency(_credentials_exception)
 
 
 async def get_user_roles_from_token(token: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> List[str]:
@@ -2,7 +2,10 @@ import logging
 from pathlib import Path
 
 import dotenv
-from pydantic import BaseModel, Field, HttpUrl
+from common.db import EngineConfig
+from common.http import HttpClientConfig
+from common.revocation import RevocationConfig
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from src.core.logger_config import LoggerSettings
@@ -26,6 +29,7 @@ class Postgres(BaseModel):
     user: str = "postgres"
     password: str = "postgres"
     db: str = "pg_db"
+    pool: EngineConfig = EngineConfig()
 
     @property
     def ASYNC_DATABASE_URL(self):
@@ -35,6 +39,9 @@ class Postgres(BaseModel):
 class JWT(BaseModel):
     secretkey: str
     algorithm: str
+    cache_max_size: int = 10000  # Проверенных токенов в памяти
+    cache_ttl: float = 300.0  # Не дольше exp токена
+    expire_access_minutes: int = 180  # Как JWT__EXPIRE_ACCESS_MINUTES в auth_api
 
 
 class Kafka(BaseModel):
@@ -45,6 +52,11 @@ class Kafka(BaseModel):
     request_timeout_ms: int = 30000
     enable_idempotence: bool = True
     acks: str = "all"
+    # wait — ждать подтверждения брокера в запросе, track — подтверждение в колбэке
+    delivery_mode: str = "track"
+    linger_ms: int = 5
+    max_batch_size: int = 16384
+    compression_type: str | None = "gzip"
 
     @property
     def bootstrap_servers_list(self) -> list[str]:
@@ -52,9 +64,31 @@ class Kafka(BaseModel):
         return [server.strip() for server in self.bootstrap_servers.split(",")]
 
 
+class Retry(BaseModel):
+    """Бюджет повторов для отправки в Kafka и исходящих HTTP-запросов."""
+
+    max_attempts: int = 5
+    start_sleep_time: float = 0.1
+    border_sleep_time: float = 5.0
+    deadline: float = 15.0
+
+
+class Outbox(BaseModel):
+    """Настройки публикации событий из outbox в Kafka."""
+
+    poll_interval: float = 1.0
+    batch_size: int = 100
+    retention_hours: int = 24
+    cleanup_interval: float = 3600.0
+    # пауза перед повтором неотправленного события растет от start до border
+    start_sleep_time: float = 1.0
+    border_sleep_time: float = 300.0
+
+
 class Payment(BaseModel):
     redirect_url: HttpUrl = "https://example.com/"
     create_url: str = "http://payment_api:8000/api/v1/payment/youkassa/payment"
+    timeout: float = 10.0
 
 
 class AppConfig(BaseSettings):
@@ -68,14 +102,26 @@ class AppConfig(BaseSettings):
     jwt: JWT
     kafka: Kafka = Kafka()
     payment: Payment = Payment()
+    http: HttpClientConfig = HttpClientConfig()
+    retry: Retry = Retry()
+    outbox: Outbox = Outbox()
+    revocation: RevocationConfig = RevocationConfig()
 
     model_config = SettingsConfigDict(
         env_file=ENV_FILE,
         case_sensitive=False,
         env_nested_delimiter="_",
+        # HTTP_MAX_CONNECTIONS -> http.max_connections: делим только по первому "_"
+        env_nested_max_split=1,
         extra="ignore",
     )
 
+    @model_validator(mode="after")
+    def revocation_windows(self) -> "AppConfig":
+        # окна отзыва считаются от срока жизни токена, слишком короткие не дают стартовать
+        self.revocation = self.revocation.for_token_lifetime(self.jwt.expire_access_minutes)
+        return self
+
 
 def _get_config() -> AppConfig:
     log = LoggerSettings()
@@ -0,0 +1,119 @@
+import datetime
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.outbox import OutboxEvent
+
+
+def add_outbox_event(
+    session: AsyncSession,
+    topic: str,
+    payload: Dict[str, Any],
+    key: str | None = None
+) -> OutboxEvent:
+    """Добавляет событие в outbox текущей транзакции, коммит делает вызывающий"""
+    event_id = uuid.uuid4()
+    event = OutboxEvent(
+        id=event_id,
+        topic=topic,
+        key=key,
+        payload={**payload, "event_id": str(event_id)},
+        attempts=0,
+    )
+    session.add(event)
+    return event
+
+
+async def get_pending_events(
+    session: AsyncSession,
+    limit: int
+) -> list[OutboxEvent]:
+    """
+    Неотправленные события, чей срок повтора наступил; SKIP LOCKED не дает двум релеям взять одну пачку.
+    События с ключом отдаются строго по порядку: если перед событием есть неотправленное
+    с тем же ключом вне пачки (отложено или захвачено другим релеем), оно ждет.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    previous = aliased(OutboxEvent)
+    result = await session.execute(
+        select(OutboxEvent)
+        .where(
+            OutboxEvent.sent_at.is_(None),
+            OutboxEvent.next_attempt_at <= now,
+            ~select(previous.id)
+            .where(
+                previous.key == OutboxEvent.key,
+                previous.sent_at.is_(None),
+                previous.seq < OutboxEvent.seq,
+                previous.next_attempt_at > now,
+            )
+            .exists(),
+        )
+        .order_by(OutboxEvent.seq)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    events = list(result.scalars().all())
+
+    keys = {event.key for event in events if event.key is not None}
+    if not keys:
+        return events
+    # первые неотправленные события по ключам, которые не попали в пачку
+    blocked = await session.execute(
+        select(OutboxEvent.key, func.min(OutboxEvent.seq))
+        .where(
+            OutboxEvent.key.in_(keys),
+            OutboxEvent.sent_at.is_(None),
+            OutboxEvent.id.not_in([event.id for event in events]),
+        )
+        .group_by(OutboxEvent.key)
+    )
+    first_blocked = dict(blocked.all())
+    return [
+        event for event in events
+        if event.key not in first_blocked or event.seq < first_blocked[event.key]
+    ]
+
+
+async def mark_events_sent(
+    session: AsyncSession,
+    event_ids: list[uuid.UUID]
+) -> None:
+    await session.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(event_ids))
+        .values(sent_at=datetime.datetime.now(datetime.timezone.utc))
+    )
+
+
+async def reschedule_event(
+    session: AsyncSession,
+    event_id: uuid.UUID,
+    delay: float,
+    error: str
+) -> None:
+    """Откладывает неотправленное событие на delay секунд"""
+    await session.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id == event_id)
+        .values(
+            attempts=OutboxEvent.attempts + 1,
+            next_attempt_at=datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(seconds=delay),
+            last_error=error[:1000],
+        )
+    )
+
+
+async def delete_sent_events(
+    session: AsyncSession,
+    older_than: datetime.datetime
+) -> int:
+    result = await session.execute(
+        delete(OutboxEvent).where(OutboxEvent.sent_at < older_than)
+    )
+    return result.rowcount
@@ -1,22 +1,28 @@
 import datetime
 import uuid
+from typing import Any, Dict
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.crud.outbox import add_outbox_event
 from src.models.user_subscription import UserSubscription, SubscriptionStatus
 from src.schemas.user_subscription import UserSubscriptionUpdate
 
 
 async def get_user_subscription(
         session: AsyncSession,
-        user_subscription_id: uuid
+        user_subscription_id: uuid,
+        for_update: bool = False
 ) -> UserSubscription | None:
 
-    return await session.scalar(
-        select(UserSubscription).where(
-            UserSubscription.id == user_subscription_id)
-    )
+    query = select(UserSubscription).where(
+        UserSubscription.id == user_subscription_id)
+    if for_update:
+        # блокируем строку до коммита, чтобы параллельные вебхуки
+        # не породили два события об одной смене статуса
+        query = query.with_for_update()
+    return await session.scalar(query)
 
 
 async def create_user_subscription(
@@ -42,12 +48,19 @@ async def create_user_subscription(
 async def update_user_subscription_status(
     session: AsyncSession,
     user_subscription: UserSubscription,
-    update: UserSubscriptionUpdate
+    update: UserSubscriptionUpdate,
+    event: tuple[str, Dict[str, Any]] | None = None
 ) -> UserSubscription:
-
+    """
+    Обновляет статус подписки.
+    event (topic, payload) записывается в outbox в той же транзакции.
+    """
     user_subscription.status = update.status
 
     session.add(user_subscription)
+    if event is not None:
+        topic, payload = event
+        add_outbox_event(session, topic, payload, key=str(user_subscription.user_id))
     await session.commit()
     await session.refresh(user_subscription)
 
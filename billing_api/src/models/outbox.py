@@ -0,0 +1,31 @@
+import uuid
+
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from src.db.postgres import Base
+
+
+class OutboxEvent(Base):
+    """Событие для Kafka, записанное в одной транзакции с изменением данных"""
+    __tablename__ = "outbox_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # он же event_id
+    # порядок записи: у событий одной транзакции created_at совпадает
+    seq = Column(BigInteger, Identity(), nullable=False)
+    topic = Column(String, nullable=False)
+    key = Column(String, nullable=True)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(String, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    __table_args__ = (
+        # релей выбирает только неотправленные события
+        Index("ix_outbox_events_pending", "seq",
+              postgresql_where=text("sent_at IS NULL")),
+        # проверка, что перед событием нет неотправленных с тем же ключом
+        Index("ix_outbox_events_pending_key", "key", "seq",
+              postgresql_where=text("sent_at IS NULL")),
+    )
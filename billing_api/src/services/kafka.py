@@ -1,17 +1,26 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 from uuid import uuid4
 
 from aiokafka import AIOKafkaProducer
 from aiokafka.errors import KafkaError
+from aiokafka.structs import RecordMetadata
+from common.backoff import backoff
 
 from src.core.config import settings
-from src.utils.backoff import backoff
 
 logger = logging.getLogger(__name__)
 
 
+def is_retryable_kafka_error(exc: BaseException) -> bool:
+    """Повторяем только временные ошибки брокера и сети"""
+    if isinstance(exc, KafkaError):
+        return exc.retriable
+    return isinstance(exc, (ConnectionError, asyncio.TimeoutError))
+
+
 class KafkaService:
     """Сервис для работы с Kafka."""
     
@@ -20,6 +29,11 @@ class KafkaService:
         self.producer: AIOKafkaProducer | None = None
         self.bootstrap_servers = settings.kafka.bootstrap_servers
         self.billing_events_topic = settings.kafka.topic_billing_events
+        # счетчики режима fire-and-track
+        self.in_flight = 0
+        self.delivered = 0
+        self.failed = 0
+        self._pending: set[asyncio.Future] = set()
         logger.info(f"KafkaService инициализирован. Брокеры: {self.bootstrap_servers}")
     
     async def connect(self) -> None:
@@ -31,25 +45,30 @@ class KafkaService:
                 key_serializer=lambda k: k.encode('utf-8') if k else None,
                 enable_idempotence=settings.kafka.enable_idempotence,
                 acks=settings.kafka.acks,
-                request_timeout_ms=settings.kafka.request_timeout_ms
+                request_timeout_ms=settings.kafka.request_timeout_ms,
+                linger_ms=settings.kafka.linger_ms,
+                max_batch_size=settings.kafka.max_batch_size,
+                compression_type=settings.kafka.compression_type,
             )
             await self.producer.start()
             logger.info("Подключение к Kafka установлено")
         except Exception as e:
             logger.error(f"Ошибка подключения к Kafka: {e}")
+            self.producer = None
             raise
     
     async def disconnect(self) -> None:
         """Отключение от Kafka."""
         if self.producer:
             try:
+                # дожидаемся подтверждения уже поставленных в очередь сообщений
+                await self.flush()
                 await self.producer.stop()
                 logger.info("Отключение от Kafka")
             except Exception as e:
                 logger.error(f"Ошибка при отключении от Kafka: {e}")
         self.producer = None
 
-    @backoff(0.1, 2, 10, logger)   
     async def send_event(self, topic: str, event_data: Dict[str, Any], key: str | None = None) -> str:
         """
         Отправка события в Kafka топик.
@@ -65,36 +84,38 @@ class KafkaService:
         Raises:
             KafkaError: При ошибке отправки
         """
+        event_id, enriched_data, key = self._enrich(event_data, key)
+
+        # event_id формируется один раз, повторы отправляют то же событие
+        record_metadata = await self._send(topic, enriched_data, key)
+
+        logger.info(
+            f"Событие отправлено в топик '{topic}': "
+            f"event_id={event_id}, partition={record_metadata.partition}, "
+            f"offset={record_metadata.offset}"
+        )
+
+        return event_id
+
+    @backoff(
+        start_sleep_time=settings.retry.start_sleep_time,
+        border_sleep_time=settings.retry.border_sleep_time,
+        max_attempts=settings.retry.max_attempts,
+        deadline=settings.retry.deadline,
+        retry_if=is_retryable_kafka_error,
+        logger=logger,
+    )
+    async def _send(self, topic: str, value: Dict[str, Any], key: str | None) -> RecordMetadata:
+        """Отправка одного сообщения с ожиданием подтверждения брокера."""
         if not self.producer:
             await self.connect()
-            
-        event_id = str(uuid4())
-        
-        # Добавляем event_id к данным
-        enriched_data = {
-            **event_data,
-            "event_id": event_id,
-            "timestamp": event_data.get("timestamp")
-        }
-        if not key:
-            key = event_data.get("user_id")
 
         try:
-            # Отправляем сообщение
-            record_metadata = await self.producer.send_and_wait(
+            return await self.producer.send_and_wait(
                 topic=topic,
-                value=enriched_data,
+                value=value,
                 key=key
             )
-            
-            logger.info(
-                f"Событие отправлено в топик '{topic}': "
-                f"event_id={event_id}, partition={record_metadata.partition}, "
-                f"offset={record_metadata.offset}"
-            )
-            
-            return event_id
-            
         except KafkaError as e:
             logger.error(f"Ошибка отправки в Kafka: {e}")
             raise
@@ -102,10 +123,138 @@ class KafkaService:
             logger.error(f"Неожиданная ошибка при отправке: {e}")
             raise
     
+    @staticmethod
+    def _enrich(event_data: Dict[str, Any], key: str | None) -> tuple[str, Dict[str, Any], str | None]:
+        """Добавляет event_id к данным и выбирает ключ сообщения."""
+        event_id = event_data.get("event_id") or str(uuid4())
+        enriched_data = {
+            **event_data,
+            "event_id": event_id,
+            "timestamp": event_data.get("timestamp")
+        }
+        if not key:
+            key = event_data.get("user_id")
+        return event_id, enriched_data, key
+
+    @backoff(
+        start_sleep_time=settings.retry.start_sleep_time,
+        border_sleep_time=settings.retry.border_sleep_time,
+        max_attempts=settings.retry.max_attempts,
+        deadline=settings.retry.deadline,
+        retry_if=is_retryable_kafka_error,
+        logger=logger,
+    )
+    async def _enqueue(self, topic: str, value: Dict[str, Any], key: str | None) -> asyncio.Future:
+        """
+        Постановка сообщения в буфер продюсера.
+        Ждет только при переполненном буфере, подтверждение брокера приходит во future.
+        """
+        if not self.producer:
+            await self.connect()
+        return await self.producer.send(topic=topic, value=value, key=key)
+
+    def _track(self, future: asyncio.Future, topic: str, event_id: str) -> None:
+        self.in_flight += 1
+        self._pending.add(future)
+
+        def on_delivery(fut: asyncio.Future) -> None:
+            self.in_flight -= 1
+            self._pending.discard(fut)
+            if fut.cancelled():
+                self.failed += 1
+                logger.error(f"Отправка события отменена: topic='{topic}', event_id={event_id}")
+                return
+            exc = fut.exception()
+            if exc is not None:
+                self.failed += 1
+                logger.error(f"Событие не доставлено в топик '{topic}': event_id={event_id}, {exc}")
+                return
+            self.delivered += 1
+            record_metadata = fut.result()
+            logger.info(
+                f"Событие доставлено в топик '{topic}': "
+                f"event_id={event_id}, partition={record_metadata.partition}, "
+                f"offset={record_metadata.offset}"
+            )
+
+        future.add_done_callback(on_delivery)
+
+    async def send_event_nowait(
+            self, topic: str, event_data: Dict[str, Any], key: str | None = None
+    ) -> str:
+        """
+        Отправка события без ожидания подтверждения брокера (fire-and-track).
+        Результат доставки обрабатывается в колбэке, сообщения копятся
+        продюсером в пачки по linger_ms/max_batch_size.
+        """
+        event_id, enriched_data, key = self._enrich(event_data, key)
+        future = await self._enqueue(topic, enriched_data, key)
+        self._track(future, topic, event_id)
+        return event_id
+
+    async def send_events(
+            self, topic: str, events: List[Dict[str, Any]], wait: bool = False
+    ) -> List[str]:
+        """
+        Пакетная отправка: все события ставятся в буфер продюсера сразу,
+        при wait=True дожидаемся подтверждения всех.
+        """
+        event_ids = []
+        futures = []
+        for event_data in events:
+            event_id, enriched_data, key = self._enrich(event_data, None)
+            future = await self._enqueue(topic, enriched_data, key)
+            self._track(future, topic, event_id)
+            event_ids.append(event_id)
+            futures.append(future)
+        if wait and futures:
+            await asyncio.gather(*futures)
+        return event_ids
+
+    async def publish_batch(
+            self, records: List[tuple[str, str | None, Dict[str, Any]]]
+    ) -> List[BaseException | None]:
+        """
+        Отправка пачки записей (topic, key, payload) с ожиданием подтверждения.
+        Возвращает результат по каждой записи: None или ошибку доставки.
+        """
+        futures = []
+        for topic, key, payload in records:
+            event_id, enriched_data, key = self._enrich(payload, key)
+            try:
+                future = await self._enqueue(topic, enriched_data, key)
+            except Exception as e:
+                future = asyncio.get_running_loop().create_future()
+                future.set_exception(e)
+            else:
+                self._track(future, topic, event_id)
+            futures.append(future)
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [r if isinstance(r, BaseException) else None for r in results]
+
+    async def flush(self) -> None:
+        """Дождаться отправки всех сообщений из буфера продюсера."""
+        if self.producer and self._pending:
+            await self.producer.flush()
+
+    def stats(self) -> dict:
+        return {
+            "delivery_mode": settings.kafka.delivery_mode,
+            "in_flight": self.in_flight,
+            "delivered": self.delivered,
+            "failed": self.failed,
+        }
+
     async def send_billing_event(self, event_data: Dict[str, Any]) -> str:
         """Отправка события биллинга в billing events топик."""
+        if settings.kafka.delivery_mode == "track":
+            return await self.send_event_nowait(self.billing_events_topic, event_data)
         return await self.send_event(self.billing_events_topic, event_data)
 
+    async def send_billing_events(self, events: List[Dict[str, Any]], wait: bool = False) -> List[str]:
+        """Пакетная отправка событий биллинга, например при массовой смене статусов."""
+        return await self.send_events(self.billing_events_topic, events, wait=wait)
+
 
 # Глобальный экземпляр сервиса
 kafka_service = KafkaService()
@@ -0,0 +1,149 @@
+import asyncio
+import datetime
+import logging
+import random
+from contextlib import suppress
+
+from src.core.config import settings
+from src.crud.outbox import (
+    delete_sent_events,
+    get_pending_events,
+    mark_events_sent,
+    reschedule_event,
+)
+from src.db import postgres
+from src.models.outbox import OutboxEvent
+from src.services.kafka import kafka_service
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Фоновая публикация событий из outbox в Kafka"""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self.published = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Outbox relay запущен")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+    def notify(self) -> None:
+        """Разбудить релей после коммита нового события"""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        last_cleanup = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                processed = await self.process_batch()
+                if loop.time() - last_cleanup > settings.outbox.cleanup_interval:
+                    await self.cleanup()
+                    last_cleanup = loop.time()
+            except Exception as e:
+                logger.error(f"Ошибка outbox relay: {e}")
+                processed = 0
+            if processed < settings.outbox.batch_size:
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), settings.outbox.poll_interval)
+
+    @staticmethod
+    def _next_delay(attempts: int) -> float:
+        delay = min(settings.outbox.border_sleep_time,
+                    settings.outbox.start_sleep_time * (2 ** attempts))
+        return random.uniform(delay / 2, delay)
+
+    @staticmethod
+    async def _publish_in_order(
+            events: list[OutboxEvent]
+    ) -> tuple[list[OutboxEvent], list[tuple[OutboxEvent, BaseException]]]:
+        """
+        Публикация раундами: в раунде не больше одного события на ключ, разные ключи идут параллельно.
+        После ошибки следующие события того же ключа в пачке не отправляются,
+        иначе отложенное событие пришло бы в Kafka позже более нового.
+        """
+        rounds: list[list[OutboxEvent]] = []
+        positions: dict[str, int] = {}
+        for event in events:
+            position = 0
+            if event.key is not None:
+                position = positions.get(event.key, 0)
+                positions[event.key] = position + 1
+            if position == len(rounds):
+                rounds.append([])
+            rounds[position].append(event)
+
+        sent: list[OutboxEvent] = []
+        failed: list[tuple[OutboxEvent, BaseException]] = []
+        stopped: set[str] = set()
+        for round_events in rounds:
+            round_events = [event for event in round_events if event.key not in stopped]
+            if not round_events:
+                continue
+            results = await kafka_service.publish_batch(
+                [(event.topic, event.key, event.payload) for event in round_events]
+            )
+            for event, error in zip(round_events, results):
+                if error is None:
+                    sent.append(event)
+                    continue
+                failed.append((event, error))
+                if event.key is not None:
+                    stopped.add(event.key)
+        return sent, failed
+
+    async def process_batch(self) -> int:
+        """
+        Пачка событий публикуется с ожиданием подтверждения брокера и
+        помечается отправленной в той же транзакции, где была заблокирована.
+        Неотправленные откладываются с растущей паузой, события того же ключа ждут их.
+        Доставка не реже одного раза: потребители различают дубли по event_id.
+        """
+        async with postgres.get_db_context() as session:
+            async with session.begin():
+                events = await get_pending_events(session, settings.outbox.batch_size)
+                if not events:
+                    return 0
+
+                sent, failed = await self._publish_in_order(events)
+
+                if sent:
+                    await mark_events_sent(session, [event.id for event in sent])
+                for event, error in failed:
+                    await reschedule_event(session, event.id, self._next_delay(event.attempts),
+                                           repr(error))
+                if failed:
+                    logger.warning(f"Outbox: не отправлено {len(failed)} событий, повтор позже")
+
+        self.published += len(sent)
+        self.failed += len(failed)
+        return len(sent)
+
+    async def cleanup(self) -> None:
+        older_than = (datetime.datetime.now(datetime.timezone.utc)
+                      - datetime.timedelta(hours=settings.outbox.retention_hours))
+        async with postgres.get_db_context() as session:
+            async with session.begin():
+                deleted = await delete_sent_events(session, older_than)
+        if deleted:
+            logger.info(f"Outbox: удалено {deleted} отправленных событий")
+
+    def stats(self) -> dict:
+        return {"published": self.published, "failed": self.failed}
+
+
+# Глобальный экземпляр
+outbox_relay = OutboxRelay()
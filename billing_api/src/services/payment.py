@@ -1,16 +1,34 @@
+import logging
+
 import httpx
+from common.backoff import backoff
+from common.http import is_connect_error
+
 from src.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 
-async def create_payment(payment_payload):
+@backoff(
+    start_sleep_time=settings.retry.start_sleep_time,
+    border_sleep_time=settings.retry.border_sleep_time,
+    max_attempts=settings.retry.max_attempts,
+    deadline=settings.retry.deadline,
+    retry_if=is_connect_error,
+    logger=logger,
+)
+async def create_payment(payment_payload, client: httpx.AsyncClient):
     payment_payload_json_str = payment_payload.model_dump_json()
     url = settings.payment.create_url
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url,
-                                     content=payment_payload_json_str,
-                                     headers={"Content-Type": "application/json"}
-                                     )
-        response.raise_for_status()  # выбросит ошибку, если статус не 2xx
-        data = response.json()
+    response = await client.post(url,
+                                 content=payment_payload_json_str,
+                                 headers={"Content-Type": "application/json"},
+                                 timeout=httpx.Timeout(
+                                     settings.payment.timeout,
+                                     connect=settings.http.connect_timeout,
+                                 ),
+                                 )
+    response.raise_for_status()  # выбросит ошибку, если статус не 2xx
+    data = response.json()
 
     return data
@@ -0,0 +1,5 @@
+import os
+
+# settings создаются при импорте src.core.config, секрет JWT обязателен
+os.environ.setdefault("JWT_SECRETKEY", "test-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
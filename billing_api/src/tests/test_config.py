@@ -0,0 +1,36 @@
+import pytest
+from pydantic import ValidationError
+
+from src.core.config import AppConfig
+
+
+def test_nested_settings_with_multi_word_names_load_from_env(monkeypatch):
+    monkeypatch.setenv("JWT_SECRETKEY", "secret")
+    monkeypatch.setenv("JWT_ALGORITHM", "HS256")
+    monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "5")
+    monkeypatch.setenv("KAFKA_DELIVERY_MODE", "wait")
+    monkeypatch.setenv("OUTBOX_BATCH_SIZE", "3")
+
+    config = AppConfig()
+
+    assert config.jwt.secretkey == "secret"
+    assert config.http.max_connections == 5
+    assert config.kafka.delivery_mode == "wait"
+    assert config.outbox.batch_size == 3
+
+
+def test_revocation_windows_default_to_access_token_lifetime(monkeypatch):
+    monkeypatch.setenv("JWT_EXPIRE_ACCESS_MINUTES", "180")
+
+    config = AppConfig()
+
+    assert config.revocation.lookback_minutes == 180
+    assert config.revocation.rotate_interval == 180 * 60
+
+
+def test_revocation_windows_shorter_than_token_lifetime_are_rejected(monkeypatch):
+    monkeypatch.setenv("JWT_EXPIRE_ACCESS_MINUTES", "180")
+    monkeypatch.setenv("REVOCATION_LOOKBACK_MINUTES", "60")
+
+    with pytest.raises(ValidationError):
+        AppConfig()
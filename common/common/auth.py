@@ -0,0 +1,148 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from pydantic import BaseModel
+
+from common.revocation import RevocationFilter
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+class TokenPayload(BaseModel):
+    sub: str
+    roles: List[str] = []
+    exp: Optional[int] = None  # если нужна проверка на срок действия — опционально
+    jti: Optional[str] = None
+    iat: Optional[float] = None  # auth_api выдает iat с долями секунды
+
+
+class TokenCache:
+    """
+    Ограниченный LRU-кэш проверенных токенов.
+
+    Ключ — digest токена целиком вместе с подписью, поэтому поддельный
+    токен в кэш не попадет. Запись живет до exp токена, но не дольше ttl.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[TokenPayload, float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> TokenPayload | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: TokenPayload) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if payload.exp is not None:
+            expires_at = min(expires_at, payload.exp)
+        key = self._key(token)
+        self._entries[key] = (payload, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+class TokenVerifier:
+    """
+    Проверка access-токенов auth_api, общая для billing_api и payment_api.
+
+    Подпись и claims проверяются один раз на токен, дальше payload берется
+    из кэша. Отзыв проверяется на каждом запросе: событие об отзыве может
+    прийти, когда токен уже в кэше. Запрос получает копию payload, чтобы
+    изменения в обработчике не попали в кэш.
+    """
+
+    def __init__(
+            self,
+            secret_key: str,
+            algorithm: str,
+            revocation_filter: RevocationFilter | None = None,
+            cache: TokenCache | None = None,
+    ):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.revocation_filter = revocation_filter
+        self.cache = cache or TokenCache()
+
+    def verify(self, token: str) -> TokenPayload | None:
+        """Payload действующего токена или None"""
+        token_data = self.cache.get(token)
+        if token_data is None:
+            try:
+                payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+                token_data = TokenPayload(**payload)
+            except (JWTError, ValueError):
+                return None
+            if not token_data.sub:
+                return None
+            self.cache.set(token, token_data)
+
+        # отзыв проверяется по локальному фильтру, без запроса в auth_api
+        if self.revocation_filter is not None and self.revocation_filter.is_revoked(
+                token_data.sub, token_data.jti, token_data.iat):
+            return None
+        return token_data.model_copy(deep=True)
+
+    def dependency(
+            self,
+            credentials_exception: Callable[[], HTTPException],
+    ) -> Callable:
+        """FastAPI-зависимость с ошибкой авторизации, принятой в сервисе"""
+
+        async def get_token_payload(
+                token: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+        ) -> TokenPayload:
+            if not token:
+                raise credentials_exception()
+            token_data = self.verify(token.credentials)
+            if token_data is None:
+                raise credentials_exception()
+            return token_data
+
+        return get_token_payload
+
+    def stats(self) -> dict:
+        return self.cache.stats()
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from functools import wraps
+from logging import Logger
+from typing import Callable, NamedTuple
+
+
+class RetryState(NamedTuple):
+    """Состояние повтора, передается в хуки метрик"""
+    func_name: str
+    attempt: int
+    elapsed: float
+    sleep_time: float
+    exception: BaseException
+
+
+class BackoffMetrics:
+    """Счетчики повторов и отказов по именам функций"""
+
+    def __init__(self):
+        self.retries: dict[str, int] = defaultdict(int)
+        self.giveups: dict[str, int] = defaultdict(int)
+
+    def on_retry(self, state: RetryState) -> None:
+        self.retries[state.func_name] += 1
+
+    def on_giveup(self, state: RetryState) -> None:
+        self.giveups[state.func_name] += 1
+
+    def snapshot(self) -> dict:
+        return {"retries": dict(self.retries), "giveups": dict(self.giveups)}
+
+
+# Глобальный экземпляр
+backoff_metrics = BackoffMetrics()
+
+
+def backoff(
+    start_sleep_time: float = 0.1,
+    factor: float = 2,
+    border_sleep_time: float = 10,
+    max_attempts: int | None = 5,
+    deadline: float | None = None,
+    retry_if: Callable[[BaseException], bool] = lambda e: True,
+    on_retry: Callable[[RetryState], None] | None = backoff_metrics.on_retry,
+    on_giveup: Callable[[RetryState], None] | None = backoff_metrics.on_giveup,
+    logger: Logger = logging.getLogger('backoff'),
+):
+    """
+    Повтор с экспоненциальной задержкой и full jitter:
+    sleep = random(0, min(border_sleep_time, start_sleep_time * factor ** attempt)).
+
+    Бюджет ограничен числом попыток max_attempts и/или общим временем deadline
+    (секунды). Повторяются только ошибки, для которых retry_if вернул True,
+    остальные пробрасываются сразу. Корутины ждут через asyncio.sleep,
+    обычные функции — через time.sleep.
+    """
+    def next_sleep(func_name: str, attempt: int, started: float, e: Exception) -> float | None:
+        elapsed = time.monotonic() - started
+        sleep_time = random.uniform(
+            0, min(border_sleep_time, start_sleep_time * (factor ** attempt))
+        )
+        state = RetryState(func_name, attempt, elapsed, sleep_time, e)
+        exhausted = (
+            (max_attempts is not None and attempt >= max_attempts)
+            or (deadline is not None and elapsed + sleep_time > deadline)
+        )
+        if exhausted or not retry_if(e):
+            if on_giveup:
+                on_giveup(state)
+            logger.error(f'{func_name} failed with {e}. Giving up after {attempt} attempt(s)')
+            return None
+        if on_retry:
+            on_retry(state)
+        logger.warning(
+            f'{func_name} failed with {e}. '
+            f'Retrying in {sleep_time:.2f} seconds (attempt {attempt})'
+        )
+        return sleep_time
+
+    def func_wrapper(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_inner(*args, **kwargs):
+                started = time.monotonic()
+                attempt = 0
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except Exception as e:
+                        attempt += 1
+                        sleep_time = next_sleep(func.__qualname__, attempt, started, e)
+                        if sleep_time is None:
+                            raise
+                        await asyncio.sleep(sleep_time)
+
+            return async_inner
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            started = time.monotonic()
+            attempt = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    attempt += 1
+                    sleep_time = next_sleep(func.__qualname__, attempt, started, e)
+                    if sleep_time is None:
+                        raise
+                    time.sleep(sleep_time)
+
+        return inner
+
+    return func_wrapper
@@ -0,0 +1,348 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+import weakref
+from contextlib import suppress
+
+from pydantic import BaseModel
+from sqlalchemy import event, make_url, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+# Счетчики движков, созданных create_engine
+_engine_metrics: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class EngineConfig(BaseModel):
+    """Настройки пула соединений и драйвера asyncpg."""
+
+    echo: bool = False  # Логирование каждого запроса заметно нагружает CPU
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0  # Ожидание свободного соединения (секунды)
+    pool_recycle: int = 1800  # Переоткрывать соединения старше (секунды)
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100  # Кэш prepared statements на соединение
+    # PgBouncer в режиме transaction: пул держит PgBouncer, prepared statements выключены
+    pgbouncer: bool = False
+
+
+class PoolMetrics:
+    """Счетчики выдачи соединений из пула и времени ожидания"""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.waits += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(sync_engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        @event.listens_for(sync_engine, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+
+        @event.listens_for(sync_engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Пул, который замеряет ожидание свободного соединения"""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.timeouts += 1
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() пересоздает пул, счетчики остаются прежними
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def create_engine(url: str, config: EngineConfig) -> AsyncEngine:
+    """Асинхронный движок с настройками пула из config и счетчиками пула"""
+    metrics = PoolMetrics()
+    connect_args = {"prepared_statement_cache_size": config.statement_cache_size}
+    pool_args = {}
+
+    if config.pgbouncer:
+        # соединение меняется между транзакциями: без кэшей и с уникальными именами
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+        pool_args["poolclass"] = NullPool
+    else:
+        pool_args.update(
+            poolclass=MeteredQueuePool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+        )
+
+    engine = create_async_engine(
+        url,
+        echo=config.echo,
+        pool_pre_ping=config.pool_pre_ping,
+        connect_args=connect_args,
+        **pool_args,
+    )
+    pool = engine.sync_engine.pool
+    if isinstance(pool, MeteredQueuePool):
+        pool.metrics = metrics
+    metrics.attach(engine)
+    _engine_metrics[engine.sync_engine] = metrics
+    return engine
+
+
+def pool_stats(engine: AsyncEngine | None) -> dict:
+    """Состояние пула и счетчики движка, созданного create_engine"""
+    if engine is None:
+        return {}
+    pool = engine.sync_engine.pool
+    stats = {"pool": pool.__class__.__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    metrics = _engine_metrics.get(engine.sync_engine)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
+
+
+class ReplicaConfig(BaseModel):
+    """Реплики только для чтения."""
+
+    hosts: str = ""  # host:port через запятую, пусто — все запросы идут в primary
+    max_lag: float = 5.0  # Реплика с большим отставанием (секунды) не используется
+    check_interval: float = 2.0
+    check_timeout: float = 1.0  # Реплика, не ответившая за это время, считается недоступной
+
+    def urls(self, primary_url: str) -> list[str]:
+        """URL реплик: те же база и учетные данные, что у primary"""
+        url = make_url(primary_url)
+        result = []
+        for host in filter(None, (h.strip() for h in self.hosts.split(","))):
+            name, _, port = host.partition(":")
+            result.append(url.set(host=name, port=int(port) if port else url.port)
+                          .render_as_string(hide_password=False))
+        return result
+
+
+# Отставание реплики. Если применен весь полученный WAL, отставания нет:
+# время последней транзакции при простое primary растет без ограничений.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для чтения с учетом отставания.
+
+    Фоновая задача раз в check_interval замеряет отставание каждой реплики.
+    Недоступные и отстающие больше max_lag реплики исключаются, пока не
+    догонят; если подходящих нет, чтение идет в primary.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: list[AsyncEngine], config: ReplicaConfig):
+        self.primary = primary
+        self.replicas = replicas
+        self.config = config
+        self._lag: dict[AsyncEngine, float | None] = {replica: None for replica in replicas}
+        self._healthy: list[AsyncEngine] = []
+        self._cycle = itertools.cycle([])
+        self._task: asyncio.Task | None = None
+
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    async def start(self) -> None:
+        if not self.replicas:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Маршрутизация чтения на реплики запущена, реплик: {len(self.replicas)}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for replica in self.replicas:
+            await replica.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.check_interval)
+            await self.check()
+
+    @staticmethod
+    async def _query_lag(replica: AsyncEngine) -> float:
+        async with replica.connect() as conn:
+            return float((await conn.execute(REPLICA_LAG_SQL)).scalar_one())
+
+    async def _measure(self, replica: AsyncEngine) -> float | None:
+        try:
+            return await asyncio.wait_for(self._query_lag(replica), self.config.check_timeout)
+        except Exception as e:
+            logger.warning(f"Реплика {replica.url.host} недоступна: {e!r}")
+            return None
+
+    async def check(self) -> None:
+        # реплики замеряются параллельно, зависшая не задерживает остальные
+        lags = await asyncio.gather(*(self._measure(replica) for replica in self.replicas))
+        self._lag = dict(zip(self.replicas, lags))
+        healthy = [
+            replica for replica, lag in self._lag.items()
+            if lag is not None and lag <= self.config.max_lag
+        ]
+        if healthy != self._healthy:
+            self._healthy = healthy
+            self._cycle = itertools.cycle(healthy)
+
+    def pick(self) -> AsyncEngine | None:
+        """Следующая подходящая реплика по кругу или None"""
+        if not self._healthy:
+            if self.replicas:
+                self.primary_fallbacks += 1
+            return None
+        self.replica_reads += 1
+        return next(self._cycle)
+
+    def stats(self) -> dict:
+        return {
+            "replicas": {
+                f"{replica.url.host}:{replica.url.port}": lag
+                for replica, lag in self._lag.items()
+            },
+            "healthy": len(self._healthy),
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "pools": [pool_stats(replica) for replica in self.replicas],
+        }
+
+
+class RoutingSession(Session):
+    """
+    Сессия, которая отправляет чтение на реплику.
+
+    На реплику уходят SELECT, помеченные execution_options(read_only=True),
+    и все SELECT сессии, открытой с info={"read_only": True}.
+    SELECT ... FOR UPDATE всегда идет в primary.
+    После первой записи сессия закрепляется за primary, чтобы читать
+    свои же изменения. Одна сессия использует одну реплику.
+    """
+
+    def __init__(self, *args, router: ReplicaRouter | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self._replica = None
+        self._pinned_primary = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self.router is None or kwargs.get("bind") is not None:
+            return primary
+        if self._flushing or (clause is not None and (
+                not isinstance(clause, Select) or clause._for_update_arg is not None)):
+            # запись, блокировка или произвольный SQL: дальше сессия читает из primary
+            self._pinned_primary = True
+            return primary
+        if self._pinned_primary or not self._wants_replica(clause):
+            return primary
+        if self._replica is None:
+            replica = self.router.pick()
+            if replica is None:
+                return primary
+            self._replica = replica.sync_engine
+        return self._replica
+
+    def _wants_replica(self, clause) -> bool:
+        if self.info.get("read_only"):
+            return True
+        if clause is None:
+            return False
+        return bool(clause.get_execution_options().get("read_only"))
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_after_flush(session, flush_context):
+    session._pinned_primary = True
+
+
+def create_routing_session_maker(
+        engine: AsyncEngine,
+        url: str,
+        pool_config: EngineConfig,
+        replica_config: ReplicaConfig,
+) -> tuple[async_sessionmaker, ReplicaRouter]:
+    """Фабрика сессий с маршрутизацией чтения и роутер реплик для lifespan"""
+    replicas = [create_engine(replica_url, pool_config) for replica_url in replica_config.urls(url)]
+    router = ReplicaRouter(engine, replicas, replica_config)
+    session_maker = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        router=router,
+        expire_on_commit=False,
+    )
+    return session_maker, router
@@ -0,0 +1,71 @@
+import logging
+
+import httpx
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientConfig(BaseModel):
+    """Настройки общего HTTP-клиента для исходящих запросов."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False  # Нужен пакет httpx[http2]
+    connect_timeout: float = 3.0
+    read_timeout: float = 10.0
+    pool_timeout: float = 3.0
+    connect_retries: int = 2
+
+
+def is_connect_error(exc: BaseException) -> bool:
+    """Запрос не ушел на сервер, повтор безопасен даже для POST"""
+    return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+class HttpClientService:
+    """Общий HTTP-клиент для исходящих запросов с пулом соединений."""
+
+    def __init__(self, config: HttpClientConfig):
+        self.config = config
+        self.client: httpx.AsyncClient | None = None
+
+    async def connect(self) -> None:
+        """Создание клиента при старте приложения."""
+        config = self.config
+        # повтор только неудачной установки соединения, запрос не дублируется
+        transport = httpx.AsyncHTTPTransport(
+            http2=config.http2,
+            retries=config.connect_retries,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+        )
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(
+                config.read_timeout,
+                connect=config.connect_timeout,
+                pool=config.pool_timeout,
+            ),
+        )
+        logger.info(
+            f"HTTP-клиент создан: max_connections={config.max_connections}, "
+            f"http2={config.http2}"
+        )
+
+    async def disconnect(self) -> None:
+        """Закрытие соединений при остановке приложения."""
+        if self.client:
+            await self.client.aclose()
+            logger.info("HTTP-клиент закрыт")
+        self.client = None
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Зависимость FastAPI: общий HTTP-клиент."""
+        if self.client is None:
+            raise ValueError("[HTTP] клиент не инициализирован")
+        return self.client
@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+
+from aiokafka import AIOKafkaConsumer, TopicPartition
+from aiokafka.errors import KafkaError
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+REVOKE_TOKEN = "jti"
+REVOKE_USER = "user"
+
+
+class RevocationConfig(BaseModel):
+    """
+    Локальная проверка отзыва access-токенов по событиям auth_api.
+
+    Отзыв должен жить, пока действует отозванный токен: lookback_minutes
+    (сколько топика перечитывается при старте) и rotate_interval (через
+    сколько забываются valid_after пользователя и вытесненные jti) не могут
+    быть короче срока жизни access-токена. Пустые значения выводятся из него.
+    """
+
+    topic: str = "token-revocations"
+    lookback_minutes: int | None = None
+    rotate_interval: float | None = None  # Секунды
+    bloom_size_bits: int = 1 << 20
+    bloom_hashes: int = 7
+    exact_max_size: int = 10000
+    users_max_size: int = 10000
+
+    def for_token_lifetime(self, access_minutes: int) -> "RevocationConfig":
+        """Окна отзыва для токенов со сроком жизни access_minutes; короче — ValueError"""
+        lookback = self.lookback_minutes if self.lookback_minutes is not None else access_minutes
+        rotate = self.rotate_interval if self.rotate_interval is not None else access_minutes * 60
+        if lookback < access_minutes:
+            raise ValueError(
+                f"lookback_minutes={lookback} короче срока жизни access-токена ({access_minutes} мин)"
+            )
+        if rotate < access_minutes * 60:
+            raise ValueError(
+                f"rotate_interval={rotate} короче срока жизни access-токена ({access_minutes * 60} с)"
+            )
+        return self.model_copy(update={"lookback_minutes": lookback, "rotate_interval": rotate})
+
+
+class BloomFilter:
+    """Битовый Bloom-фильтр фиксированного размера с двойным хешированием"""
+
+    def __init__(self, size_bits: int, hashes: int):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RevocationFilter:
+    """
+    Локальный набор отозванных access-токенов.
+
+    Отозванные jti хранятся в точном ограниченном словаре jti -> exp.
+    Когда словарь переполнен, самые старые записи вытесняются и остаются
+    только в Bloom-фильтре: попадание в него считается отзывом (ложное
+    срабатывание стоит повторного входа, пропуск отозванного токена — нет).
+    Фильтров два поколения, они меняются раз в rotate_interval, чтобы
+    записи об истекших токенах не копились.
+    Отзыв всех токенов пользователя — время valid_after с долями секунды:
+    токен с iat не позже него недействителен, выданный позже — действителен.
+    """
+
+    def __init__(
+            self,
+            bloom_size_bits: int = 1 << 20,
+            bloom_hashes: int = 7,
+            exact_max_size: int = 10000,
+            users_max_size: int = 10000,
+            rotate_interval: float = 3600.0,
+    ):
+        self.bloom_size_bits = bloom_size_bits
+        self.bloom_hashes = bloom_hashes
+        self.exact_max_size = exact_max_size
+        self.users_max_size = users_max_size
+        self.rotate_interval = rotate_interval
+
+        self._exact: OrderedDict[str, float] = OrderedDict()
+        self._users: OrderedDict[str, float] = OrderedDict()
+        self._current = BloomFilter(bloom_size_bits, bloom_hashes)
+        self._previous = BloomFilter(bloom_size_bits, bloom_hashes)
+        self._rotated_at = time.monotonic()
+        self._evicted_at: float | None = None
+
+        self.revoked_tokens = 0
+        self.revoked_users = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    def revoke_token(self, jti: str, exp: float | None) -> None:
+        exp = exp or time.time() + self.rotate_interval
+        if exp <= time.time():
+            return
+        self._current.add(jti)
+        self._exact[jti] = exp
+        self._exact.move_to_end(jti)
+        self.revoked_tokens += 1
+        while len(self._exact) > self.exact_max_size:
+            self._exact.popitem(last=False)
+            self.evicted += 1
+            self._evicted_at = time.monotonic()
+
+    def revoke_user(self, user_id: str, valid_after: float) -> None:
+        if valid_after <= self._users.get(user_id, 0):
+            return
+        self._users[user_id] = valid_after
+        self._users.move_to_end(user_id)
+        self.revoked_users += 1
+        while len(self._users) > self.users_max_size:
+            self._users.popitem(last=False)
+
+    def apply(self, event: dict) -> None:
+        """Применить событие отзыва из топика auth_api"""
+        if event.get("type") == REVOKE_TOKEN and event.get("jti"):
+            self.revoke_token(event["jti"], event.get("exp"))
+        elif event.get("type") == REVOKE_USER and event.get("user_id"):
+            self.revoke_user(event["user_id"], float(event.get("valid_after") or 0))
+
+    def _bloom_hit(self, jti: str) -> bool:
+        # Bloom нужен только для записей, вытесненных из точного словаря
+        if self._evicted_at is None:
+            return False
+        if time.monotonic() - self._evicted_at > 2 * self.rotate_interval:
+            return False
+        return jti in self._current or jti in self._previous
+
+    def is_revoked(self, sub: str, jti: str | None, iat: float | None) -> bool:
+        revoked = False
+        valid_after = self._users.get(sub)
+        if valid_after is not None and (iat is None or iat <= valid_after):
+            revoked = True
+        elif jti is not None and (jti in self._exact or self._bloom_hit(jti)):
+            revoked = True
+        if revoked:
+            self.rejected += 1
+        return revoked
+
+    def maybe_rotate(self) -> None:
+        """Сменить поколение Bloom-фильтра и удалить истекшие записи"""
+        if time.monotonic() - self._rotated_at < self.rotate_interval:
+            return
+        self._previous = self._current
+        self._current = BloomFilter(self.bloom_size_bits, self.bloom_hashes)
+        self._rotated_at = time.monotonic()
+
+        now = time.time()
+        for jti, exp in list(self._exact.items()):
+            if exp > now:
+                # действующие отзывы переносятся в новое поколение
+                self._current.add(jti)
+            else:
+                del self._exact[jti]
+        # после rotate_interval все токены, выпущенные до valid_after, истекли
+        for user_id, valid_after in list(self._users.items()):
+            if valid_after + self.rotate_interval < now:
+                del self._users[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "exact_size": len(self._exact),
+            "users_size": len(self._users),
+            "revoked_tokens": self.revoked_tokens,
+            "revoked_users": self.revoked_users,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+        }
+
+
+class TokenRevocationListener:
+    """
+    Чтение топика отзывов без consumer group: каждый экземпляр сервиса
+    получает все партиции и при старте перематывает их на lookback_minutes
+    назад, чтобы восстановить отзывы еще действующих токенов.
+    """
+
+    def __init__(
+            self,
+            revocation_filter: RevocationFilter,
+            bootstrap_servers: list[str],
+            topic: str = "token-revocations",
+            lookback_minutes: int = 60,
+            request_timeout_ms: int = 30000,
+    ):
+        self.filter = revocation_filter
+        self.bootstrap_servers = bootstrap_servers
+        self.topic = topic
+        self.lookback_minutes = lookback_minutes
+        self.request_timeout_ms = request_timeout_ms
+        self.consumer: AIOKafkaConsumer | None = None
+        self._task: asyncio.Task | None = None
+        self.consumed = 0
+
+    async def start(self) -> None:
+        try:
+            self.consumer = AIOKafkaConsumer(
+                bootstrap_servers=self.bootstrap_servers,
+                group_id=None,
+                enable_auto_commit=False,
+                auto_offset_reset="earliest",
+                value_deserializer=lambda m: json.loads(m.decode("utf-8")),
+                request_timeout_ms=self.request_timeout_ms,
+            )
+            await self.consumer.start()
+            await self._assign()
+        except KafkaError as e:
+            # без топика проверяются только подпись и срок действия токена
+            logger.error(f"Не удалось подписаться на отзывы токенов: {e}")
+            if self.consumer is not None:
+                await self.consumer.stop()
+            self.consumer = None
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Чтение отзывов токенов запущено, топик: {self.topic}")
+
+    async def _assign(self) -> None:
+        await self.consumer.topics()  # обновить метаданные кластера
+        partitions = self.consumer.partitions_for_topic(self.topic)
+        if not partitions:
+            # топик еще не создан: читаем его с начала, когда появится
+            self.consumer.subscribe([self.topic])
+            return
+
+        tps = [TopicPartition(self.topic, p) for p in partitions]
+        self.consumer.assign(tps)
+        since_ms = int((time.time() - self.lookback_minutes * 60) * 1000)
+        offsets = await self.consumer.offsets_for_times({tp: since_ms for tp in tps})
+        for tp, offset in offsets.items():
+            if offset is None:
+                await self.consumer.seek_to_end(tp)
+            else:
+                self.consumer.seek(tp, offset.offset)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self.consumer is not None:
+            await self.consumer.stop()
+            self.consumer = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                batch = await self.consumer.getmany(timeout_ms=1000)
+                for messages in batch.values():
+                    for message in messages:
+                        if isinstance(message.value, dict):
+                            self.filter.apply(message.value)
+                        self.consumed += 1
+                self.filter.maybe_rotate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка чтения отзывов токенов: {e}")
+                await asyncio.sleep(1)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "consumed": self.consumed,
+            **self.filter.stats(),
+        }
+
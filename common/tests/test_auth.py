@@ -0,0 +1,64 @@
+import time
+import uuid
+
+from jose import jwt
+
+from common import auth
+from common.auth import TokenCache, TokenPayload, TokenVerifier
+from common.revocation import RevocationFilter
+
+SECRET = "test-secret"
+
+
+def make_token(**claims) -> str:
+    now = time.time()
+    payload = {"sub": "user", "roles": ["user"], "jti": str(uuid.uuid4()),
+               "iat": now, "exp": int(now) + 600, **claims}
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+def test_cache_entry_expires_at_token_exp(monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(auth.time, "time", lambda: now)
+    cache = TokenCache(ttl=300)
+    cache.set("token", TokenPayload(sub="user", exp=int(now) + 10))
+
+    assert cache.get("token") is not None
+    now += 10
+    assert cache.get("token") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2)
+    cache.set("a", TokenPayload(sub="a"))
+    cache.set("b", TokenPayload(sub="b"))
+    cache.get("a")
+    cache.set("c", TokenPayload(sub="c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evicted"] == 1
+
+
+def test_cached_token_revoked_later_is_rejected():
+    revocation = RevocationFilter()
+    verifier = TokenVerifier(SECRET, "HS256", revocation_filter=revocation)
+    token = make_token()
+
+    payload = verifier.verify(token)
+    assert payload is not None
+    revocation.revoke_token(payload.jti, payload.exp)
+
+    assert verifier.verify(token) is None
+    assert verifier.stats()["hits"] == 1
+
+
+def test_verify_returns_copy_of_cached_payload():
+    verifier = TokenVerifier(SECRET, "HS256")
+    token = make_token()
+
+    verifier.verify(token).roles.append("admin")
+
+    assert verifier.verify(token).roles == ["user"]
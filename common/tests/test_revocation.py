@@ -0,0 +1,14 @@
+import time
+
+from common.revocation import REVOKE_USER, RevocationFilter
+
+
+def test_token_issued_in_revocation_second_is_valid():
+    revocation = RevocationFilter()
+    revoked_at = int(time.time()) + 0.3
+    revocation.apply({"type": REVOKE_USER, "user_id": "user", "valid_after": revoked_at})
+
+    # повторный вход в ту же секунду, что и отзыв
+    assert not revocation.is_revoked("user", "new", revoked_at + 0.4)
+    assert revocation.is_revoked("user", "old", revoked_at - 0.2)
+    assert revocation.is_revoked("user", "old", revoked_at)
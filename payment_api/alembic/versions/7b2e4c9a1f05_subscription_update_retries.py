@@ -0,0 +1,41 @@
+"""Subscription update retry queue
+
+Revision ID: 7b2e4c9a1f05
+Revises: d3087f31b2a1
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4c9a1f05'
+down_revision: Union[str, None] = 'd3087f31b2a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('subscription_update_retries',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_subscription_id', sa.UUID(), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_subscription_update_retries_next_attempt_at'),
+                    'subscription_update_retries', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_subscription_update_retries_next_attempt_at'),
+                  table_name='subscription_update_retries')
+    op.drop_table('subscription_update_retries')
@@ -0,0 +1,47 @@
+"""Webhook inbox
+
+Revision ID: 9c41d2b7e6a3
+Revises: e5a9c3f17d24
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d2b7e6a3'
+down_revision: Union[str, None] = 'e5a9c3f17d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('webhook_inbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('event_key', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('failed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_key')
+    )
+    op.create_index(op.f('ix_webhook_inbox_processed_at'), 'webhook_inbox', ['processed_at'], unique=False)
+    op.create_index('ix_webhook_inbox_pending', 'webhook_inbox', ['next_attempt_at'], unique=False,
+                    postgresql_where=sa.text('processed_at IS NULL AND failed_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_inbox_pending', table_name='webhook_inbox',
+                  postgresql_where=sa.text('processed_at IS NULL AND failed_at IS NULL'))
+    op.drop_index(op.f('ix_webhook_inbox_processed_at'), table_name='webhook_inbox')
+    op.drop_table('webhook_inbox')
@@ -0,0 +1,44 @@
+"""Payment surrogate key and unique youkassa_payment_id
+
+Revision ID: e5a9c3f17d24
+Revises: 7b2e4c9a1f05
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c3f17d24'
+down_revision: Union[str, None] = '7b2e4c9a1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # дубли от повторных вебхуков: остается последняя версия платежа
+    op.execute(
+        """
+        DELETE FROM payments p
+        USING payments d
+        WHERE p.youkassa_payment_id = d.youkassa_payment_id
+          AND (p.updated_at, p.id) < (d.updated_at, d.id)
+        """
+    )
+    op.drop_constraint('payments_pkey', 'payments', type_='primary')
+    op.create_primary_key('payments_pkey', 'payments', ['id'])
+    op.create_index(op.f('ix_payments_youkassa_payment_id'), 'payments', ['youkassa_payment_id'], unique=True)
+    op.create_index(op.f('ix_payments_user_subscription_id'), 'payments', ['user_subscription_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payments_user_subscription_id'), table_name='payments')
+    op.drop_index(op.f('ix_payments_youkassa_payment_id'), table_name='payments')
+    op.drop_constraint('payments_pkey', 'payments', type_='primary')
+    op.create_primary_key(
+        'payments_pkey', 'payments',
+        ['id', 'user_subscription_id', 'user_id', 'youkassa_payment_id'],
+    )
@@ -2,16 +2,21 @@ import logging
 import httpx
 from contextlib import asynccontextmanager
 
+from common.db import create_engine
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from yookassa.domain.exceptions import ApiError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.api.v1.heath import router as health_router
 from src.api.v1.youkassa import router as youkassa_router
 from src.core.config import settings
 from src.db import postgres
 from src.db.postgres import Base
+from src.services.http_client import http_client_service
+from src.services.subscription_retry import subscription_retry_worker
+from src.services.token_revocation import token_revocation_listener
+from src.services.webhook_inbox import webhook_inbox_worker
+from src.services.youkassa_client import YookassaApiError, youkassa_client
 from src import exceptions
 
 logger = logging.getLogger(__name__)
@@ -21,21 +26,32 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Управление жизненным циклом приложения"""
 
-    engine = create_async_engine(
-        url=settings.postgres.ASYNC_DATABASE_URL,
-        echo=False,
-        future=True,
-    )
+    engine = create_engine(settings.postgres.ASYNC_DATABASE_URL, settings.postgres.pool)
+    postgres.engine = engine
     postgres.async_session_maker = async_sessionmaker(
         bind=engine,
         class_=AsyncSession,
         expire_on_commit=False,
     )
 
+    # Общий HTTP-клиент и фоновая очередь повторов в billing_api
+    await http_client_service.connect()
+    await youkassa_client.connect()
+    await subscription_retry_worker.start()
+    await webhook_inbox_worker.start()
+
+    # Отзывы токенов из auth_api
+    await token_revocation_listener.start()
+
     logger.info("Application started")
 
     yield
 
+    await token_revocation_listener.stop()
+    await webhook_inbox_worker.stop()
+    await subscription_retry_worker.stop()
+    await youkassa_client.disconnect()
+    await http_client_service.disconnect()
     await engine.dispose()
 
     logger.info("Application shutdown completed")
@@ -65,6 +81,6 @@ app.include_router(youkassa_router)
 
 # обработчики
 app.add_exception_handler(httpx.TimeoutException, exceptions.timeout_exception_handler)
-app.add_exception_handler(ApiError, exceptions.youkassa_api_error_handler)
+app.add_exception_handler(YookassaApiError, exceptions.youkassa_api_error_handler)
 app.add_exception_handler(HTTPException, exceptions.http_exception_handler)
 app.add_exception_handler(Exception, exceptions.general_exception_handler)
@@ -1,9 +1,15 @@
+from common.backoff import backoff_metrics
+from common.db import pool_stats
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.auth_depends import get_current_user
+from src.core.auth_depends import get_current_user, token_verifier
+from src.db import postgres
 from src.db.postgres import get_db
+from src.services.token_revocation import token_revocation_listener
+from src.services.webhook_inbox import webhook_inbox_worker
+from src.services.youkassa_client import youkassa_client
 
 router = APIRouter(prefix="/api/v1/payment/health", tags=["health"])
 
@@ -15,6 +21,19 @@ async def health_check():
     return {"status": "ok", "service": "billing-api"}
 
 
+@router.get("/metrics")
+async def metrics():
+    """Счетчики повторов исходящих вызовов"""
+    return {
+        "backoff": backoff_metrics.snapshot(),
+        "token_revocation": token_revocation_listener.stats(),
+        "token_cache": token_verifier.stats(),
+        "db_pool": pool_stats(postgres.engine),
+        "webhook_inbox": webhook_inbox_worker.stats(),
+        "youkassa": youkassa_client.stats(),
+    }
+
+
 @router.get("/service-auth")
 async def health_check_auth(current_user=Depends(get_current_user)):
     """Проверка состояния сервиса"""
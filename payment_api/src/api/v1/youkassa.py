@@ -1,26 +1,21 @@
 import logging
-import uuid
-import asyncio
 
 from fastapi import APIRouter, Body, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from yookassa import Configuration, Payment
 
-from src.core.config import settings
-from src.crud.payment import create_payment
+from src.crud.webhook_inbox import add_inbox_event
 from src.db import postgres
 from src.schemas.yookassa_webhook_examples import (
     YOOKASSA_WEBHOOK_FAILED,
     YOOKASSA_WEBHOOK_SUCCESS,
 )
 from src.schemas.youkassa import PaymentCreate, PaymentResponse, WebhookPaymentPayload
-from src.services.user_subcription import update_user_subsription
+from src.services.webhook_inbox import get_event_key, webhook_inbox_worker
+from src.services.youkassa_client import get_idempotence_key, youkassa_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/payment/youkassa", tags=["youkassa"])
-Configuration.account_id = settings.youkassa.SHOP_ID
-Configuration.secret_key = settings.youkassa.SECRET_KEY
 
 
 @router.post("/payment",
@@ -30,13 +25,14 @@ async def create_youkassa_payment(
     payload: PaymentCreate,
 ):
     """
-    Отправляет запрос через YooKassa SDK,
+    Отправляет запрос в API YooKassa,
     возвращает ID платежи, ссылку и статус.
     """
 
     # 1 Отправляем запрос в YooKassa API
+    # ключ из id подписки: повтор запроса клиентом не создаст второй платеж
 
-    idempotence_key = str(uuid.uuid4())
+    idempotence_key = get_idempotence_key(payload.user_subscription_id)
     logger.info(f"idempotence_key для {payload.description}: {idempotence_key}")
     payment_data = {
         "amount": {
@@ -48,7 +44,7 @@ async def create_youkassa_payment(
         },
         "confirmation": {
             "type": "redirect",
-            "return_url": payload.redirect_url,
+            "return_url": str(payload.redirect_url),
         },
         "description": payload.description,
         "metadata": {
@@ -57,15 +53,13 @@ async def create_youkassa_payment(
         },
         "capture": True,
     }
-    payment = await asyncio.to_thread(Payment.create,
-                                      payment_data,
-                                      idempotence_key)
+    payment = await youkassa_client.create_payment(payment_data, idempotence_key)
 
     # 2 Возвращаем пользователю ID, ссылку и статус
     return PaymentResponse(
-        youkassa_payment_id=str(payment.id),
-        confirmation_url=payment.confirmation.confirmation_url,
-        status=payment.status,
+        youkassa_payment_id=str(payment["id"]),
+        confirmation_url=payment["confirmation"]["confirmation_url"],
+        status=payment["status"],
     )
 
 
@@ -77,24 +71,21 @@ async def yookassa_webhook(
     _doc_example: dict = Body(..., example=YOOKASSA_WEBHOOK_SUCCESS)
 ) -> dict:
     """
-    Принимает вебхук от YooKassa,
-    обновляет платёж в БД,
-    уведомляет сервис подписок.
+    Принимает вебхук от YooKassa и сохраняет его во входящую очередь.
+    Платёж и подписку обновляют фоновые воркеры, поэтому ответ
+    не ждёт ни БД платежей, ни billing_api.
     """
 
-    #  0. валидируем и получаем данные из вебхука
+    #  0. валидируем вебхук, чтобы не принимать в очередь мусор
     raw_data = await request.json()
     logger.info("Raw webhook JSON: %s", raw_data)
-    logger.info("-------------------------------------")
     payload = WebhookPaymentPayload.from_webhook(raw_data)
-    logger.info("Converted payload: %s", payload)
 
-    #  1. Создаем платеж в бд
-    await create_payment(session, payload)
-
-    # 2. Обновляем статус подписки юзера (запрос в билинг апи)
-    if payload.status.value == "succeeded":
-        data = {"status": "active"}
-        await update_user_subsription(data, payload.user_subscription_id)
+    #  1. Сохраняем во входящую очередь, повторная доставка отбрасывается
+    event_key = get_event_key(raw_data)
+    if await add_inbox_event(session, event_key, raw_data):
+        webhook_inbox_worker.notify()
+    else:
+        logger.info("Повторный вебхук %s платежа %s", event_key, payload.youkassa_payment_id)
 
     return {"status": "ok"}
@@ -1,45 +1,29 @@
-from typing import List, Optional
+from typing import List
 
+from common.auth import TokenCache, TokenPayload, TokenVerifier, bearer_scheme
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
-from pydantic import BaseModel
+from fastapi.security import HTTPAuthorizationCredentials
 
 from src.core.config import settings
+from src.services.token_revocation import revocation_filter
 
-bearer_scheme = HTTPBearer(auto_error=False)
+token_verifier = TokenVerifier(
+    secret_key=settings.jwt.secret_key,
+    algorithm=settings.jwt.algorithm,
+    revocation_filter=revocation_filter,
+    cache=TokenCache(max_size=settings.jwt.cache_max_size, ttl=settings.jwt.cache_ttl),
+)
 
 
-class TokenPayload(BaseModel):
-    sub: str
-    roles: List[str] = []
-    exp: Optional[int] = None  # если нужна проверка на срок действия — опционально
-
-
-async def get_current_user(token: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> TokenPayload:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Недействительный токен",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    if not token:
-        raise credentials_exception
-
-    try:
-        payload = jwt.decode(
-            token.credentials,
-            settings.jwt.secret_key,
-            algorithms=[settings.jwt.algorithm]
-        )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValueError):
-        raise credentials_exception
-
-    if not token_data.sub:
-        raise credentials_exception
 
-    return token_data
+get_current_user = token_verifier.dependency(_credentials_exception)
 
 
 async def get_user_roles_from_token(token: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> List[str]:
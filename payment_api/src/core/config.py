@@ -1,7 +1,10 @@
 import logging
 
 import dotenv
-from pydantic import BaseModel
+from common.db import EngineConfig
+from common.http import HttpClientConfig
+from common.revocation import RevocationConfig
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from src.core.logger_config import LoggerSettings
@@ -25,6 +28,7 @@ class Postgres(BaseModel):
     user: str = "postgres"
     password: str = "postgres"
     db: str = "pg_db"
+    pool: EngineConfig = EngineConfig()
 
     @property
     def ASYNC_DATABASE_URL(self):
@@ -32,19 +36,68 @@ class Postgres(BaseModel):
 
 
 class JWT(BaseModel):
-    secret_key: str = "your-secret-key" # почему при запуске тут берется не из енв
+    secret_key: str = "your-secret-key"
     algorithm: str = "HS256"
+    cache_max_size: int = 10000  # Проверенных токенов в памяти
+    cache_ttl: float = 300.0  # Не дольше exp токена
+    expire_access_minutes: int = 180  # Как JWT__EXPIRE_ACCESS_MINUTES в auth_api
+
+
+class Kafka(BaseModel):
+    """Настройки Kafka."""
+
+    bootstrap_servers: str = "kafka-0:9092"
+    request_timeout_ms: int = 30000
+
+    @property
+    def bootstrap_servers_list(self) -> list[str]:
+        """Получить список серверов как массив."""
+        return [server.strip() for server in self.bootstrap_servers.split(",")]
 
 
 class Subcription(BaseModel):
     update_url: str = "http://billing-api:8000/api/v1/billing/user-subscriptions/"
 
 
-# не подтягивает из енв
+class Retry(BaseModel):
+    """Повторы обновления подписки в billing_api."""
+
+    # повторы внутри обработки вебхука
+    max_attempts: int = 3
+    start_sleep_time: float = 0.2
+    border_sleep_time: float = 2.0
+    deadline: float = 5.0
+    # фоновая очередь повторов
+    queue_poll_interval: float = 5.0
+    queue_batch_size: int = 50
+    queue_start_sleep_time: float = 5.0
+    queue_border_sleep_time: float = 600.0
+    queue_lease_seconds: float = 60.0  # Через сколько запись упавшего воркера возьмет другой
+
+
+class Inbox(BaseModel):
+    """Фоновая обработка входящих вебхуков YooKassa."""
+
+    concurrency: int = 4  # Воркеров, разбирающих очередь параллельно
+    batch_size: int = 10
+    poll_interval: float = 1.0
+    lease_seconds: float = 60.0  # Через сколько событие упавшего воркера возьмет другой
+    max_attempts: int = 10
+    start_sleep_time: float = 1.0
+    border_sleep_time: float = 300.0
+    retention_hours: int = 168  # Сколько хранить обработанные события для дедупликации
+    cleanup_interval: float = 3600.0
+
+
 class Youkassa(BaseModel):
     SHOP_ID: str = "1183493"
     SECRET_KEY: str = "test_KBmu1UV2eJvzYAHNQ7ZJDzTWjvrgtEajAYraaRI8fGA"
     API: str = "https://api.yookassa.ru/v3/payments"
+    concurrency: int = 50  # Одновременных запросов к API ЮKassa
+    max_connections: int = 50
+    connect_timeout: float = 3.0
+    read_timeout: float = 10.0
+    pool_timeout: float = 3.0
 
 
 class AppConfig(BaseSettings):
@@ -58,14 +111,27 @@ class AppConfig(BaseSettings):
     jwt: JWT = JWT()
     youkassa: Youkassa = Youkassa()
     subscription: Subcription = Subcription()
+    http: HttpClientConfig = HttpClientConfig()
+    retry: Retry = Retry()
+    inbox: Inbox = Inbox()
+    kafka: Kafka = Kafka()
+    revocation: RevocationConfig = RevocationConfig()
 
     model_config = SettingsConfigDict(
         env_file=ENV_FILE,
         case_sensitive=False,
         env_nested_delimiter="_",
+        # HTTP_MAX_CONNECTIONS -> http.max_connections: делим только по первому "_"
+        env_nested_max_split=1,
         extra="ignore",
     )
 
+    @model_validator(mode="after")
+    def revocation_windows(self) -> "AppConfig":
+        # окна отзыва считаются от срока жизни токена, слишком короткие не дают стартовать
+        self.revocation = self.revocation.for_token_lifetime(self.jwt.expire_access_minutes)
+        return self
+
 
 def _get_config() -> AppConfig:
     log = LoggerSettings()
@@ -1,26 +1,54 @@
 import logging
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.payment import Payment as Payment_db
+from src.models.payment import Payment as Payment_db, PaymentStatus
 from src.schemas.youkassa import WebhookPaymentPayload
 
 logger = logging.getLogger(__name__)
 
+# Из этих статусов платеж в YooKassa уже не выходит
+FINAL_STATUSES = (PaymentStatus.succeeded, PaymentStatus.canceled)
+
 
 async def create_payment(
         session: AsyncSession,
         payload: WebhookPaymentPayload
-) -> Payment_db:
+) -> Payment_db | None:
+    """
+    Сохраняет платеж из вебхука одним INSERT ... ON CONFLICT DO UPDATE.
+
+    Строка обновляется, только если статус изменился и платеж еще не в
+    финальном статусе, поэтому повторная доставка того же вебхука и
+    запоздавший pending ничего не меняют. Возвращает вставленную или
+    обновленную строку, None — если вебхук ничего не изменил.
+    """
+    stmt = pg_insert(Payment_db).values(
+        youkassa_payment_id=payload.youkassa_payment_id,
+        amount=payload.amount,
+        status=payload.status.value,
+        user_subscription_id=payload.user_subscription_id,
+        user_id=payload.user_id,
+        description=payload.description,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Payment_db.youkassa_payment_id],
+        set_={
+            "status": stmt.excluded.status,
+            "amount": stmt.excluded.amount,
+            "description": stmt.excluded.description,
+        },
+        where=(
+            Payment_db.status.is_distinct_from(stmt.excluded.status)
+            & Payment_db.status.notin_(FINAL_STATUSES)
+        ),
+    ).returning(Payment_db)
 
     async with session.begin():
-        payment = Payment_db(
-            youkassa_payment_id=payload.youkassa_payment_id,  #
-            amount=payload.amount,  #
-            status=payload.status.value,
-            user_subscription_id=payload.user_subscription_id,
-            user_id=payload.user_id,  #
-            description=payload.description,  #
+        payment = await session.scalar(
+            stmt, execution_options={"populate_existing": True}
         )
-        merged = await session.merge(payment)
-        await session.refresh(merged)
-        return merged
+    if payment is None:
+        logger.info("Повторный вебхук платежа %s без изменений", payload.youkassa_payment_id)
+    return payment
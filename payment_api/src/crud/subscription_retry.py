@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.subscription_retry import SubscriptionUpdateRetry
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_subscription_update(
+        session: AsyncSession,
+        user_subscription_id: UUID,
+        data: dict,
+        error: str | None = None,
+) -> SubscriptionUpdateRetry:
+    """Сохраняет неотправленное обновление подписки для повторной отправки"""
+    async with session.begin():
+        retry = SubscriptionUpdateRetry(
+            user_subscription_id=user_subscription_id,
+            data=data,
+            attempts=0,
+            last_error=error,
+        )
+        session.add(retry)
+    return retry
+
+
+async def claim_due_retries(
+        session: AsyncSession,
+        limit: int,
+        lease_seconds: float,
+) -> list[SubscriptionUpdateRetry]:
+    """
+    Забирает готовые к повтору записи и выдает их воркеру в аренду:
+    next_attempt_at сдвигается на lease_seconds, транзакция сразу коммитится.
+    SKIP LOCKED не дает двум воркерам взять одну строку, а если воркер упадет
+    до записи результата, строку заберут снова после окончания аренды.
+    """
+    now = datetime.now(timezone.utc)
+    due = (
+        select(SubscriptionUpdateRetry.id)
+        .where(SubscriptionUpdateRetry.next_attempt_at <= now)
+        .order_by(SubscriptionUpdateRetry.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(SubscriptionUpdateRetry)
+        .where(SubscriptionUpdateRetry.id.in_(due.scalar_subquery()))
+        .values(next_attempt_at=now + timedelta(seconds=lease_seconds))
+        .returning(SubscriptionUpdateRetry)
+    )
+
+    async with session.begin():
+        result = await session.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+        return list(result.scalars().all())
+
+
+async def reschedule_retry(
+        session: AsyncSession,
+        retry_id: UUID,
+        delay: float,
+        error: str,
+) -> None:
+    """Откладывает запись на delay секунд"""
+    async with session.begin():
+        await session.execute(
+            update(SubscriptionUpdateRetry)
+            .where(SubscriptionUpdateRetry.id == retry_id)
+            .values(
+                attempts=SubscriptionUpdateRetry.attempts + 1,
+                next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+                last_error=error[:1000],
+            )
+        )
+
+
+async def delete_retry(session: AsyncSession, retry_id: UUID) -> None:
+    """Удаляет отправленную или отклоненную billing_api запись"""
+    async with session.begin():
+        await session.execute(
+            delete(SubscriptionUpdateRetry).where(SubscriptionUpdateRetry.id == retry_id)
+        )
@@ -0,0 +1,113 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.webhook_inbox import WebhookInboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+async def add_inbox_event(
+        session: AsyncSession,
+        event_key: str,
+        payload: dict,
+) -> bool:
+    """Сохраняет вебхук во входящую очередь; False — событие уже было принято"""
+    stmt = pg_insert(WebhookInboxEvent).values(
+        event_key=event_key,
+        payload=payload,
+        attempts=0,
+    ).on_conflict_do_nothing(
+        index_elements=[WebhookInboxEvent.event_key],
+    ).returning(WebhookInboxEvent.id)
+
+    async with session.begin():
+        inserted = await session.scalar(stmt)
+    return inserted is not None
+
+
+async def claim_inbox_events(
+        session: AsyncSession,
+        limit: int,
+        lease_seconds: float,
+) -> list[WebhookInboxEvent]:
+    """
+    Забирает готовые к обработке события и выдает их воркеру в аренду.
+    SKIP LOCKED не дает двум воркерам взять одну строку. Транзакция
+    короткая: событие обрабатывается после коммита, а если воркер упадет,
+    строку заберут снова, когда истечет locked_until.
+    """
+    now = datetime.now(timezone.utc)
+    due = (
+        select(WebhookInboxEvent.id)
+        .where(
+            WebhookInboxEvent.processed_at.is_(None),
+            WebhookInboxEvent.failed_at.is_(None),
+            WebhookInboxEvent.next_attempt_at <= now,
+            or_(WebhookInboxEvent.locked_until.is_(None),
+                WebhookInboxEvent.locked_until < now),
+        )
+        .order_by(WebhookInboxEvent.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(WebhookInboxEvent)
+        .where(WebhookInboxEvent.id.in_(due.scalar_subquery()))
+        .values(
+            locked_until=now + timedelta(seconds=lease_seconds),
+            attempts=WebhookInboxEvent.attempts + 1,
+        )
+        .returning(WebhookInboxEvent)
+    )
+
+    async with session.begin():
+        result = await session.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+        return list(result.scalars().all())
+
+
+async def mark_inbox_processed(session: AsyncSession, event_id: UUID) -> None:
+    async with session.begin():
+        await session.execute(
+            update(WebhookInboxEvent)
+            .where(WebhookInboxEvent.id == event_id)
+            .values(processed_at=datetime.now(timezone.utc), locked_until=None, last_error=None)
+        )
+
+
+async def reschedule_inbox_event(
+        session: AsyncSession,
+        event_id: UUID,
+        delay: float,
+        error: str,
+        give_up: bool = False,
+) -> None:
+    """Откладывает событие на delay секунд; give_up — больше не обрабатывать"""
+    now = datetime.now(timezone.utc)
+    values = {"locked_until": None, "last_error": error[:1000]}
+    if give_up:
+        values["failed_at"] = now
+    else:
+        values["next_attempt_at"] = now + timedelta(seconds=delay)
+
+    async with session.begin():
+        await session.execute(
+            update(WebhookInboxEvent)
+            .where(WebhookInboxEvent.id == event_id)
+            .values(**values)
+        )
+
+
+async def delete_processed_events(session: AsyncSession, older_than: datetime) -> int:
+    """Удаляет обработанные события; ключ дедупликации нужен только на время повторов YooKassa"""
+    async with session.begin():
+        result = await session.execute(
+            delete(WebhookInboxEvent).where(WebhookInboxEvent.processed_at < older_than)
+        )
+    return result.rowcount
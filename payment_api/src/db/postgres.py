@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import AsyncGenerator
 
 from sqlalchemy import DateTime, func
-from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 logger = logging.getLogger(__name__)
@@ -47,6 +47,7 @@ class Base(AsyncAttrs, DeclarativeBase):
         return f"<{self.__class__.__name__} {', '.join(cols)}>"
 
 
+engine: AsyncEngine | None = None
 async_session_maker: async_sessionmaker | None = None
 
 
@@ -68,3 +69,5 @@ def get_db_context() -> AsyncSession:
 from src.models.payment import (
     Payment, PaymentStatus, SubscriptionStatus
 )  # noqa: F401
+from src.models.subscription_retry import SubscriptionUpdateRetry  # noqa: F401
+from src.models.webhook_inbox import WebhookInboxEvent  # noqa: F401
@@ -1,10 +1,11 @@
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 import httpx
-from yookassa.domain.exceptions import ApiError
 from http import HTTPStatus
 import logging
 
+from src.services.youkassa_client import YookassaApiError
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,7 +20,7 @@ async def timeout_exception_handler(
 
 async def youkassa_api_error_handler(
         request: Request,
-        exc: ApiError):
+        exc: YookassaApiError):
     logger.error(f"Ошибка API Юкассы: {exc}")
     return JSONResponse(
         status_code=HTTPStatus.BAD_GATEWAY,
@@ -24,9 +24,10 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_subscription_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_subscription_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
     amount = Column(Float, nullable=False)
     description = Column(String, nullable=True)
     status = Column(Enum(PaymentStatus), default=PaymentStatus.pending)
-    youkassa_payment_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # из YooKassa
+    # из YooKassa; по нему повторные вебхуки находят уже сохраненный платеж
+    youkassa_payment_id = Column(UUID(as_uuid=True), nullable=False, unique=True, index=True)
@@ -0,0 +1,19 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from src.db.postgres import Base
+
+
+class SubscriptionUpdateRetry(Base):
+    """Обновление подписки в billing_api, которое не удалось отправить сразу"""
+    __tablename__ = "subscription_update_retries"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_subscription_id = Column(UUID(as_uuid=True), nullable=False)
+    data = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False,
+                             server_default=func.now(), index=True)
+    last_error = Column(String, nullable=True)
@@ -0,0 +1,29 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from src.db.postgres import Base
+
+
+class WebhookInboxEvent(Base):
+    """Принятый вебхук YooKassa, который еще нужно обработать"""
+    __tablename__ = "webhook_inbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # id платежа и событие YooKassa: повторная доставка не создает новую строку
+    event_key = Column(String, nullable=False, unique=True)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # воркер держит строку до locked_until, после падения ее заберет другой
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    failed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # воркеры выбирают только необработанные события
+        Index("ix_webhook_inbox_pending", "next_attempt_at",
+              postgresql_where=text("processed_at IS NULL AND failed_at IS NULL")),
+    )
@@ -0,0 +1,6 @@
+from common.http import HttpClientService
+
+from src.core.config import settings
+
+# Глобальный экземпляр сервиса, параметры пула — settings.http
+http_client_service = HttpClientService(settings.http)
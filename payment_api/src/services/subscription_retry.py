@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import random
+from contextlib import suppress
+
+import httpx
+
+from src.core.config import settings
+from src.crud.subscription_retry import claim_due_retries, delete_retry, reschedule_retry
+from src.db import postgres
+from src.models.subscription_retry import SubscriptionUpdateRetry
+from src.services.http_client import http_client_service
+from src.services.user_subcription import is_retryable_error, send_subscription_update
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionRetryWorker:
+    """Фоновая отправка отложенных обновлений подписок в billing_api"""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.sent = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info("Очередь повторов обновления подписок запущена")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Ошибка обработки очереди повторов: {e}")
+                processed = 0
+            if processed < settings.retry.queue_batch_size:
+                await asyncio.sleep(settings.retry.queue_poll_interval)
+
+    @staticmethod
+    def _next_delay(attempts: int) -> float:
+        delay = min(settings.retry.queue_border_sleep_time,
+                    settings.retry.queue_start_sleep_time * (2 ** attempts))
+        return random.uniform(delay / 2, delay)
+
+    async def process_batch(self) -> int:
+        """
+        Транзакция только на захват пачки: HTTP-запросы идут без открытой транзакции
+        и блокировок, результат каждой записи фиксируется отдельной короткой транзакцией.
+        """
+        if http_client_service.client is None:
+            return 0
+
+        async with postgres.get_db_context() as session:
+            retries = await claim_due_retries(
+                session, settings.retry.queue_batch_size, settings.retry.queue_lease_seconds
+            )
+        for retry in retries:
+            await self.process_retry(retry)
+        return len(retries)
+
+    async def process_retry(self, retry: SubscriptionUpdateRetry) -> None:
+        try:
+            await send_subscription_update(
+                retry.data, retry.user_subscription_id, http_client_service.client
+            )
+        except httpx.HTTPError as e:
+            if is_retryable_error(e):
+                async with postgres.get_db_context() as session:
+                    await reschedule_retry(
+                        session, retry.id, self._next_delay(retry.attempts), str(e)
+                    )
+                return
+            logger.error(
+                f"billing_api отклонил обновление подписки "
+                f"{retry.user_subscription_id}: {e}"
+            )
+            self.failed += 1
+        else:
+            self.sent += 1
+            logger.info(f"Отложенное обновление подписки {retry.user_subscription_id} отправлено")
+        async with postgres.get_db_context() as session:
+            await delete_retry(session, retry.id)
+
+
+# Глобальный экземпляр
+subscription_retry_worker = SubscriptionRetryWorker()
@@ -0,0 +1,19 @@
+from common.revocation import RevocationFilter, TokenRevocationListener
+
+from src.core.config import settings
+
+# Глобальные экземпляры
+revocation_filter = RevocationFilter(
+    bloom_size_bits=settings.revocation.bloom_size_bits,
+    bloom_hashes=settings.revocation.bloom_hashes,
+    exact_max_size=settings.revocation.exact_max_size,
+    users_max_size=settings.revocation.users_max_size,
+    rotate_interval=settings.revocation.rotate_interval,
+)
+token_revocation_listener = TokenRevocationListener(
+    revocation_filter,
+    bootstrap_servers=settings.kafka.bootstrap_servers_list,
+    topic=settings.revocation.topic,
+    lookback_minutes=settings.revocation.lookback_minutes,
+    request_timeout_ms=settings.kafka.request_timeout_ms,
+)
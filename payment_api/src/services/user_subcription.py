@@ -1,17 +1,67 @@
 import httpx
 import logging
-from fastapi import HTTPException
+from uuid import UUID
+
+from common.backoff import backoff
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from src.core.config import settings
+from src.crud.subscription_retry import enqueue_subscription_update
 
 logger = logging.getLogger(__name__)
 
 
-async def update_user_subsription(
-        data: str,
-        user_subscription_id: int
+def is_retryable_error(exc: BaseException) -> bool:
+    """Сетевые ошибки, 5xx и 429 имеет смысл повторить, остальные 4xx — нет"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code >= 500 or code == 429
+    return isinstance(exc, httpx.TransportError)
+
+
+async def send_subscription_update(
+        data: dict,
+        user_subscription_id: UUID,
+        client: httpx.AsyncClient,
 ):
     subscriptions_url = f"{settings.subscription.update_url}{str(user_subscription_id)}"
     logger.info("subscriptions_url: %s", subscriptions_url)
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(subscriptions_url, json=data)
-        response.raise_for_status()
+    response = await client.patch(subscriptions_url, json=data)
+    response.raise_for_status()
+
+
+@backoff(
+    max_attempts=settings.retry.max_attempts,
+    start_sleep_time=settings.retry.start_sleep_time,
+    border_sleep_time=settings.retry.border_sleep_time,
+    deadline=settings.retry.deadline,
+    retry_if=is_retryable_error,
+    logger=logger,
+)
+async def update_user_subsription(
+        data: dict,
+        user_subscription_id: UUID,
+        client: httpx.AsyncClient,
+):
+    await send_subscription_update(data, user_subscription_id, client)
+
+
+async def notify_subscription_update(
+        session: AsyncSession,
+        client: httpx.AsyncClient,
+        data: dict,
+        user_subscription_id: UUID,
+) -> None:
+    """
+    Обновляет подписку в billing_api с повторами.
+    Если billing_api так и не ответил, обновление сохраняется в очередь
+    повторов и вебхук подтверждается без ожидания.
+    """
+    try:
+        await update_user_subsription(data, user_subscription_id, client)
+    except httpx.HTTPError as e:
+        if not is_retryable_error(e):
+            logger.error(f"billing_api отклонил обновление подписки {user_subscription_id}: {e}")
+            return
+        logger.warning(f"Обновление подписки {user_subscription_id} отложено: {e}")
+        await enqueue_subscription_update(session, user_subscription_id, data, str(e))
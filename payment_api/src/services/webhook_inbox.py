@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import random
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+
+from src.core.config import settings
+from src.crud.payment import create_payment
+from src.crud.webhook_inbox import (
+    claim_inbox_events,
+    delete_processed_events,
+    mark_inbox_processed,
+    reschedule_inbox_event,
+)
+from src.db import postgres
+from src.models.webhook_inbox import WebhookInboxEvent
+from src.schemas.youkassa import WebhookPaymentPayload
+from src.services.http_client import http_client_service
+from src.services.user_subcription import notify_subscription_update
+
+logger = logging.getLogger(__name__)
+
+
+def get_event_key(raw_data: dict) -> str:
+    """
+    Ключ дедупликации вебхука: id платежа и событие YooKassa.
+    Повторная доставка того же уведомления дает тот же ключ.
+    """
+    obj = raw_data.get("object", {})
+    return f"{obj.get('id')}:{raw_data.get('event') or obj.get('status')}"
+
+
+class WebhookInboxWorker:
+    """
+    Пул воркеров, разбирающих входящую очередь вебхуков YooKassa.
+
+    Эндпоинт только сохраняет вебхук и сразу отвечает 200, а запись
+    платежа и обновление подписки в billing_api выполняются здесь.
+    notify() будит воркеров сразу после приема вебхука, без ожидания
+    следующего опроса.
+    """
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.cleaned = 0
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._run())
+            for _ in range(settings.inbox.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+        logger.info(f"Обработка вебхуков запущена, воркеров: {settings.inbox.concurrency}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _wait(self) -> None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), settings.inbox.poll_interval)
+        self._wakeup.clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Ошибка обработки входящих вебхуков: {e}")
+                processed = 0
+            if processed < settings.inbox.batch_size:
+                await self._wait()
+
+    async def _cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(settings.inbox.cleanup_interval)
+            older_than = datetime.now(timezone.utc) - timedelta(hours=settings.inbox.retention_hours)
+            try:
+                async with postgres.get_db_context() as session:
+                    self.cleaned += await delete_processed_events(session, older_than)
+            except Exception as e:
+                logger.error(f"Ошибка очистки входящих вебхуков: {e}")
+
+    @staticmethod
+    def _next_delay(attempts: int) -> float:
+        delay = min(settings.inbox.border_sleep_time,
+                    settings.inbox.start_sleep_time * (2 ** attempts))
+        return random.uniform(delay / 2, delay)
+
+    async def process_batch(self) -> int:
+        """Транзакция только на захват пачки; каждое событие обрабатывается отдельно"""
+        if http_client_service.client is None:
+            return 0
+
+        async with postgres.get_db_context() as session:
+            events = await claim_inbox_events(
+                session, settings.inbox.batch_size, settings.inbox.lease_seconds
+            )
+        for event in events:
+            await self.process_event(event)
+        return len(events)
+
+    async def process_event(self, event: WebhookInboxEvent) -> None:
+        async with postgres.get_db_context() as session:
+            try:
+                payload = WebhookPaymentPayload.from_webhook(event.payload)
+                await create_payment(session, payload)
+                # PATCH подписки идемпотентен, поэтому повторяется и для
+                # уже записанного платежа: прошлая попытка могла упасть после записи
+                if payload.status.value == "succeeded":
+                    await notify_subscription_update(
+                        session, http_client_service.client, {"status": "active"},
+                        payload.user_subscription_id,
+                    )
+            except Exception as e:
+                give_up = event.attempts >= settings.inbox.max_attempts
+                logger.warning(f"Вебхук {event.event_key} не обработан (попытка {event.attempts}): {e}")
+                await session.rollback()
+                await reschedule_inbox_event(
+                    session, event.id, self._next_delay(event.attempts), str(e), give_up
+                )
+                if give_up:
+                    self.failed += 1
+                    logger.error(f"Вебхук {event.event_key} снят с обработки")
+                else:
+                    self.retried += 1
+                return
+
+            await mark_inbox_processed(session, event.id)
+            self.processed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": settings.inbox.concurrency,
+            "running": bool(self._tasks),
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "cleaned": self.cleaned,
+        }
+
+
+# Глобальный экземпляр
+webhook_inbox_worker = WebhookInboxWorker()
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import uuid
+from uuid import UUID
+
+import httpx
+from common.backoff import backoff
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Пространство имен ключей идемпотентности платежей
+IDEMPOTENCE_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "payment-api/youkassa/payments")
+
+
+def get_idempotence_key(user_subscription_id: UUID) -> str:
+    """
+    Ключ идемпотентности платежа за подписку.
+    Повторный запрос на ту же подписку ЮKassa не превратит во второе списание.
+    """
+    return str(uuid.uuid5(IDEMPOTENCE_NAMESPACE, str(user_subscription_id)))
+
+
+class YookassaApiError(Exception):
+    """ЮKassa ответила ошибкой"""
+
+    def __init__(self, status_code: int, detail: dict | str):
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"{status_code}: {detail}")
+
+
+def is_youkassa_retryable_error(exc: BaseException) -> bool:
+    """
+    С тем же ключом идемпотентности повтор безопасен и после таймаута чтения.
+    Повторяются сетевые ошибки, 5xx и 429, остальные ответы — нет.
+    """
+    if isinstance(exc, YookassaApiError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return isinstance(exc, httpx.TransportError)
+
+
+class YookassaClient:
+    """
+    Асинхронный клиент API ЮKassa на собственном пуле соединений.
+    Семафор ограничивает число одновременных запросов, чтобы всплеск
+    покупок не исчерпал лимиты ЮKassa и пул соединений.
+    """
+
+    def __init__(self):
+        self.client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+        self.requests = 0
+        self.failures = 0
+
+    async def connect(self) -> None:
+        config = settings.youkassa
+        self._semaphore = asyncio.Semaphore(config.concurrency)
+        self.client = httpx.AsyncClient(
+            auth=(config.SHOP_ID, config.SECRET_KEY),
+            timeout=httpx.Timeout(
+                config.read_timeout,
+                connect=config.connect_timeout,
+                pool=config.pool_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+            ),
+        )
+        logger.info(f"Клиент ЮKassa создан: max_connections={config.max_connections}")
+
+    async def disconnect(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @backoff(
+        start_sleep_time=settings.retry.start_sleep_time,
+        border_sleep_time=settings.retry.border_sleep_time,
+        max_attempts=settings.retry.max_attempts,
+        deadline=settings.retry.deadline,
+        retry_if=is_youkassa_retryable_error,
+        logger=logger,
+    )
+    async def create_payment(self, payment_data: dict, idempotence_key: str) -> dict:
+        """Создает платеж; возвращает объект платежа из ответа ЮKassa"""
+        async with self._semaphore:
+            self.requests += 1
+            try:
+                response = await self.client.post(
+                    settings.youkassa.API,
+                    json=payment_data,
+                    headers={"Idempotence-Key": idempotence_key},
+                )
+            except httpx.TransportError:
+                self.failures += 1
+                raise
+        if response.is_error:
+            self.failures += 1
+            try:
+                detail = response.json()
+            except ValueError:
+                detail = response.text
+            raise YookassaApiError(response.status_code, detail)
+        return response.json()
+
+    def stats(self) -> dict:
+        in_flight = 0
+        if self._semaphore is not None:
+            in_flight = settings.youkassa.concurrency - self._semaphore._value
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "in_flight": in_flight,
+        }
+
+
+# Глобальный экземпляр
+youkassa_client = YookassaClient()
@@ -0,0 +1,3 @@
+# модели импортируются в конце src.db.postgres, поэтому он загружается первым,
+# как в main.py
+from src.db import postgres  # noqa: F401
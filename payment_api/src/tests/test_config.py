@@ -0,0 +1,15 @@
+from src.core.config import AppConfig
+
+
+def test_nested_settings_with_multi_word_names_load_from_env(monkeypatch):
+    monkeypatch.setenv("RETRY_MAX_ATTEMPTS", "9")
+    monkeypatch.setenv("INBOX_MAX_ATTEMPTS", "3")
+    monkeypatch.setenv("YOUKASSA_READ_TIMEOUT", "99")
+    monkeypatch.setenv("YOUKASSA_SHOP_ID", "shop")
+
+    config = AppConfig()
+
+    assert config.retry.max_attempts == 9
+    assert config.inbox.max_attempts == 3
+    assert config.youkassa.read_timeout == 99
+    assert config.youkassa.SHOP_ID == "shop"
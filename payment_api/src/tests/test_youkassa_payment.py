@@ -0,0 +1,59 @@
+import json
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api.v1.youkassa import router
+from src.services.youkassa_client import get_idempotence_key, youkassa_client
+
+app = FastAPI()
+app.include_router(router)
+
+
+@pytest.fixture()
+async def youkassa_requests():
+    """Клиент ЮKassa на подставном транспорте; список принятых им запросов"""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "id": str(uuid.uuid4()),
+            "status": "pending",
+            "confirmation": {
+                "type": "redirect",
+                "confirmation_url": "https://yoomoney.ru/checkout/payments/v2/contract",
+            },
+            "metadata": body["metadata"],
+        })
+
+    await youkassa_client.connect()
+    await youkassa_client.client.aclose()
+    youkassa_client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield requests
+    await youkassa_client.disconnect()
+
+
+async def test_create_payment_posts_json_body(youkassa_requests):
+    user_subscription_id = uuid.uuid4()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                 base_url="http://testserver") as client:
+        response = await client.post("/api/v1/payment/youkassa/payment", json={
+            "amount": 199,
+            "user_id": str(uuid.uuid4()),
+            "user_subscription_id": str(user_subscription_id),
+            "redirect_url": "https://example.com/",
+            "description": "Оплата: 199 руб",
+        })
+
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "pending"
+
+    [request] = youkassa_requests
+    body = json.loads(request.content)
+    assert body["confirmation"]["return_url"] == "https://example.com/"
+    assert body["amount"] == {"value": "199.00", "currency": "RUB"}
+    assert request.headers["Idempotence-Key"] == get_idempotence_key(user_subscription_id)
@@ -0,0 +1,44 @@
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.api.emulator import router as emulator_router
+from src.api.payments import YookassaError, router as payments_router
+from src.core.config import settings
+from src.services.webhooks import webhook_sender
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Управление жизненным циклом приложения"""
+    await webhook_sender.connect()
+    logger.info(f"Эмулятор ЮKassa запущен, уведомления: {settings.webhook.url}")
+
+    yield
+
+    await webhook_sender.disconnect()
+
+
+app = FastAPI(
+    title=settings.project_name,
+    description=settings.description,
+    lifespan=lifespan,
+)
+
+app.include_router(payments_router)
+app.include_router(emulator_router)
+
+
+@app.exception_handler(YookassaError)
+async def yookassa_error_handler(request: Request, exc: YookassaError):
+    return JSONResponse(status_code=exc.status_code, content=exc.to_dict())
+
+
+@app.get("/checkout/{payment_id}", include_in_schema=False)
+async def checkout(payment_id: str):
+    """Заглушка страницы оплаты из confirmation_url"""
+    return {"payment_id": payment_id, "detail": "Оплата эмулируется, уведомление придет автоматически"}
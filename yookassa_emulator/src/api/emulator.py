@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+
+from src.core.config import Errors, Latency, Webhook, settings
+from src.schemas.control import ConfigUpdate
+from src.services.storage import payment_storage
+from src.services.webhooks import webhook_sender
+
+router = APIRouter(prefix="/emulator", tags=["emulator"])
+
+
+def _current_config() -> dict:
+    return {
+        "latency": settings.latency.model_dump(),
+        "errors": settings.errors.model_dump(),
+        "webhook": settings.webhook.model_dump(),
+    }
+
+
+@router.get("/config", summary="Текущий сценарий")
+async def get_config() -> dict:
+    return _current_config()
+
+
+@router.patch("/config", summary="Изменить сценарий без перезапуска")
+async def update_config(update: ConfigUpdate) -> dict:
+    """Меняет только переданные поля; сценарий действует до перезапуска"""
+    if update.latency:
+        settings.latency = Latency(**{**settings.latency.model_dump(), **update.latency})
+    if update.errors:
+        settings.errors = Errors(**{**settings.errors.model_dump(), **update.errors})
+    if update.webhook:
+        settings.webhook = Webhook(**{**settings.webhook.model_dump(), **update.webhook})
+    return _current_config()
+
+
+@router.get("/stats", summary="Счетчики платежей и уведомлений")
+async def stats() -> dict:
+    return {
+        "storage": payment_storage.stats(),
+        "webhooks": webhook_sender.stats(),
+    }
+
+
+@router.post("/reset", summary="Удалить платежи и ключи идемпотентности")
+async def reset() -> dict:
+    payment_storage.reset()
+    return {"status": "ok"}
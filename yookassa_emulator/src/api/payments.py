@@ -0,0 +1,106 @@
+import asyncio
+import random
+import secrets
+import uuid
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+
+from src.core.config import settings
+from src.schemas.payment import PaymentRequest
+from src.services.storage import IdempotenceConflict, payment_storage
+from src.services.webhooks import webhook_sender
+
+router = APIRouter(prefix="/v3/payments", tags=["payments"])
+
+basic_auth = HTTPBasic(auto_error=False)
+
+
+class YookassaError(Exception):
+    """Ошибка в формате API ЮKassa"""
+
+    def __init__(self, status_code: int, code: str, description: str):
+        self.status_code = status_code
+        self.code = code
+        self.description = description
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "error",
+            "id": str(uuid.uuid4()),
+            "code": self.code,
+            "description": self.description,
+        }
+
+
+INJECTED_ERRORS = {
+    429: ("too_many_requests", "Эмулятор: слишком много запросов"),
+    500: ("internal_server_error", "Эмулятор: внутренняя ошибка"),
+}
+
+
+async def check_auth(credentials: HTTPBasicCredentials | None = Depends(basic_auth)) -> None:
+    if credentials is None:
+        raise YookassaError(401, "invalid_credentials", "Нужна basic-авторизация магазина")
+    if settings.auth.shop_id and not (
+            secrets.compare_digest(credentials.username, settings.auth.shop_id)
+            and secrets.compare_digest(credentials.password, settings.auth.secret_key)):
+        raise YookassaError(401, "invalid_credentials", "Неверный shopId или секретный ключ")
+
+
+async def emulate_latency() -> None:
+    await asyncio.sleep(random.uniform(settings.latency.min_ms, settings.latency.max_ms) / 1000)
+
+
+def injected_error() -> YookassaError | None:
+    if random.random() >= settings.errors.rate:
+        return None
+    code, description = INJECTED_ERRORS.get(
+        settings.errors.status_code, ("internal_server_error", "Эмулятор: ошибка")
+    )
+    return YookassaError(settings.errors.status_code, code, description)
+
+
+@router.post("",
+             dependencies=[Depends(check_auth), Depends(emulate_latency)],
+             summary="Создать платеж")
+async def create_payment(
+    payload: PaymentRequest,
+    request: Request,
+    idempotence_key: str | None = Header(default=None, alias="Idempotence-Key"),
+) -> dict:
+    """
+    Создает платеж в статусе pending и планирует уведомление.
+    Повтор с тем же Idempotence-Key возвращает тот же платеж.
+    """
+    if not idempotence_key:
+        raise YookassaError(400, "invalid_request", "Не передан заголовок Idempotence-Key")
+
+    error = None if settings.errors.after_commit else injected_error()
+    if error is not None:
+        raise error
+
+    try:
+        payment, created = payment_storage.create(await request.json(), idempotence_key)
+    except IdempotenceConflict:
+        raise YookassaError(
+            400, "invalid_request", "Idempotence-Key уже использован с другими параметрами"
+        )
+    if created:
+        webhook_sender.schedule(payment["id"])
+
+    # платеж сохранен, но клиент получит ошибку и должен повторить запрос
+    error = injected_error() if settings.errors.after_commit else None
+    if error is not None:
+        raise error
+    return payment
+
+
+@router.get("/{payment_id}",
+            dependencies=[Depends(check_auth), Depends(emulate_latency)],
+            summary="Получить платеж")
+async def get_payment(payment_id: str) -> dict:
+    payment = payment_storage.get(payment_id)
+    if payment is None:
+        raise YookassaError(404, "not_found", "Платеж не найден")
+    return payment
@@ -0,0 +1,67 @@
+import logging
+
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+class Auth(BaseModel):
+    """Basic auth магазина; пустые значения — принимаются любые учетные данные."""
+
+    shop_id: str = ""
+    secret_key: str = ""
+
+
+class Latency(BaseModel):
+    """Задержка ответа API ЮKassa, миллисекунды."""
+
+    min_ms: float = 50.0
+    max_ms: float = 150.0
+
+
+class Errors(BaseModel):
+    """Внедрение ошибок в ответы на создание платежа."""
+
+    rate: float = 0.0  # Доля запросов, которые получат ошибку
+    status_code: int = 500  # 500 или 429: payment_api повторяет их с тем же ключом
+    # Ошибка после сохранения платежа: клиент не получит ответ, повтор вернет тот же платеж
+    after_commit: bool = False
+
+
+class Webhook(BaseModel):
+    """Уведомления о платежах в payment_api."""
+
+    enabled: bool = True
+    url: str = "http://payment_api:8000/api/v1/payment/youkassa/webhook"
+    success_rate: float = 1.0  # Остальные платежи отменяются
+    delay_min_ms: float = 100.0
+    delay_max_ms: float = 500.0
+    duplicates: int = 0  # Сколько раз повторить каждое уведомление
+    out_of_order_rate: float = 0.0  # Доля платежей с устаревшим pending после финального статуса
+    timeout: float = 10.0
+    max_connections: int = 100
+    max_attempts: int = 3  # Повторы, если payment_api ответил не 200
+
+
+class AppConfig(BaseSettings):
+    project_name: str = "yookassa-emulator"
+    description: str = "Эмулятор API ЮKassa для нагрузочного тестирования"
+    public_url: str = "http://localhost:8009"  # Для confirmation_url
+
+    auth: Auth = Auth()
+    latency: Latency = Latency()
+    errors: Errors = Errors()
+    webhook: Webhook = Webhook()
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        env_nested_delimiter="_",
+        # WEBHOOK_DELAY_MIN_MS -> webhook.delay_min_ms: делим только по первому "_"
+        env_nested_max_split=1,
+        extra="ignore",
+    )
+
+
+settings = AppConfig()
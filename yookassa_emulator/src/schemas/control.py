@@ -0,0 +1,10 @@
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+
+class ConfigUpdate(BaseModel):
+    """Частичное изменение сценария, ключи — поля Latency, Errors и Webhook"""
+    latency: Dict[str, Any] = {}
+    errors: Dict[str, Any] = {}
+    webhook: Dict[str, Any] = {}
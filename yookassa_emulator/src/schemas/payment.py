@@ -0,0 +1,22 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class Amount(BaseModel):
+    value: str
+    currency: str
+
+
+class Confirmation(BaseModel):
+    type: str
+    return_url: Optional[str] = None
+
+
+class PaymentRequest(BaseModel):
+    """Поля запроса на создание платежа, которые проверяет эмулятор"""
+    amount: Amount
+    confirmation: Optional[Confirmation] = None
+    description: Optional[str] = ""
+    metadata: Dict[str, Any] = {}
+    capture: bool = False
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from src.core.config import settings
+
+# ЮKassa хранит ключи идемпотентности сутки
+IDEMPOTENCE_TTL = 24 * 60 * 60
+
+
+class IdempotenceConflict(Exception):
+    """Ключ уже использован для запроса с другими данными"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _fingerprint(data: dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class PaymentStorage:
+    """Платежи и ключи идемпотентности в памяти процесса"""
+
+    def __init__(self):
+        self.payments: dict[str, dict] = {}
+        self._keys: dict[str, tuple[str, str, float]] = {}
+
+        self.created = 0
+        self.replayed = 0
+
+    def create(self, data: dict, idempotence_key: str) -> tuple[dict, bool]:
+        """Платеж и признак того, что он создан этим запросом"""
+        fingerprint = _fingerprint(data)
+        stored = self._keys.get(idempotence_key)
+        if stored is not None and stored[2] > time.time():
+            if stored[0] != fingerprint:
+                raise IdempotenceConflict(idempotence_key)
+            self.replayed += 1
+            return self.payments[stored[1]], False
+
+        payment_id = str(uuid.uuid4())
+        payment = {
+            "id": payment_id,
+            "status": "pending",
+            "paid": False,
+            "amount": data["amount"],
+            "description": data.get("description", ""),
+            "recipient": {"account_id": settings.auth.shop_id or "emulator", "gateway_id": "emulator"},
+            "created_at": _now(),
+            "confirmation": {
+                "type": "redirect",
+                "return_url": data.get("confirmation", {}).get("return_url"),
+                "confirmation_url": f"{settings.public_url}/checkout/{payment_id}",
+            },
+            "test": True,
+            "refundable": False,
+            "metadata": data.get("metadata", {}),
+        }
+        self.payments[payment_id] = payment
+        self._keys[idempotence_key] = (fingerprint, payment_id, time.time() + IDEMPOTENCE_TTL)
+        self.created += 1
+        return payment, True
+
+    def get(self, payment_id: str) -> dict | None:
+        return self.payments.get(payment_id)
+
+    def finish(self, payment_id: str, succeeded: bool) -> dict:
+        """Переводит платеж в финальный статус"""
+        payment = self.payments[payment_id]
+        if succeeded:
+            payment.update(status="succeeded", paid=True, captured_at=_now())
+        else:
+            payment.update(
+                status="canceled",
+                cancellation_details={"party": "payment_network", "reason": "card_expired"},
+            )
+        return payment
+
+    def reset(self) -> None:
+        self.payments.clear()
+        self._keys.clear()
+        self.created = 0
+        self.replayed = 0
+
+    def stats(self) -> dict:
+        statuses: dict[str, int] = {}
+        for payment in self.payments.values():
+            statuses[payment["status"]] = statuses.get(payment["status"], 0) + 1
+        return {
+            "payments": len(self.payments),
+            "created": self.created,
+            "replayed": self.replayed,
+            "statuses": statuses,
+        }
+
+
+# Глобальный экземпляр
+payment_storage = PaymentStorage()
@@ -0,0 +1,114 @@
+import asyncio
+import copy
+import logging
+import random
+from contextlib import suppress
+
+import httpx
+
+from src.core.config import settings
+from src.services.storage import payment_storage
+
+logger = logging.getLogger(__name__)
+
+EVENTS = {
+    "succeeded": "payment.succeeded",
+    "canceled": "payment.canceled",
+    "pending": "payment.waiting_for_capture",
+}
+
+
+def _notification(payment: dict) -> dict:
+    return {
+        "type": "notification",
+        "event": EVENTS[payment["status"]],
+        "object": copy.deepcopy(payment),
+    }
+
+
+class WebhookSender:
+    """
+    Отправка уведомлений о платежах в payment_api.
+
+    После задержки платеж завершается успехом или отменой, и уведомление
+    уходит 1 + duplicates раз. Для части платежей следом отправляется
+    устаревшее уведомление со статусом pending — как при доставке не по порядку.
+    """
+
+    def __init__(self):
+        self.client: httpx.AsyncClient | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.sent = 0
+        self.failed = 0
+        self.latency_total = 0.0
+
+    async def connect(self) -> None:
+        config = settings.webhook
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+            ),
+        )
+
+    async def disconnect(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        for task in list(self._tasks):
+            with suppress(asyncio.CancelledError):
+                await task
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def schedule(self, payment_id: str) -> None:
+        if not settings.webhook.enabled:
+            return
+        task = asyncio.create_task(self._process(payment_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, payment_id: str) -> None:
+        config = settings.webhook
+        await asyncio.sleep(random.uniform(config.delay_min_ms, config.delay_max_ms) / 1000)
+
+        stale = _notification(payment_storage.get(payment_id))
+        payment = payment_storage.finish(payment_id, random.random() < config.success_rate)
+        notification = _notification(payment)
+
+        for _ in range(1 + config.duplicates):
+            await self._send(notification)
+        if random.random() < config.out_of_order_rate:
+            await self._send(stale)
+
+    async def _send(self, notification: dict) -> None:
+        config = settings.webhook
+        for attempt in range(config.max_attempts):
+            started = asyncio.get_running_loop().time()
+            try:
+                response = await self.client.post(config.url, json=notification)
+                if response.status_code == 200:
+                    self.latency_total += asyncio.get_running_loop().time() - started
+                    self.sent += 1
+                    return
+                error = f"статус {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e) or e.__class__.__name__
+            logger.warning(f"Уведомление {notification['event']} не доставлено "
+                           f"(попытка {attempt + 1}): {error}")
+            await asyncio.sleep(0.5 * 2 ** attempt)
+        self.failed += 1
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "pending": len(self._tasks),
+            "latency_avg_ms": round(self.latency_total / self.sent * 1000, 3) if self.sent else 0.0,
+        }
+
+
+# Глобальный экземпляр
+webhook_sender = WebhookSender()
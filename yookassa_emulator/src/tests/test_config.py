@@ -0,0 +1,15 @@
+from src.core.config import AppConfig
+
+
+def test_nested_settings_with_multi_word_names_load_from_env(monkeypatch):
+    monkeypatch.setenv("AUTH_SHOP_ID", "shop")
+    monkeypatch.setenv("ERRORS_STATUS_CODE", "429")
+    monkeypatch.setenv("WEBHOOK_DELAY_MIN_MS", "10")
+    monkeypatch.setenv("WEBHOOK_OUT_OF_ORDER_RATE", "0.5")
+
+    config = AppConfig()
+
+    assert config.auth.shop_id == "shop"
+    assert config.errors.status_code == 429
+    assert config.webhook.delay_min_ms == 10
+    assert config.webhook.out_of_order_rate == 0.5
@@ -0,0 +1,57 @@
+import httpx
+import pytest
+
+from main import app
+from src.core.config import Latency, settings
+from src.services.storage import IdempotenceConflict, PaymentStorage, payment_storage
+from src.services.webhooks import webhook_sender
+
+PAYMENT = {
+    "amount": {"value": "100.00", "currency": "RUB"},
+    "confirmation": {"type": "redirect", "return_url": "http://localhost/return"},
+    "description": "Подписка",
+}
+
+
+def test_same_key_and_body_returns_stored_payment():
+    storage = PaymentStorage()
+
+    payment, created = storage.create(PAYMENT, "key")
+    replayed, replay_created = storage.create(dict(PAYMENT), "key")
+
+    assert created is True
+    assert replay_created is False
+    assert replayed["id"] == payment["id"]
+    assert storage.stats()["created"] == 1
+    assert storage.stats()["replayed"] == 1
+
+
+def test_same_key_with_different_body_is_conflict():
+    storage = PaymentStorage()
+    storage.create(PAYMENT, "key")
+
+    with pytest.raises(IdempotenceConflict):
+        storage.create({**PAYMENT, "amount": {"value": "200.00", "currency": "RUB"}}, "key")
+
+    assert len(storage.payments) == 1
+    assert storage.stats()["replayed"] == 0
+
+
+async def test_api_rejects_reused_key_with_different_body(monkeypatch):
+    monkeypatch.setattr(settings, "latency", Latency(min_ms=0, max_ms=0))
+    monkeypatch.setattr(webhook_sender, "schedule", lambda payment_id: None)
+    payment_storage.reset()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", auth=("shop", "secret")) as client:
+        first = await client.post("/v3/payments", json=PAYMENT, headers={"Idempotence-Key": "key"})
+        conflict = await client.post(
+            "/v3/payments",
+            json={**PAYMENT, "description": "Другая подписка"},
+            headers={"Idempotence-Key": "key"},
+        )
+
+    assert first.status_code == 200
+    assert conflict.status_code == 400
+    assert conflict.json()["code"] == "invalid_request"
+    assert payment_storage.stats()["payments"] == 1
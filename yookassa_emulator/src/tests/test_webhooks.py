@@ -0,0 +1,76 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.core.config import Webhook, settings
+from src.services.storage import payment_storage
+from src.services.webhooks import WebhookSender
+
+PAYMENT = {"amount": {"value": "100.00", "currency": "RUB"}}
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """Паузы между повторами не ждем, а записываем"""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    return delays
+
+
+def make_sender(statuses: list[int], received: list[dict]) -> WebhookSender:
+    """Отправитель, которому payment_api отвечает статусами по очереди, затем 200"""
+    responses = iter(statuses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.read())
+        return httpx.Response(next(responses, 200))
+
+    sender = WebhookSender()
+    sender.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return sender
+
+
+async def test_each_notification_is_sent_one_plus_duplicates_times(monkeypatch, no_backoff):
+    monkeypatch.setattr(settings, "webhook", Webhook(duplicates=2, out_of_order_rate=0.0))
+    payment_storage.reset()
+    payment, _ = payment_storage.create(PAYMENT, "key")
+    received = []
+    sender = make_sender([], received)
+
+    await sender._process(payment["id"])
+
+    assert len(received) == 3
+    assert len(set(received)) == 1
+    assert b"payment.succeeded" in received[0]
+    assert sender.stats()["sent"] == 3
+    assert sender.stats()["failed"] == 0
+
+
+async def test_undelivered_notification_is_retried(monkeypatch, no_backoff):
+    monkeypatch.setattr(settings, "webhook", Webhook(max_attempts=3))
+    received = []
+    sender = make_sender([500, 503], received)
+
+    await sender._send({"event": "payment.succeeded"})
+
+    assert len(received) == 3
+    assert no_backoff == [0.5, 1.0]
+    assert sender.stats()["sent"] == 1
+    assert sender.stats()["failed"] == 0
+
+
+async def test_notification_fails_after_max_attempts(monkeypatch, no_backoff):
+    monkeypatch.setattr(settings, "webhook", Webhook(max_attempts=2))
+    received = []
+    sender = make_sender([500, 500, 500], received)
+
+    await sender._send({"event": "payment.succeeded"})
+
+    assert len(received) == 2
+    assert sender.stats()["sent"] == 0
+    assert sender.stats()["failed"] == 1